@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent AI Decision Cache
+AI 筛选结果本地缓存 (SQLite)
+
+Re-running a screening after tweaking the keyword blacklist sends the same
+surviving papers to the LLM again. Decisions are stored on disk keyed by
+(model name, hash of ai_criteria, hash of normalized title + abstract), so
+unchanged papers are answered locally on reruns.
+
+Eviction: entries older than max_age_days are dropped, and beyond
+max_entries the least recently used entries go first.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+
+
+# Default cache file (override with AI_CACHE_PATH, empty string disables)
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'literature_screening_ai_cache.sqlite3')
+
+# Default eviction limits
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_MAX_AGE_DAYS = 30
+
+# SQLite host parameter limit per IN (...) lookup
+LOOKUP_CHUNK = 500
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def text_hash(text):
+    """sha1 of whitespace-collapsed text."""
+    return hashlib.sha1(WHITESPACE_PATTERN.sub(' ', text).strip().encode('utf-8')).hexdigest()
+
+
+def paper_hash(title, abstract):
+    """Hash of the normalized (lowercased, whitespace-collapsed) title + abstract."""
+    title = title.lower() if isinstance(title, str) else ''
+    abstract = abstract.lower() if isinstance(abstract, str) else ''
+    return text_hash(f"{title}\x00{abstract}")
+
+
+class AIDecisionCache:
+    """
+    SQLite-backed store of exclude/reason decisions.
+
+    One connection is shared by all task threads and guarded by a lock;
+    lookups and writes are tiny compared with an LLM round trip.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS decisions (
+                    model TEXT NOT NULL,
+                    criteria_hash TEXT NOT NULL,
+                    paper_hash TEXT NOT NULL,
+                    exclude INTEGER NOT NULL,
+                    reason TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    used_at REAL NOT NULL,
+                    PRIMARY KEY (model, criteria_hash, paper_hash)
+                ) WITHOUT ROWID
+            ''')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS decisions_used_at ON decisions (used_at)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS decisions_created_at ON decisions (created_at)')
+        self.evict()
+
+    def get_many(self, model, ai_criteria, papers):
+        """
+        Look up cached decisions.
+
+        Args:
+            papers: Iterable of (paper_id, title, abstract)
+
+        Returns:
+            Dict of paper_id -> {'exclude', 'reason'} for the cached papers
+        """
+        criteria_hash = text_hash(ai_criteria)
+        ids_by_hash = {}
+        for paper_id, title, abstract in papers:
+            ids_by_hash.setdefault(paper_hash(title, abstract), []).append(paper_id)
+
+        hashes = list(ids_by_hash)
+        oldest = time.time() - self.max_age
+        results = {}
+        with self._lock, self._conn:
+            for start in range(0, len(hashes), LOOKUP_CHUNK):
+                chunk = hashes[start:start + LOOKUP_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT paper_hash, exclude, reason FROM decisions '
+                    f'WHERE model = ? AND criteria_hash = ? AND created_at >= ? AND paper_hash IN ({placeholders})',
+                    [model, criteria_hash, oldest, *chunk],
+                ).fetchall()
+                for digest, exclude, reason in rows:
+                    for paper_id in ids_by_hash[digest]:
+                        results[paper_id] = {'exclude': bool(exclude), 'reason': reason}
+                if rows:
+                    self._conn.execute(
+                        f'UPDATE decisions SET used_at = ? '
+                        f'WHERE model = ? AND criteria_hash = ? AND paper_hash IN ({",".join("?" * len(rows))})',
+                        [time.time(), model, criteria_hash, *(row[0] for row in rows)],
+                    )
+        return results
+
+    def put(self, model, ai_criteria, title, abstract, result):
+        """Store one provider decision."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO decisions VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (model, text_hash(ai_criteria), paper_hash(title, abstract),
+                 int(bool(result.get('exclude', False))), str(result.get('reason', '')), now, now),
+            )
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones beyond max_entries."""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM decisions WHERE created_at < ?', (time.time() - self.max_age,))
+            excess = self._conn.execute('SELECT COUNT(*) FROM decisions').fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    'DELETE FROM decisions WHERE (model, criteria_hash, paper_hash) IN '
+                    '(SELECT model, criteria_hash, paper_hash FROM decisions ORDER BY used_at LIMIT ?)',
+                    (excess,),
+                )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM decisions').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(path, max_entries=DEFAULT_MAX_ENTRIES, max_age_days=DEFAULT_MAX_AGE_DAYS):
+    """
+    Return the shared cache for a path, or None if caching is disabled
+    (empty path) or the database cannot be opened.
+    """
+    if not path:
+        return None
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            try:
+                cache = AIDecisionCache(path, max_entries, max_age_days)
+            except sqlite3.Error as e:
+                print(f"⚠️ AI cache disabled ({path}): {e}", flush=True)
+                return None
+            _caches[path] = cache
+        return cache
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI Screening Stage
+AI 筛选阶段 - 模型调用与并发执行
+
+Provider clients (DeepSeek via OpenAI SDK, MiniMax-M2.1 via Anthropic SDK),
+the screening prompt, the per-paper call with retries, and a bounded
+thread-pool executor that keeps up to `concurrency` requests in flight.
+Results are handed back to the caller's thread together with the job they
+belong to, so they are written to the right row whatever order they
+complete in.
+
+Batched mode packs up to K papers (within a prompt token budget) into one
+request and expects a JSON array of {id, exclude, reason}. Papers whose id
+is missing or malformed in the answer are re-queued for another round.
+"""
+
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from rate_control import call_with_backoff
+
+
+# Supported providers -> model names
+AI_MODELS = {
+    'deepseek': 'deepseek-chat',
+    'minimax': 'MiniMax-M2.1',
+}
+
+# Provider API endpoints
+DEEPSEEK_BASE_URL = 'https://api.deepseek.com'
+MINIMAX_BASE_URL = 'https://api.minimaxi.com/anthropic'
+
+# Total seconds per provider request
+REQUEST_TIMEOUT = 60.0
+
+# Attempts per paper for empty or invalid JSON responses (transport errors
+# are retried separately, see rate_control.py)
+MAX_RETRIES = 3
+
+# Upper bound for the configurable number of concurrent AI requests
+MAX_AI_CONCURRENCY = 32
+
+# Upper bound for the configurable number of papers per batched request
+MAX_AI_BATCH_SIZE = 50
+
+# Default prompt token budget per batched request
+DEFAULT_BATCH_TOKENS = 6000
+
+# Rough prompt size estimate (characters per token)
+CHARS_PER_TOKEN = 4
+
+# Tokens reserved per request for the answer (tokens/min budget)
+OUTPUT_TOKENS_ESTIMATE = 100
+
+SYSTEM_PROMPT = "You are a paper screening assistant. Output ONLY valid JSON: {\"exclude\": true/false, \"reason\": \"text\"}. Be concise."
+
+BATCH_SYSTEM_PROMPT = "You are a paper screening assistant. Output ONLY valid JSON: {\"results\": [{\"id\": number, \"exclude\": true/false, \"reason\": \"text\"}]} with one entry per paper. Be concise."
+
+
+def create_client(ai_model, api_key, base_url=None, timeout=REQUEST_TIMEOUT):
+    """
+    Create the SDK client for the selected model.
+
+    Args:
+        base_url: Override the provider endpoint (e.g. a local stand-in server)
+        timeout: Total request timeout in seconds
+
+    Returns:
+        Tuple of (client, model_name)
+    """
+    if ai_model == 'minimax':
+        # Use MiniMax-M2 with Anthropic SDK
+        import anthropic
+
+        client = anthropic.Anthropic(
+            api_key=api_key,
+            base_url=base_url or MINIMAX_BASE_URL,
+            # The SDK's own Timeout class (newer SDKs are not built on httpx)
+            timeout=anthropic.Timeout(timeout, connect=10.0),  # total, 10s connect
+            max_retries=0  # retries and backoff are handled by rate_control.py
+        )
+        print(f"🤖 Using MiniMax-M2.1 model via Anthropic SDK", flush=True)
+    else:
+        # Use DeepSeek with OpenAI SDK (default)
+        from openai import OpenAI, Timeout
+
+        client = OpenAI(
+            api_key=api_key,
+            base_url=base_url or DEEPSEEK_BASE_URL,
+            timeout=Timeout(timeout, connect=10.0),  # total, 10s connect
+            max_retries=0  # retries and backoff are handled by rate_control.py
+        )
+        print(f"🤖 Using DeepSeek model", flush=True)
+
+    return client, AI_MODELS.get(ai_model, AI_MODELS['deepseek'])
+
+
+def build_prompt(ai_criteria, title, abstract):
+    """Build the single-paper screening prompt."""
+    return f"""Screen this paper against exclusion criteria. Return JSON only.
+
+EXCLUSION CRITERIA:
+{ai_criteria}
+
+PAPER:
+Title: {title}
+Abstract: {abstract}
+
+RULES:
+- If paper matches exclusion criteria → exclude=true
+- If uncertain → exclude=true (be strict)
+- Reason must be ≤12 words
+
+JSON format:
+{{"exclude": true/false, "reason": "brief reason"}}"""
+
+
+def build_batch_prompt(ai_criteria, papers):
+    """
+    Build one prompt for several papers.
+
+    Args:
+        papers: List of (paper_id, title, abstract); papers are numbered
+            1..K in the prompt, so the model never sees the row ids
+    """
+    listing = "\n\n".join(
+        f"[{number}]\nTitle: {title}\nAbstract: {abstract}"
+        for number, (_, title, abstract) in enumerate(papers, start=1)
+    )
+    return f"""Screen each paper against exclusion criteria. Return JSON only.
+
+EXCLUSION CRITERIA:
+{ai_criteria}
+
+PAPERS:
+{listing}
+
+RULES:
+- If paper matches exclusion criteria → exclude=true
+- If uncertain → exclude=true (be strict)
+- Reason must be ≤12 words
+- Answer every paper id exactly once
+
+JSON format:
+{{"results": [{{"id": 1, "exclude": true/false, "reason": "brief reason"}}]}}"""
+
+
+def estimate_tokens(text):
+    """Cheap prompt size estimate, good enough for packing batches."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def make_batches(papers, ai_criteria, batch_size, token_budget=DEFAULT_BATCH_TOKENS):
+    """
+    Pack papers into batches of at most batch_size papers whose estimated
+    prompt size stays within token_budget (a single oversized paper still
+    gets a batch of its own).
+
+    Yields:
+        Lists of (paper_id, title, abstract)
+    """
+    overhead = estimate_tokens(build_batch_prompt(ai_criteria, []))
+    batch = []
+    used = overhead
+    for paper in papers:
+        _, title, abstract = paper
+        cost = estimate_tokens(f"[{len(batch) + 1}]\nTitle: {title}\nAbstract: {abstract}\n\n")
+        if batch and (len(batch) >= batch_size or used + cost > token_budget):
+            yield batch
+            batch = []
+            used = overhead
+        batch.append(paper)
+        used += cost
+    if batch:
+        yield batch
+
+
+def parse_batch_results(data, papers):
+    """
+    Map a batched answer back to paper ids.
+
+    Accepts {"results": [...]} or a bare JSON array. Entries with an unknown,
+    duplicate or non-numeric id, or without a boolean `exclude`, are ignored,
+    so those papers count as unanswered.
+
+    Returns:
+        Dict of paper_id -> {'exclude', 'reason'}
+    """
+    if isinstance(data, dict):
+        data = data.get('results', [])
+    if not isinstance(data, list):
+        return {}
+
+    results = {}
+    for item in data:
+        if not isinstance(item, dict) or not isinstance(item.get('exclude'), bool):
+            continue
+        try:
+            number = int(item.get('id'))
+        except (TypeError, ValueError):
+            continue
+        if not 1 <= number <= len(papers):
+            continue
+        paper_id = papers[number - 1][0]
+        if paper_id in results:
+            continue
+        results[paper_id] = {'exclude': item['exclude'], 'reason': str(item.get('reason', ''))}
+    return results
+
+
+def call_minimax(client, prompt, system=SYSTEM_PROMPT, max_tokens=2000, controller=None):
+    """MiniMax-M2 API call with retry mechanism. Returns the parsed JSON."""
+    import anthropic
+    import httpx
+
+    tokens = estimate_tokens(system + prompt) + OUTPUT_TOKENS_ESTIMATE
+    result = None
+    for attempt in range(MAX_RETRIES):
+        # Timeouts, connection errors, 429 and 5xx: jittered backoff (rate_control.py)
+        response = call_with_backoff(
+            lambda: client.messages.create(
+                model=AI_MODELS['minimax'],
+                max_tokens=max_tokens,  # Increased to prevent thinking truncation
+                system=system,
+                messages=[
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": prompt
+                            }
+                        ]
+                    }
+                ]
+            ),
+            controller,
+            tokens,
+            (anthropic.APIConnectionError, httpx.TransportError),
+        )
+
+        # Extract text from response blocks (skip 'thinking' blocks)
+        result_text = ""
+        for block in response.content:
+            if block.type == "text":
+                result_text += block.text
+
+        # If we got text content, parse it and break
+        if result_text.strip():
+            try:
+                result = json.loads(result_text)
+                break
+            except json.JSONDecodeError as je:
+                if attempt < MAX_RETRIES - 1:
+                    print(f"   ⚠️ JSON parse error (attempt {attempt+1}/{MAX_RETRIES}), retrying...", flush=True)
+                    continue
+                else:
+                    raise je
+        elif attempt < MAX_RETRIES - 1:
+            print(f"   ⚠️ Empty response (attempt {attempt+1}/{MAX_RETRIES}), retrying...", flush=True)
+            continue
+
+    # If still no result after retries, raise error
+    if result is None:
+        raise ValueError("MiniMax-M2.1 failed to return valid response after retries")
+    return result
+
+
+def call_deepseek(client, prompt, system=SYSTEM_PROMPT, controller=None):
+    """DeepSeek API call with OpenAI SDK + retry. Returns the parsed JSON."""
+    import httpx
+    import openai
+
+    tokens = estimate_tokens(system + prompt) + OUTPUT_TOKENS_ESTIMATE
+    result = None
+    for attempt in range(MAX_RETRIES):
+        # Timeouts, connection errors, 429 and 5xx: jittered backoff (rate_control.py)
+        response = call_with_backoff(
+            lambda: client.chat.completions.create(
+                model=AI_MODELS['deepseek'],
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.0
+            ),
+            controller,
+            tokens,
+            (openai.APIConnectionError, httpx.TransportError),
+        )
+
+        try:
+            result = json.loads(response.choices[0].message.content)
+            break
+        except json.JSONDecodeError as je:
+            if attempt < MAX_RETRIES - 1:
+                print(f"   ⚠️ JSON parse error (attempt {attempt+1}/{MAX_RETRIES}), retrying...", flush=True)
+                continue
+            else:
+                raise je
+
+    if result is None:
+        raise ValueError("DeepSeek failed to return valid response after retries")
+    return result
+
+
+def screen_paper(client, ai_model, prompt, controller=None):
+    """Screen one paper with the selected provider. Returns {'exclude', 'reason'}."""
+    if ai_model == 'minimax':
+        return call_minimax(client, prompt, controller=controller)
+    return call_deepseek(client, prompt, controller=controller)
+
+
+def screen_batch(client, ai_model, ai_criteria, papers, controller=None):
+    """
+    Screen a batch of (paper_id, title, abstract) in one request.
+
+    Returns:
+        Dict of paper_id -> {'exclude', 'reason'} for the answered papers only
+    """
+    prompt = build_batch_prompt(ai_criteria, papers)
+    if ai_model == 'minimax':
+        # Room for thinking blocks plus one short entry per paper
+        data = call_minimax(client, prompt, BATCH_SYSTEM_PROMPT, max_tokens=2000 + 100 * len(papers),
+                            controller=controller)
+    else:
+        data = call_deepseek(client, prompt, BATCH_SYSTEM_PROMPT, controller=controller)
+    return parse_batch_results(data, papers)
+
+
+def run_concurrent(jobs, worker, concurrency, on_result, on_error, is_cancelled, limit=None):
+    """
+    Run worker(job) for every job with at most `concurrency` calls in flight.
+
+    Jobs are pulled lazily, so cancellation stops new submissions right away
+    (requests already in flight are allowed to finish). on_result(job, result)
+    and on_error(job, exc) are always called from the calling thread.
+    limit() may lower the in-flight cap while running (AIMD, see
+    rate_control.RateController.limit).
+
+    Returns:
+        Tuple of (number of completed jobs, cancelled flag)
+    """
+    concurrency = max(1, concurrency)
+    jobs = iter(jobs)
+    in_flight = {}
+    completed = 0
+    exhausted = False
+    cancelled = False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while True:
+            cap = min(concurrency, limit()) if limit else concurrency
+            while not exhausted and not cancelled and len(in_flight) < cap:
+                if is_cancelled():
+                    cancelled = True
+                    break
+                try:
+                    job = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(worker, job)] = job
+
+            if not in_flight:
+                break
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    on_error(job, e)
+                else:
+                    on_result(job, result)
+                completed += 1
+
+    return completed, cancelled
+
+
+def run_batched(papers, worker, batches, concurrency, on_result, on_error, is_cancelled,
+                max_rounds=MAX_RETRIES, limit=None):
+    """
+    Screen papers in batches, re-queueing papers the answer left out.
+
+    Args:
+        papers: List of (paper_id, title, abstract)
+        worker: callable(batch) -> dict of paper_id -> result (screen_batch)
+        batches: callable(papers) -> iterable of batches (make_batches)
+        on_result(paper, result) / on_error(paper, exc): Per-paper callbacks,
+            called from the calling thread
+        max_rounds: Rounds before unanswered papers are reported as errors
+        limit: Optional callable() -> current in-flight cap
+
+    Returns:
+        Tuple of (number of papers handled, cancelled flag)
+    """
+    pending = list(papers)
+    handled = 0
+
+    for round_number in range(1, max_rounds + 1):
+        missing = []
+
+        def record_batch(batch, results):
+            nonlocal handled
+            for paper in batch:
+                if paper[0] in results:
+                    handled += 1
+                    on_result(paper, results[paper[0]])
+                else:
+                    missing.append(paper)
+
+        def record_batch_error(batch, e):
+            nonlocal handled
+            for paper in batch:
+                handled += 1
+                on_error(paper, e)
+
+        _, cancelled = run_concurrent(batches(pending), worker, concurrency,
+                                      record_batch, record_batch_error, is_cancelled, limit)
+        if cancelled:
+            return handled, True
+        if not missing:
+            return handled, False
+
+        pending = missing
+        if round_number < max_rounds:
+            print(f"   ⚠️ {len(pending)} papers missing from batch answers, re-queueing "
+                  f"(round {round_number + 1}/{max_rounds})...", flush=True)
+
+    for paper in pending:
+        handled += 1
+        on_error(paper, ValueError("No answer for this paper after retries"))
+    return handled, False
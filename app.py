@@ -7,24 +7,96 @@ Literature Screening Web App - Flask Backend v1.2
 Version 1.2: Added MiniMax-M2 model support with multi-model selection
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, Request, current_app, render_template, request, jsonify, send_file
 import pandas as pd
+import numpy as np
 import io
 import zipfile
 import threading
 import uuid
 import time
+import os
 from datetime import datetime
 import rispy
 import xlwt
-import bibtexparser
 from bibtexparser.bwriter import BibTexWriter
 from bibtexparser.bibdatabase import BibDatabase
-from striprtf.striprtf import rtf_to_text
-import re
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from keyword_matcher import MATCH_MODES, get_matcher
+from parallel_screening import screen_keywords_parallel
+from progress import LOG_SIZE, ProgressTracker, ScreeningLog
+from ai_screening import (DEEPSEEK_BASE_URL, DEFAULT_BATCH_TOKENS, MAX_AI_BATCH_SIZE, MAX_AI_CONCURRENCY,
+                          MINIMAX_BASE_URL, REQUEST_TIMEOUT, build_prompt, make_batches, run_batched,
+                          run_concurrent, screen_batch, screen_paper)
+from ai_screening import create_client as create_ai_client
+from rate_control import RateController
+from ai_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_AGE_DAYS, DEFAULT_MAX_ENTRIES, get_cache
+from near_duplicates import DEFAULT_THRESHOLD as DEFAULT_FUZZY_THRESHOLD
+from deduplication import KEEP_POLICIES, deduplicate
+from corpus_index import DEFAULT_INDEX_PATH, corpus_fingerprints, get_index
+from column_aliases import resolve_column, with_legacy_columns
+from dtype_compaction import compact_dtypes
+from columnar_io import COLUMNAR_FORMATS, MIMETYPES as COLUMNAR_MIMETYPES, ColumnarUnavailable, write_columnar
+from file_ingestion import (DEFAULT_SPOOL_DIR, expand_uploads, ingest_uploads, parse_bibtex_file, parse_ris_file,
+                            parse_rtf_file, remove_spool, spool_file, spool_upload)
+
+
+class SpoolingRequest(Request):
+    """Request that writes file uploads straight to the upload spool directory."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return spool_file(current_app.config['UPLOAD_SPOOL_DIR'])
+
 
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+app.request_class = SpoolingRequest
+# Maximum upload size per request in MB (all files combined); uploads are spooled to disk, not memory
+app.config['MAX_CONTENT_LENGTH'] = int(float(os.environ.get('MAX_UPLOAD_MB', 50)) * 1024 * 1024)
+# Directory uploads are written to while the request is received, kept until the task has parsed them
+app.config['UPLOAD_SPOOL_DIR'] = os.environ.get('UPLOAD_SPOOL_DIR', DEFAULT_SPOOL_DIR)
+# Maximum decompressed size in MB of each uploaded .zip / .tar.gz / .gz archive
+app.config['MAX_ARCHIVE_MB'] = float(os.environ.get('MAX_ARCHIVE_MB', 1024))
+# Keyword screening worker processes (1 = screen in the task thread)
+app.config['SCREENING_WORKERS'] = int(os.environ.get('SCREENING_WORKERS', 1))
+# Concurrent AI screening requests per task
+app.config['AI_CONCURRENCY'] = int(os.environ.get('AI_CONCURRENCY', 4))
+# Worker processes parsing the files of a multi-file upload (1 = parse in the task thread)
+app.config['INGEST_WORKERS'] = int(os.environ.get('INGEST_WORKERS', min(4, os.cpu_count() or 1)))
+
+# Provider endpoints and request timeout (point these at scripts/fake_provider.py for local runs)
+app.config['DEEPSEEK_BASE_URL'] = os.environ.get('DEEPSEEK_BASE_URL', DEEPSEEK_BASE_URL)
+app.config['MINIMAX_BASE_URL'] = os.environ.get('MINIMAX_BASE_URL', MINIMAX_BASE_URL)
+app.config['AI_REQUEST_TIMEOUT'] = float(os.environ.get('AI_REQUEST_TIMEOUT', REQUEST_TIMEOUT))
+
+# Per-provider request and token budgets per minute (0 = unlimited; 429s still adapt concurrency)
+app.config['DEEPSEEK_RPM'] = int(os.environ.get('DEEPSEEK_RPM', 0))
+app.config['DEEPSEEK_TPM'] = int(os.environ.get('DEEPSEEK_TPM', 0))
+app.config['MINIMAX_RPM'] = int(os.environ.get('MINIMAX_RPM', 0))
+app.config['MINIMAX_TPM'] = int(os.environ.get('MINIMAX_TPM', 0))
+
+# Papers per AI request (1 = one paper per prompt) and prompt token budget per batch
+app.config['AI_BATCH_SIZE'] = int(os.environ.get('AI_BATCH_SIZE', 1))
+app.config['AI_BATCH_TOKENS'] = int(os.environ.get('AI_BATCH_TOKENS', DEFAULT_BATCH_TOKENS))
+
+# On-disk AI decision cache (empty path disables it)
+app.config['AI_CACHE_PATH'] = os.environ.get('AI_CACHE_PATH', DEFAULT_CACHE_PATH)
+app.config['AI_CACHE_MAX_ENTRIES'] = int(os.environ.get('AI_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+app.config['AI_CACHE_MAX_AGE_DAYS'] = float(os.environ.get('AI_CACHE_MAX_AGE_DAYS', DEFAULT_MAX_AGE_DAYS))
+
+# Title shingle similarity for near-duplicate (fuzzy) deduplication
+app.config['FUZZY_DEDUP_THRESHOLD'] = float(os.environ.get('FUZZY_DEDUP_THRESHOLD', DEFAULT_FUZZY_THRESHOLD))
+
+# Per-project fingerprint index of screened records (empty path disables it)
+app.config['CORPUS_INDEX_PATH'] = os.environ.get('CORPUS_INDEX_PATH', DEFAULT_INDEX_PATH)
+
+# Deduplication methods selectable from the form
+DEDUP_METHODS = ('doi_title', 'fuzzy')
+
+# Legacy Excel (.xls) sheet limits
+XLS_MAX_ROWS = 65536
+XLS_MAX_COLUMNS = 256
+XLS_MAX_CELL_CHARS = 32767
 
 # Version
 VERSION = "1.2.3"
@@ -66,9 +138,9 @@ COLUMN_MAPPINGS = {
     # 作者 (Author) - AU
     "author": ["Authors", "authors", "AU", "Author", "Creator"],
     # DOI
-    "doi": ["DOI", "doi", "Digital Object Identifier"],
+    "doi": ["DOI", "doi", "DO", "Digital Object Identifier"],
     # URL
-    "url": ["URL", "url", "Link"],
+    "url": ["URL", "url", "UR", "Link"],
 }
 
 # Global storage for tasks
@@ -83,15 +155,12 @@ def find_column(df, column_type):
     return None
 
 
-def contains_blacklisted_keyword(text, blacklist):
-    """Check if text contains any blacklisted keyword."""
+def contains_blacklisted_keyword(text, blacklist, match_mode='substring'):
+    """Check if text contains any blacklisted keyword ('word' mode: whole words/phrases only)."""
     if pd.isna(text) or not isinstance(text, str):
         return False, ""
-    text_lower = text.lower()
-    for keyword in blacklist:
-        if keyword.lower().strip() in text_lower:
-            return True, keyword
-    return False, ""
+    keyword = get_matcher(blacklist, match_mode).first_keyword(text.lower())
+    return (True, keyword) if keyword else (False, "")
 
 
 def update_time_estimate(task_id, total_items, stage='Keyword'):
@@ -127,7 +196,8 @@ def update_time_estimate(task_id, total_items, stage='Keyword'):
             tasks[task_id]['message'] = f"{stage}筛选: 已处理 {processed}/{total_items}, 剩余约 {remaining_str}"
 
 
-def remove_duplicates(df, title_col='Title', method='doi_title'):
+def remove_duplicates(df, title_col='Title', method='doi_title', threshold=DEFAULT_FUZZY_THRESHOLD,
+                      keep='first', source_rank=None, return_groups=False):
     """
     Remove duplicate records from DataFrame.
     
@@ -135,146 +205,58 @@ def remove_duplicates(df, title_col='Title', method='doi_title'):
         df: DataFrame to deduplicate
         title_col: Name of the title column
         method: Deduplication method
-            - 'doi': Remove duplicates based on DOI (if available)
-            - 'title': Remove duplicates based on title similarity
+            - 'doi': Remove duplicates based on canonical DOI (if available)
+            - 'title': Remove duplicates based on normalized title within the
+              same (year, first-author surname) block
             - 'doi_title': Try DOI first, then title (default)
+            - 'fuzzy': DOI and title, then near-duplicate titles (typos,
+              subtitles, "Correction:" prefixes) via MinHash + LSH
+        threshold: Title shingle similarity for the 'fuzzy' step
+        keep: Which record of a duplicate cluster is kept ('first',
+            'most_complete' or 'preferred_source')
+        source_rank: Per-row preference for 'preferred_source' (lower wins)
+        return_groups: Also return the duplicate clusters (Duplicate_Cluster,
+            Duplicate_Kept columns)
     
     Returns:
-        Tuple of (deduplicated_df, duplicate_info_dict)
+        Tuple of (deduplicated_df, duplicate_info_dict[, duplicate_groups_df])
     """
-    original_count = len(df)
-    df_clean = df.copy()
-    
-    # Track duplicates
-    duplicates_removed = 0
-    duplicate_details = []
-    
-    # Step 1: Remove DOI-based duplicates
-    if 'DOI' in df_clean.columns and method in ['doi', 'doi_title']:
-        # Only consider rows with non-empty DOI
-        doi_mask = df_clean['DOI'].notna() & (df_clean['DOI'].astype(str).str.strip() != '')
-        
-        if doi_mask.any():
-            # Mark duplicates based on DOI (keep first occurrence)
-            df_clean['_temp_doi_dup'] = df_clean['DOI'].where(doi_mask)
-            duplicated_doi = df_clean.duplicated(subset=['_temp_doi_dup'], keep='first')
-            
-            if duplicated_doi.any():
-                dup_count = duplicated_doi.sum()
-                duplicates_removed += dup_count
-                duplicate_details.append(f"DOI-based: {dup_count} duplicates")
-                df_clean = df_clean[~duplicated_doi]
-            
-            df_clean = df_clean.drop(columns=['_temp_doi_dup'])
-    
-    # Step 2: Remove title-based duplicates
-    if title_col in df_clean.columns and method in ['title', 'doi_title']:
-        # Normalize titles for comparison
-        df_clean['_temp_title_norm'] = df_clean[title_col].astype(str).str.lower().str.strip()
-        df_clean['_temp_title_norm'] = df_clean['_temp_title_norm'].str.replace(r'[^\w\s]', '', regex=True)
-        df_clean['_temp_title_norm'] = df_clean['_temp_title_norm'].str.replace(r'\s+', ' ', regex=True)
-        
-        # Remove exact title duplicates (keep first)
-        duplicated_title = df_clean.duplicated(subset=['_temp_title_norm'], keep='first')
-        
-        if duplicated_title.any():
-            dup_count = duplicated_title.sum()
-            duplicates_removed += dup_count
-            duplicate_details.append(f"Title-based: {dup_count} duplicates")
-            df_clean = df_clean[~duplicated_title]
-        
-        df_clean = df_clean.drop(columns=['_temp_title_norm'])
-    
-    # Reset index
-    df_clean = df_clean.reset_index(drop=True)
-    
-    dedup_info = {
-        'original_count': int(original_count),
-        'duplicates_removed': int(duplicates_removed),
-        'final_count': int(len(df_clean)),
-        'details': duplicate_details,
-        'method': method
-    }
-    
+    df_clean, dedup_info, groups = deduplicate(
+        df, title_col=title_col, doi_col=find_column(df, 'doi'), year_col=find_column(df, 'year'),
+        author_col=find_column(df, 'author'), method=method, threshold=threshold,
+        keep=keep, source_rank=source_rank)
+    if return_groups:
+        return df_clean, dedup_info, groups
     return df_clean, dedup_info
 
 
-def parse_ris_file(file_content):
-    """Parse RIS file content and convert to DataFrame."""
-    try:
-        # RIS files are text-based
-        # Try multiple encodings
-        text_content = None
-        for encoding in ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']:
-            try:
-                text_content = file_content.decode(encoding)
-                break
-            except:
+def df_to_xls(df, buffer):
+    """Write a DataFrame as a legacy Excel (.xls) sheet with xlwt."""
+    if len(df) + 1 > XLS_MAX_ROWS or len(df.columns) > XLS_MAX_COLUMNS:
+        raise ValueError(f'Too large for .xls ({len(df)} rows, {len(df.columns)} columns); download .xlsx instead')
+    workbook = xlwt.Workbook(encoding='utf-8')
+    sheet = workbook.add_sheet('Sheet1')
+    for col, name in enumerate(df.columns):
+        sheet.write(0, col, str(name))
+    for row, values in enumerate(df.itertuples(index=False, name=None), start=1):
+        for col, value in enumerate(values):
+            if pd.isna(value):
                 continue
-        
-        if text_content is None:
-            raise ValueError("Could not decode file with any supported encoding")
-        
-        entries = rispy.loads(text_content)
-        
-        if not entries:
-            raise ValueError("No RIS entries found in file")
-        
-        # Convert to DataFrame (标准字段名: TI, AB, KW, PY, TY, LA, T2/J2, AU)
-        records = []
-        for entry in entries:
-            # 解析类型字段 (RIS: type_of_reference -> TY)
-            ref_type = entry.get('type_of_reference', '')
-            type_mapping = {
-                'JOUR': 'Article',
-                'BOOK': 'Book',
-                'CHAP': 'Book Chapter',
-                'CONF': 'Conference',
-                'PAPR': 'Conference Paper',
-                'THES': 'Thesis',
-                'REPT': 'Report',
-                'REV': 'Review',
-                'ABST': 'Abstract',
-                'GEN': 'Generic',
-            }
-            doc_type = type_mapping.get(ref_type, ref_type)
-
-            record = {
-                'TI': entry.get('title') or entry.get('primary_title', ''),
-                'AB': entry.get('abstract', ''),
-                'T2': entry.get('journal_name') or entry.get('secondary_title', ''),
-                'AU': '; '.join(entry.get('authors', [])) if entry.get('authors') else '',
-                'PY': str(entry.get('year', '')) if entry.get('year') else '',
-                'DO': entry.get('doi', ''),
-                'KW': '; '.join(entry.get('keywords', [])) if entry.get('keywords') else '',
-                'TY': doc_type,
-                'UR': entry.get('url', ''),
-                'LA': entry.get('language', ''),
-            }
-
-            # 兼容旧字段名（用于前端显示）
-            record['Title'] = record['TI']
-            record['Abstract'] = record['AB']
-            record['Source title'] = record['T2']
-            record['Authors'] = record['AU']
-            record['Year'] = record['PY']
-            record['DOI'] = record['DO']
-            record['Keywords'] = record['KW']
-            record['Type'] = record['TY']
-            record['URL'] = record['UR']
-
-            records.append(record)
-        
-        df = pd.DataFrame(records)
-        print(f"   RIS parser: Found {len(records)} entries, created DataFrame with {len(df)} rows", flush=True)
-        return df
-    except Exception as e:
-        print(f"   RIS parser error: {str(e)}", flush=True)
-        raise ValueError(f"Error parsing RIS file: {str(e)}")
+            if isinstance(value, (bool, np.bool_)):
+                sheet.write(row, col, bool(value))
+            elif isinstance(value, (int, float, np.integer, np.floating)):
+                sheet.write(row, col, float(value))
+            else:
+                # .xls cells hold at most 32767 characters
+                sheet.write(row, col, str(value)[:XLS_MAX_CELL_CHARS])
+    workbook.save(buffer)
 
 
-def df_to_ris(df, title_col='Title', abstract_col='Abstract', source_col='Source title'):
+def df_to_ris(df, title_col='TI', abstract_col='AB', source_col='T2'):
     """Convert DataFrame to RIS format string."""
+    # Fields are found by standard tag or legacy name (see column_aliases.py)
+    title_col, abstract_col, source_col = (resolve_column(df, c) for c in (title_col, abstract_col, source_col))
+    authors_col, year_col, doi_col, keywords_col, url_col = (resolve_column(df, tag) for tag in ('AU', 'PY', 'DO', 'KW', 'UR'))
     ris_entries = []
     
     for idx, row in df.iterrows():
@@ -286,22 +268,22 @@ def df_to_ris(df, title_col='Title', abstract_col='Abstract', source_col='Source
         }
         
         # Add optional fields if they exist
-        if 'Authors' in row and pd.notna(row['Authors']):
-            authors_str = str(row['Authors'])
+        if authors_col and pd.notna(row[authors_col]):
+            authors_str = str(row[authors_col])
             entry['authors'] = [a.strip() for a in authors_str.split(';') if a.strip()]
         
-        if 'Year' in row and pd.notna(row['Year']):
-            entry['year'] = str(row['Year'])
+        if year_col and pd.notna(row[year_col]):
+            entry['year'] = str(row[year_col])
         
-        if 'DOI' in row and pd.notna(row['DOI']):
-            entry['doi'] = str(row['DOI'])
+        if doi_col and pd.notna(row[doi_col]):
+            entry['doi'] = str(row[doi_col])
         
-        if 'Keywords' in row and pd.notna(row['Keywords']):
-            keywords_str = str(row['Keywords'])
+        if keywords_col and pd.notna(row[keywords_col]):
+            keywords_str = str(row[keywords_col])
             entry['keywords'] = [k.strip() for k in keywords_str.split(';') if k.strip()]
         
-        if 'URL' in row and pd.notna(row['URL']):
-            entry['url'] = str(row['URL'])
+        if url_col and pd.notna(row[url_col]):
+            entry['url'] = str(row[url_col])
         
         ris_entries.append(entry)
     
@@ -310,78 +292,18 @@ def df_to_ris(df, title_col='Title', abstract_col='Abstract', source_col='Source
     return ris_string
 
 
-def parse_bibtex_file(file_content):
-    """Parse BibTeX file content and convert to DataFrame."""
-    try:
-        text_content = file_content.decode('utf-8')
-        bib_database = bibtexparser.loads(text_content)
-        
-        records = []
-        for entry in bib_database.entries:
-            # 解析类型字段 (BibTeX: entry type -> TY)
-            entry_type = entry.get('ENTRYTYPE', '')
-            type_mapping = {
-                'article': 'Article',
-                'book': 'Book',
-                'inproceedings': 'Conference',
-                'conference': 'Conference',
-                'incollection': 'Book Chapter',
-                'inbook': 'Book Chapter',
-                'phdthesis': 'Thesis',
-                'mastersthesis': 'Thesis',
-                'techreport': 'Report',
-                'misc': 'Generic',
-            }
-            doc_type = type_mapping.get(entry_type, entry_type)
-
-            # 提取作者列表
-            authors_str = entry.get('author', '').replace(' and ', '; ')
-            # 提取年份
-            year_val = entry.get('year', '')
-
-            record = {
-                'TI': entry.get('title', '').replace('{', '').replace('}', ''),
-                'AB': entry.get('abstract', ''),
-                'T2': entry.get('journal', '') or entry.get('booktitle', ''),
-                'AU': authors_str,
-                'PY': year_val,
-                'DO': entry.get('doi', ''),
-                'KW': entry.get('keywords', ''),
-                'TY': doc_type,
-                'UR': entry.get('url', ''),
-                'LA': entry.get('language', ''),
-            }
-
-            # 兼容旧字段名（用于前端显示）
-            record['Title'] = record['TI']
-            record['Abstract'] = record['AB']
-            record['Source title'] = record['T2']
-            record['Authors'] = record['AU']
-            record['Year'] = record['PY']
-            record['DOI'] = record['DO']
-            record['Keywords'] = record['KW']
-            record['Type'] = record['TY']
-            record['URL'] = record['UR']
-            record['Publisher'] = entry.get('publisher', '')
-            record['Volume'] = entry.get('volume', '')
-            record['Pages'] = entry.get('pages', '')
-
-            records.append(record)
-        
-        return pd.DataFrame(records)
-    except Exception as e:
-        raise ValueError(f"Error parsing BibTeX file: {str(e)}")
-
-
-def df_to_bibtex(df, title_col='Title', abstract_col='Abstract', source_col='Source title'):
+def df_to_bibtex(df, title_col='TI', abstract_col='AB', source_col='T2'):
     """Convert DataFrame to BibTeX format string."""
+    # Fields are found by standard tag or legacy name (see column_aliases.py)
+    title_col, abstract_col, source_col = (resolve_column(df, c) for c in (title_col, abstract_col, source_col))
+    authors_col, year_col, doi_col, keywords_col, url_col = (resolve_column(df, tag) for tag in ('AU', 'PY', 'DO', 'KW', 'UR'))
     bib_db = BibDatabase()
     entries = []
     
     for idx, row in df.iterrows():
         # Generate citation key from author and year or use index
-        year = str(row.get('Year', '')) if pd.notna(row.get('Year')) else ''
-        authors = str(row.get('Authors', '')) if pd.notna(row.get('Authors')) else ''
+        year = str(row.get(year_col, '')) if pd.notna(row.get(year_col)) else ''
+        authors = str(row.get(authors_col, '')) if pd.notna(row.get(authors_col)) else ''
         
         if authors and year:
             first_author = authors.split(';')[0].split(',')[0].strip().replace(' ', '')
@@ -398,20 +320,20 @@ def df_to_bibtex(df, title_col='Title', abstract_col='Abstract', source_col='Sou
         }
         
         # Add optional fields
-        if 'Authors' in row and pd.notna(row['Authors']):
-            entry['author'] = str(row['Authors']).replace(';', ' and')
+        if authors_col and pd.notna(row[authors_col]):
+            entry['author'] = str(row[authors_col]).replace(';', ' and')
         
-        if 'Year' in row and pd.notna(row['Year']):
-            entry['year'] = str(row['Year'])
+        if year_col and pd.notna(row[year_col]):
+            entry['year'] = str(row[year_col])
         
-        if 'DOI' in row and pd.notna(row['DOI']):
-            entry['doi'] = str(row['DOI'])
+        if doi_col and pd.notna(row[doi_col]):
+            entry['doi'] = str(row[doi_col])
         
-        if 'Keywords' in row and pd.notna(row['Keywords']):
-            entry['keywords'] = str(row['Keywords'])
+        if keywords_col and pd.notna(row[keywords_col]):
+            entry['keywords'] = str(row[keywords_col])
         
-        if 'URL' in row and pd.notna(row['URL']):
-            entry['url'] = str(row['URL'])
+        if url_col and pd.notna(row[url_col]):
+            entry['url'] = str(row[url_col])
         
         if 'Publisher' in row and pd.notna(row['Publisher']):
             entry['publisher'] = str(row['Publisher'])
@@ -430,246 +352,6 @@ def df_to_bibtex(df, title_col='Title', abstract_col='Abstract', source_col='Sou
     return writer.write(bib_db)
 
 
-def parse_rtf_file(file_content):
-    """
-    Parse RTF file content and convert to DataFrame.
-    
-    RTF files from reference managers (like EndNote, Zotero) typically contain
-    structured bibliographic data. This parser attempts to extract common fields
-    like Title, Abstract, Authors, Journal, Year, etc.
-    """
-    try:
-        # Decode RTF content
-        text_content = None
-        for encoding in ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252', 'windows-1252']:
-            try:
-                rtf_content = file_content.decode(encoding)
-                # Convert RTF to plain text
-                text_content = rtf_to_text(rtf_content)
-                break
-            except:
-                continue
-        
-        if text_content is None:
-            raise ValueError("Could not decode RTF file with any supported encoding")
-        
-        records = []
-        
-        # Try EndNote-style format (e.g., "%T Title\n%A Author\n%J Journal\n")
-        # Split by double newlines to get individual entries
-        entries = re.split(r'\n\s*\n+', text_content)
-        
-        for entry_text in entries:
-            entry_text = entry_text.strip()
-            if not entry_text or not entry_text.startswith('%'):
-                continue
-                
-            record = {
-                'TI': '',        # 标题 (Title)
-                'AB': '',        # 摘要 (Abstract)
-                'T2': '',        # 期刊 (Journal/Source)
-                'AU': '',        # 作者 (Author)
-                'PY': '',        # 年份 (Year)
-                'DO': '',        # DOI
-                'KW': '',        # 关键词 (Keywords)
-                'TY': '',        # 类型 (Type)
-                'UR': '',        # URL
-                'LA': '',        # 语言 (Language)
-            }
-
-            # 兼容旧字段名（用于前端显示）
-            record['Title'] = ''
-            record['Abstract'] = ''
-            record['Source title'] = ''
-            record['Authors'] = ''
-            record['Year'] = ''
-            record['DOI'] = ''
-            record['Keywords'] = ''
-            record['Type'] = ''
-            record['URL'] = ''
-            
-            # Parse EndNote field codes
-            lines = entry_text.split('\n')
-            current_field = None
-            current_value = []
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check if line starts with a field code
-                if line.startswith('%'):
-                    # Save previous field
-                    if current_field and current_value:
-                        value = ' '.join(current_value).strip()
-                        if current_field == 'title':
-                            record['TI'] = value
-                            record['Title'] = value
-                        elif current_field == 'abstract':
-                            record['AB'] = value
-                            record['Abstract'] = value
-                        elif current_field == 'journal':
-                            record['T2'] = value
-                            record['Source title'] = value
-                        elif current_field == 'author':
-                            if record['AU']:
-                                record['AU'] += '; ' + value
-                            else:
-                                record['AU'] = value
-                            if record['Authors']:
-                                record['Authors'] += '; ' + value
-                            else:
-                                record['Authors'] = value
-                        elif current_field == 'year':
-                            record['PY'] = value
-                            record['Year'] = value
-                        elif current_field == 'doi':
-                            record['DO'] = value
-                            record['DOI'] = value
-                        elif current_field == 'keywords':
-                            record['KW'] = value
-                            record['Keywords'] = value
-                        elif current_field == 'url':
-                            record['UR'] = value
-                            record['URL'] = value
-                        elif current_field == 'type':
-                            record['TY'] = value
-                            record['Type'] = value
-                        elif current_field == 'language':
-                            record['LA'] = value
-                    
-                    # Start new field
-                    current_value = []
-                    field_code = line[1:2].upper()
-                    field_content = line[2:].strip()
-                    
-                    # Map EndNote field codes (标准字段名: TI, AB, KW, PY, TY, LA, T2/J2, AU)
-                    field_map = {
-                        'T': 'title',        # TI - Title
-                        'A': 'author',       # AU - Author
-                        'J': 'journal',      # T2/J2 - Journal
-                        'D': 'year',         # PY - Year
-                        'K': 'keywords',     # KW - Keywords
-                        'X': 'abstract',     # AB - Abstract
-                        'N': 'abstract',     # AB - Abstract
-                        'U': 'url',          # UR - URL
-                        'R': 'doi',          # DO - DOI
-                        '0': 'type',         # TY - Type
-                        'L': 'language',     # LA - Language
-                    }
-                    
-                    current_field = field_map.get(field_code)
-                    if field_content:
-                        current_value.append(field_content)
-                else:
-                    # Continuation of previous field
-                    if current_field:
-                        current_value.append(line)
-            
-            # Save last field
-            if current_field and current_value:
-                value = ' '.join(current_value).strip()
-                if current_field == 'title':
-                    record['TI'] = value
-                    record['Title'] = value
-                elif current_field == 'abstract':
-                    record['AB'] = value
-                    record['Abstract'] = value
-                elif current_field == 'journal':
-                    record['T2'] = value
-                    record['Source title'] = value
-                elif current_field == 'author':
-                    if record['AU']:
-                        record['AU'] += '; ' + value
-                    else:
-                        record['AU'] = value
-                    if record['Authors']:
-                        record['Authors'] += '; ' + value
-                    else:
-                        record['Authors'] = value
-                elif current_field == 'year':
-                    record['PY'] = value
-                    record['Year'] = value
-                elif current_field == 'doi':
-                    record['DO'] = value
-                    record['DOI'] = value
-                elif current_field == 'keywords':
-                    record['KW'] = value
-                    record['Keywords'] = value
-                elif current_field == 'url':
-                    record['UR'] = value
-                    record['URL'] = value
-                elif current_field == 'type':
-                    record['TY'] = value
-                    record['Type'] = value
-                elif current_field == 'language':
-                    record['LA'] = value
-            
-            # Only add if has at least a title
-            if record['Title']:
-                records.append(record)
-        
-        # If EndNote parsing didn't work, try alternative formats
-        if not records:
-            # Try to parse as simple paragraph-separated entries
-            # Split by double newlines or numbered entries
-            paragraphs = re.split(r'\n\s*\n+', text_content)
-            
-            for para in paragraphs:
-                para = para.strip()
-                if len(para) < 50:  # Skip very short paragraphs
-                    continue
-                
-                # Try to extract structured info from paragraph
-                lines = [l.strip() for l in para.split('\n') if l.strip()]
-                
-                if lines:
-                    # Heuristic: First line is often the title
-                    # Look for year patterns, journal names, etc.
-                    record = {
-                        'Title': lines[0] if lines else '',
-                        'Abstract': '',
-                        'Source title': '',
-                        'Authors': '',
-                        'Year': '',
-                        'DOI': '',
-                        'Keywords': '',
-                        'Type': '',
-                        'URL': '',
-                    }
-                    
-                    # Try to extract year (4 digits)
-                    year_match = re.search(r'\b(19|20)\d{2}\b', para)
-                    if year_match:
-                        record['Year'] = year_match.group(0)
-                    
-                    # Try to find DOI
-                    doi_match = re.search(r'10\.\d{4,}/[^\s]+', para)
-                    if doi_match:
-                        record['DOI'] = doi_match.group(0)
-                    
-                    # If we have remaining lines, treat as abstract or metadata
-                    if len(lines) > 1:
-                        # Join remaining lines as potential abstract
-                        remaining = ' '.join(lines[1:])
-                        if len(remaining) > 100:
-                            record['Abstract'] = remaining[:1000]  # Limit length
-                    
-                    records.append(record)
-        
-        if not records:
-            raise ValueError("Could not extract any bibliographic records from RTF file. The file may not be in a supported format.")
-        
-        df = pd.DataFrame(records)
-        print(f"   RTF parser: Found {len(records)} entries, created DataFrame with {len(df)} rows", flush=True)
-        return df
-        
-    except Exception as e:
-        print(f"   RTF parser error: {str(e)}", flush=True)
-        raise ValueError(f"Error parsing RTF file: {str(e)}")
-
-
 def screen_literature_task(task_id, df, title_abstract_keywords, journal_keywords, api_key=None, ai_criteria=None, remove_duplicates_flag=False, **kwargs):
     """Background task for screening literature."""
     try:
@@ -690,17 +372,40 @@ def screen_literature_task(task_id, df, title_abstract_keywords, journal_keyword
         
         # --- Step 0: Remove duplicates if requested ---
         dedup_info = None
+        df_duplicates = None
         if remove_duplicates_flag:
             tasks[task_id]['message'] = 'Removing duplicates...'
-            df, dedup_info = remove_duplicates(df, title_col=title_col or 'Title', method='doi_title')
+            df, dedup_info, df_duplicates = remove_duplicates(
+                df, title_col=title_col or 'TI', method=kwargs.get('dedup_method', 'doi_title'),
+                threshold=app.config['FUZZY_DEDUP_THRESHOLD'], keep=kwargs.get('dedup_keep', 'first'),
+                source_rank=kwargs.get('source_rank'), return_groups=True)
             print(f"🔄 Deduplication: {dedup_info['duplicates_removed']} duplicates removed ({dedup_info['original_count']} → {dedup_info['final_count']})", flush=True)
+
+        # --- Step 0b: Set aside records already screened in earlier rounds of the project ---
+        project = kwargs.get('project')
+        corpus_index = get_index(app.config['CORPUS_INDEX_PATH'], app.config['FUZZY_DEDUP_THRESHOLD']) if project else None
+        fingerprints = None
+        df_seen = None
+        if corpus_index is not None:
+            tasks[task_id]['message'] = 'Checking earlier rounds...'
+            fingerprints = corpus_fingerprints(df, title_col, find_column(df, "doi"), find_column(df, "year"),
+                                               find_column(df, "author"))
+            seen = corpus_index.lookup(project, fingerprints)
+            is_seen = seen['match'] != None  # noqa: E711
+            df_seen = df[is_seen].copy()
+            df_seen['Seen_Match'] = seen['match'][is_seen]
+            df_seen['First_Seen'] = pd.to_datetime(seen['first_seen'][is_seen], unit='s').strftime('%Y-%m-%d %H:%M')
+            df = df[~is_seen].reset_index(drop=True)
+            fingerprints = {key: value[..., ~is_seen] for key, value in fingerprints.items()}
+            print(f"🗂️ Project '{project}': {len(df_seen)} records seen in earlier rounds, {len(df)} new", flush=True)
         
         # Parse keywords
+        match_mode = kwargs.get('match_mode', 'substring')
         ta_blacklist = [k.strip() for k in title_abstract_keywords.split('\n') if k.strip()]
         j_blacklist = [k.strip() for k in journal_keywords.split('\n') if k.strip()]
         
-        # Initialize tracking columns
-        df['_EXCLUDED'] = False
+        # Initialize tracking columns (_EXCLUDED is a bool mask)
+        df['_EXCLUDED'] = np.zeros(len(df), dtype=bool)
         df['_EXCLUSION_REASON'] = ''
         
         stats = {
@@ -712,106 +417,58 @@ def screen_literature_task(task_id, df, title_abstract_keywords, journal_keyword
             'title_abstract_excluded': 0,
             'journal_excluded': 0,
             'ai_excluded': 0,
-            'deduplication': dedup_info
+            'ai_cache_hits': 0,
+            'ai_errors': 0,
+            'ai_retries': 0,
+            'ai_rate_limited': 0,
+            'match_mode': match_mode,
+            'deduplication': dedup_info,
+            'previously_seen': int(len(df_seen)) if df_seen is not None else None,
+            # Per-file parse report: filename, rows, seconds
+            'files': kwargs.get('file_stats', []),
+            # Corpus memory before/after dtype compaction (bytes_before, bytes_after, bytes_saved, columns)
+            'memory': kwargs.get('memory_stats')
         }
         
         tasks[task_id]['message'] = 'Keyword Screening...'
 
-        # 记录关键词筛选开始时间
-        keyword_start_time = time_module.time()
-        keyword_processed = 0
         total_for_keyword = len(df)
-
-        # Helper function to add log entry
-        def add_screening_log(idx, row, title_col, status, reason=''):
-            """Add a log entry for screening progress."""
-            nonlocal keyword_processed
-            # Get title for display (try multiple column names)
-            title = ''
-            if title_col and title_col in row:
-                title = str(row.get(title_col, ''))[:100]
-            elif 'TI' in row:
-                title = str(row.get('TI', ''))[:100]
-            elif 'Title' in row:
-                title = str(row.get('Title', ''))[:100]
-
-            log_entry = {
-                'idx': int(idx),
-                'title': title,
-                'status': status,  # 'kept' or 'excluded'
-                'reason': reason,
-                'timestamp': None  # 可以后续添加时间戳
-            }
-
-            # Limit log size to last 500 entries
-            log = tasks[task_id].get('screening_log', [])
-            log.append(log_entry)
-            if len(log) > 500:
-                log = log[-500:]
-            tasks[task_id]['screening_log'] = log
-            tasks[task_id]['screening_log_count'] = tasks[task_id].get('screening_log_count', 0) + 1
-            keyword_processed += 1
-
-            # 更新关键词筛选进度和预估时间
-            progress_pct = int((keyword_processed / total_for_keyword) * 100)
-            tasks[task_id]['progress'] = progress_pct
-
-            # 计算预估剩余时间（精确到秒）
-            elapsed = time_module.time() - keyword_start_time
-            if keyword_processed > 0 and elapsed > 0:
-                speed = keyword_processed / elapsed
-                tasks[task_id]['speed'] = speed
-                remaining = total_for_keyword - keyword_processed
-                if remaining > 0 and speed > 0:
-                    remaining_seconds = remaining / speed
-                    if remaining_seconds < 60:
-                        remaining_str = f"{int(remaining_seconds)}秒"
-                    elif remaining_seconds < 3600:
-                        mins = int(remaining_seconds / 60)
-                        secs = int(remaining_seconds % 60)
-                        remaining_str = f"{mins}分{secs}秒"
-                    else:
-                        hours = int(remaining_seconds / 3600)
-                        mins = int((remaining_seconds % 3600) / 60)
-                        secs = int(remaining_seconds % 60)
-                        remaining_str = f"{hours}小时{mins}分{secs}秒"
-                    tasks[task_id]['message'] = f"关键词筛选: {keyword_processed}/{total_for_keyword}, 剩余约 {remaining_str}"
-
-        # --- Step 1: Keyword Screening ---
-        for idx, row in df.iterrows():
-            exclusion_reasons = []
-
-            # Check Title
-            if title_col:
-                is_excluded, keyword = contains_blacklisted_keyword(row[title_col], ta_blacklist)
-                if is_excluded:
-                    exclusion_reasons.append(f"Title: '{keyword}'")
-
-            # Check Abstract
-            if abstract_col:
-                is_excluded, keyword = contains_blacklisted_keyword(row[abstract_col], ta_blacklist)
-                if is_excluded:
-                    exclusion_reasons.append(f"Abstract: '{keyword}'")
-
-            if exclusion_reasons:
-                stats['title_abstract_excluded'] += 1
-
-            # Check Source/Journal
-            if source_col:
-                is_excluded, keyword = contains_blacklisted_keyword(row[source_col], j_blacklist)
-                if is_excluded:
-                    exclusion_reasons.append(f"Journal: '{keyword}'")
-                    if len(exclusion_reasons) == 1:
-                        stats['journal_excluded'] += 1
-
-            if exclusion_reasons:
-                df.at[idx, '_EXCLUDED'] = True
-                df.at[idx, '_EXCLUSION_REASON'] = ' | '.join(exclusion_reasons)
+        keyword_progress = ProgressTracker(tasks[task_id], total_for_keyword, '关键词筛选')
+
+        def display_title(value):
+            """Title text shown in the screening log."""
+            return str(value)[:100] if title_col else ''
+
+        # 分片进度回调（多进程模式下每完成一个分片更新一次）
+        def report_shard_progress(shards_done, shards_total, rows_done):
+            tasks[task_id]['progress'] = int((rows_done / total_for_keyword) * 100) if total_for_keyword else 100
+            tasks[task_id]['message'] = f"关键词筛选: 分片 {shards_done}/{shards_total}, 已处理 {rows_done}/{total_for_keyword}"
+
+        # --- Step 1: Keyword Screening (vectorized, sharded across processes if workers > 1) ---
+        keyword_workers = kwargs.get('keyword_workers', 1)
+        excluded, reasons, keyword_counts = screen_keywords_parallel(
+            df, title_col, abstract_col, source_col, ta_blacklist, j_blacklist,
+            workers=keyword_workers, progress_callback=report_shard_progress, match_mode=match_mode
+        )
+        df['_EXCLUDED'] = excluded
+        df['_EXCLUSION_REASON'] = reasons
+        stats['title_abstract_excluded'] = keyword_counts['title_abstract_excluded']
+        stats['journal_excluded'] = keyword_counts['journal_excluded']
+
+        # Only the last LOG_SIZE records can remain in the ring buffer, so earlier
+        # records are counted in bulk without building log entries
+        tail_start = max(total_for_keyword - LOG_SIZE, 0)
+        keyword_progress.advance(tail_start, logged=tail_start)
+        titles = df[title_col].iloc[tail_start:].tolist() if title_col else [''] * (total_for_keyword - tail_start)
+        for idx, title, is_excluded, reason in zip(df.index[tail_start:], titles,
+                                                   excluded[tail_start:], reasons[tail_start:]):
+            if is_excluded:
                 # 添加排除日志
-                add_screening_log(idx, row, title_col, 'excluded', ' | '.join(exclusion_reasons))
+                keyword_progress.log(idx, display_title(title), 'excluded', reason)
             else:
                 # 添加保留日志
-                add_screening_log(idx, row, title_col, 'kept', 'Passed keyword screening')
+                keyword_progress.log(idx, display_title(title), 'kept', 'Passed keyword screening')
+        keyword_progress.flush()
 
         # 关键词筛选完成，重置AI筛选的计数
         tasks[task_id]['processed_count'] = 0
@@ -820,221 +477,107 @@ def screen_literature_task(task_id, df, title_abstract_keywords, journal_keyword
         # --- Step 2: AI Screening (Optional) ---
         if api_key and ai_criteria:
             try:
-                import json
-                import httpx
-                
                 tasks[task_id]['message'] = 'Connecting to AI...'
                 
                 # Determine which AI model to use
                 ai_model = kwargs.get('ai_model', 'deepseek')  # Default to deepseek
-                
-                if ai_model == 'minimax':
-                    # Use MiniMax-M2 with Anthropic SDK
-                    import anthropic
-                    import os
-                    
-                    # Set base URL for MiniMax
-                    os.environ['ANTHROPIC_BASE_URL'] = 'https://api.minimaxi.com/anthropic'
-                    os.environ['ANTHROPIC_API_KEY'] = api_key
-                    
-                    client = anthropic.Anthropic(
-                        timeout=httpx.Timeout(60.0, connect=10.0)  # 60s total, 10s connect
-                    )
-                    model_name = "MiniMax-M2.1"
-                    print(f"🤖 Using MiniMax-M2.1 model via Anthropic SDK", flush=True)
-                else:
-                    # Use DeepSeek with OpenAI SDK (default)
-                    from openai import OpenAI
-                    import httpx
-                    
-                    client = OpenAI(
-                        api_key=api_key, 
-                        base_url="https://api.deepseek.com",
-                        timeout=httpx.Timeout(60.0, connect=10.0)  # 60s total, 10s connect
-                    )
-                    model_name = "deepseek-chat"
-                    print(f"🤖 Using DeepSeek model", flush=True)
+                ai_concurrency = kwargs.get('ai_concurrency', 1)
+                ai_batch_size = kwargs.get('ai_batch_size', 1)
+                base_url = app.config['MINIMAX_BASE_URL'] if ai_model == 'minimax' else app.config['DEEPSEEK_BASE_URL']
+                client, model_name = create_ai_client(ai_model, api_key, base_url, app.config['AI_REQUEST_TIMEOUT'])
+                provider = 'MINIMAX' if ai_model == 'minimax' else 'DEEPSEEK'
+                rate_controller = RateController(ai_concurrency, app.config[f'{provider}_RPM'],
+                                                 app.config[f'{provider}_TPM'])
                 
                 # Only screen papers that passed the keyword filter
-                candidates = df[df['_EXCLUDED'] == False]
+                candidates = df[~df['_EXCLUDED']]
                 total_candidates = len(candidates)
                 
-                print(f"🤖 Starting AI Screening for {total_candidates} papers...", flush=True)
-
-                # AI 筛选开始时间
-                ai_start_time = time_module.time()
-                ai_processed = 0
-
-                for i, (idx, row) in enumerate(candidates.iterrows()):
-                    # Check if task was cancelled
-                    if tasks[task_id].get('cancelled', False):
-                        print(f"🛑 AI Screening cancelled at {i}/{total_candidates}", flush=True)
-                        break
-                    
-                    # Update progress
-                    progress_pct = int((i / total_candidates) * 100)
-                    tasks[task_id]['progress'] = progress_pct
-
-                    # 更新处理速度和剩余时间
-                    ai_processed = i + 1
-                    tasks[task_id]['processed_count'] = ai_processed
-
-                    # 计算 AI 筛选的预估剩余时间
-                    elapsed = time_module.time() - ai_start_time
-                    if ai_processed > 0 and elapsed > 0:
-                        speed = ai_processed / elapsed
-                        tasks[task_id]['speed'] = speed
-                        remaining = total_candidates - ai_processed
-                        if remaining > 0 and speed > 0:
-                            remaining_seconds = remaining / speed
-                            if remaining_seconds < 60:
-                                remaining_str = f"{int(remaining_seconds)}秒"
-                            elif remaining_seconds < 3600:
-                                mins = int(remaining_seconds / 60)
-                                secs = int(remaining_seconds % 60)
-                                remaining_str = f"{mins}分{secs}秒"
-                            else:
-                                hours = int(remaining_seconds / 3600)
-                                mins = int((remaining_seconds % 3600) / 60)
-                                secs = int(remaining_seconds % 60)
-                                remaining_str = f"{hours}小时{mins}分{secs}秒"
-                            tasks[task_id]['message'] = f"AI筛选: {ai_processed}/{total_candidates}, 剩余约 {remaining_str}"
-                    
-                    title = row[title_col] if title_col else "N/A"
-                    abstract = row[abstract_col] if abstract_col else "N/A"
-                    
-                    prompt = f"""Screen this paper against exclusion criteria. Return JSON only.
-
-EXCLUSION CRITERIA:
-{ai_criteria}
-
-PAPER:
-Title: {title}
-Abstract: {abstract}
-
-RULES:
-- If paper matches exclusion criteria → exclude=true
-- If uncertain → exclude=true (be strict)
-- Reason must be ≤12 words
-
-JSON format:
-{{"exclude": true/false, "reason": "brief reason"}}"""
-                    
-                    try:
-                        if ai_model == 'minimax':
-                            # MiniMax-M2 API call with retry mechanism
-                            max_retries = 3
-                            result = None
-                            
-                            for attempt in range(max_retries):
-                                try:
-                                    response = client.messages.create(
-                                        model="MiniMax-M2.1",
-                                        max_tokens=2000,  # Increased to prevent thinking truncation
-                                        system="You are a paper screening assistant. Output ONLY valid JSON: {\"exclude\": true/false, \"reason\": \"text\"}. Be concise.",
-                                        messages=[
-                                            {
-                                                "role": "user",
-                                                "content": [
-                                                    {
-                                                        "type": "text",
-                                                        "text": prompt
-                                                    }
-                                                ]
-                                            }
-                                        ]
-                                    )
-                                except (httpx.TimeoutException, httpx.ConnectTimeout) as te:
-                                    if attempt < max_retries - 1:
-                                        import time
-                                        wait_time = (attempt + 1) * 5
-                                        print(f"   ⚠️ Timeout (attempt {attempt+1}/{max_retries}), retrying in {wait_time}s...", flush=True)
-                                        time.sleep(wait_time)
-                                        continue
-                                    else:
-                                        raise te
-                                
-                                # Extract text from response blocks (skip 'thinking' blocks)
-                                result_text = ""
-                                for block in response.content:
-                                    if block.type == "text":
-                                        result_text += block.text
-                                
-                                # If we got text content, parse it and break
-                                if result_text.strip():
-                                    try:
-                                        result = json.loads(result_text)
-                                        break
-                                    except json.JSONDecodeError as je:
-                                        if attempt < max_retries - 1:
-                                            print(f"   ⚠️ JSON parse error (attempt {attempt+1}/{max_retries}), retrying...", flush=True)
-                                            continue
-                                        else:
-                                            raise je
-                                elif attempt < max_retries - 1:
-                                    print(f"   ⚠️ Empty response (attempt {attempt+1}/{max_retries}), retrying...", flush=True)
-                                    continue
-                            
-                            # If still no result after retries, raise error
-                            if result is None:
-                                raise ValueError("MiniMax-M2.1 failed to return valid response after retries")
-                            
-                            # Now we have a valid result
-                        else:
-                            # DeepSeek API call with OpenAI SDK + retry
-                            max_retries = 3
-                            result = None
-                            
-                            for attempt in range(max_retries):
-                                try:
-                                    response = client.chat.completions.create(
-                                        model="deepseek-chat",
-                                        messages=[
-                                            {"role": "system", "content": "You are a paper screening assistant. Output ONLY valid JSON: {\"exclude\": true/false, \"reason\": \"text\"}. Be concise."},
-                                            {"role": "user", "content": prompt}
-                                        ],
-                                        response_format={"type": "json_object"},
-                                        temperature=0.0
-                                    )
-                                    
-                                    result = json.loads(response.choices[0].message.content)
-                                    break
-                                except (httpx.TimeoutException, httpx.ConnectTimeout) as te:
-                                    if attempt < max_retries - 1:
-                                        import time
-                                        wait_time = (attempt + 1) * 5  # 5s, 10s backoff
-                                        print(f"   ⚠️ Timeout (attempt {attempt+1}/{max_retries}), retrying in {wait_time}s...", flush=True)
-                                        time.sleep(wait_time)
-                                        continue
-                                    else:
-                                        raise te
-                                except json.JSONDecodeError as je:
-                                    if attempt < max_retries - 1:
-                                        print(f"   ⚠️ JSON parse error (attempt {attempt+1}/{max_retries}), retrying...", flush=True)
-                                        continue
-                                    else:
-                                        raise je
-                            
-                            if result is None:
-                                raise ValueError("DeepSeek failed to return valid response after retries")
-                        
-                        if result.get('exclude', False):
-                            df.at[idx, '_EXCLUDED'] = True
-                            df.at[idx, '_EXCLUSION_REASON'] = f"AI: {result.get('reason', 'Criteria matched')}"
-                            stats['ai_excluded'] += 1
-                            print(f"   ❌ Excluded: {result.get('reason', 'Criteria matched')}", flush=True)
-                            # 添加 AI 排除日志
-                            add_screening_log(idx, row, title_col, 'excluded', f"AI: {result.get('reason', 'Criteria matched')}")
-                        else:
-                            print(f"   ✅ Kept: {result.get('reason', 'Passed screening')}", flush=True)
-                            # 添加 AI 保留日志
-                            add_screening_log(idx, row, title_col, 'kept', f"AI: {result.get('reason', 'Passed')}")
-                            
-                    except Exception as e:
-                        print(f"   ⚠️ AI Error for row {idx}: {e}", flush=True)
-                        continue
+                print(f"🤖 Starting AI Screening for {total_candidates} papers ({ai_concurrency} concurrent requests, {ai_batch_size} papers per request)...", flush=True)
+
+                ai_progress = ProgressTracker(tasks[task_id], total_candidates, 'AI筛选', track_processed=True)
+
+                # (row id, title, abstract) per candidate
+                papers = [
+                    (idx, row[title_col] if title_col else "N/A", row[abstract_col] if abstract_col else "N/A")
+                    for idx, row in candidates.iterrows()
+                ]
+
+                def record_ai_result(paper, result):
+                    idx, title, _ = paper
+                    title = display_title(title if title_col else '')
+                    # 更新进度、处理速度和剩余时间（节流上报）
+                    ai_progress.advance()
+                    if result.get('exclude', False):
+                        df.at[idx, '_EXCLUDED'] = True
+                        df.at[idx, '_EXCLUSION_REASON'] = f"AI: {result.get('reason', 'Criteria matched')}"
+                        stats['ai_excluded'] += 1
+                        print(f"   ❌ Excluded: {result.get('reason', 'Criteria matched')}", flush=True)
+                        # 添加 AI 排除日志
+                        ai_progress.log(idx, title, 'excluded', f"AI: {result.get('reason', 'Criteria matched')}", advance=False)
+                    else:
+                        print(f"   ✅ Kept: {result.get('reason', 'Passed screening')}", flush=True)
+                        # 添加 AI 保留日志
+                        ai_progress.log(idx, title, 'kept', f"AI: {result.get('reason', 'Passed')}", advance=False)
+
+                def record_ai_error(paper, e):
+                    ai_progress.advance()
+                    stats['ai_errors'] += 1
+                    print(f"   ⚠️ AI Error for row {paper[0]}: {e}", flush=True)
+
+                # 先查本地缓存，只把未命中的文献发送给模型
+                ai_cache = get_cache(app.config['AI_CACHE_PATH'], app.config['AI_CACHE_MAX_ENTRIES'],
+                                     app.config['AI_CACHE_MAX_AGE_DAYS'])
+                if ai_cache is not None:
+                    cached = ai_cache.get_many(model_name, ai_criteria, papers)
+                    stats['ai_cache_hits'] = len(cached)
+                    if cached:
+                        print(f"💾 AI cache: {len(cached)}/{total_candidates} papers answered from cache", flush=True)
+                        for paper in papers:
+                            if paper[0] in cached:
+                                record_ai_result(paper, cached[paper[0]])
+                        papers = [paper for paper in papers if paper[0] not in cached]
+
+                    def record_and_cache(paper, result):
+                        ai_cache.put(model_name, ai_criteria, paper[1], paper[2], result)
+                        record_ai_result(paper, result)
+                else:
+                    record_and_cache = record_ai_result
+
+                is_cancelled = lambda: tasks[task_id].get('cancelled', False)
+                if ai_batch_size > 1:
+                    # 批量模式：每个请求包含多篇文献
+                    completed, cancelled = run_batched(
+                        papers,
+                        lambda batch: screen_batch(client, ai_model, ai_criteria, batch, rate_controller),
+                        lambda pending: make_batches(pending, ai_criteria, ai_batch_size, app.config['AI_BATCH_TOKENS']),
+                        ai_concurrency,
+                        record_and_cache,
+                        record_ai_error,
+                        is_cancelled,
+                        limit=rate_controller.limit,
+                    )
+                else:
+                    completed, cancelled = run_concurrent(
+                        papers,
+                        lambda paper: screen_paper(client, ai_model, build_prompt(ai_criteria, paper[1], paper[2]),
+                                                   rate_controller),
+                        ai_concurrency,
+                        record_and_cache,
+                        record_ai_error,
+                        is_cancelled,
+                        limit=rate_controller.limit,
+                    )
+                ai_progress.flush()
+                stats['ai_retries'] = rate_controller.retries
+                stats['ai_rate_limited'] = rate_controller.rate_limited
+                if ai_cache is not None:
+                    ai_cache.evict()
                 
-                print("🤖 AI Screening Completed.", flush=True)
+                if cancelled:
+                    print(f"🛑 AI Screening cancelled at {stats['ai_cache_hits'] + completed}/{total_candidates}", flush=True)
+                else:
+                    print("🤖 AI Screening Completed.", flush=True)
                         
             except Exception as e:
                 print(f"❌ AI Setup Error: {e}", flush=True)
@@ -1042,19 +585,25 @@ JSON format:
                 # For now, let's just log it and finish.
 
         # Split dataframes
-        df_kept = df[df['_EXCLUDED'] == False].drop(columns=['_EXCLUDED', '_EXCLUSION_REASON'])
-        df_removed = df[df['_EXCLUDED'] == True].copy()
+        df_kept = df[~df['_EXCLUDED']].drop(columns=['_EXCLUDED', '_EXCLUSION_REASON'])
+        df_removed = df[df['_EXCLUDED']].copy()
         df_removed = df_removed.rename(columns={'_EXCLUSION_REASON': 'Exclusion_Reason'})
         df_removed = df_removed.drop(columns=['_EXCLUDED'])
         
         stats['kept'] = len(df_kept)
         stats['excluded'] = len(df_removed)
+
+        # Remember this round's records (kept and excluded) for the next upload of the project
+        if corpus_index is not None:
+            corpus_index.add(project, fingerprints)
         
         # Store dataframes directly for later format conversion
         tasks[task_id]['result'] = {
             'stats': stats,
             'df_kept': df_kept,
             'df_removed': df_removed,
+            'df_duplicates': df_duplicates,
+            'df_seen': df_seen,
             'timestamp': datetime.now().strftime("%Y%m%d_%H%M%S"),
             'title_col': title_col,
             'abstract_col': abstract_col,
@@ -1070,6 +619,72 @@ JSON format:
         tasks[task_id]['error'] = str(e)
 
 
+def ingest_and_screen_task(task_id, uploads, title_abstract_keywords, journal_keywords, api_key=None,
+                           ai_criteria=None, remove_duplicates_flag=False, preferred_source='', **kwargs):
+    """Background task: parse the spooled uploads, then screen the merged records."""
+    task = tasks[task_id]
+    member_paths = []
+    try:
+        task['status'] = 'processing'
+        task['progress'] = 0
+        task['message'] = 'Parsing files...'
+
+        # Archives (.zip, .tar.gz, .gz) are streamed into one spooled upload per member
+        files, member_paths = expand_uploads(uploads, app.config['UPLOAD_SPOOL_DIR'],
+                                             int(app.config['MAX_ARCHIVE_MB'] * 1024 * 1024))
+
+        def report_file_progress(files_done, files_total, rows_parsed):
+            task['progress'] = int((files_done / files_total) * 100)
+            task['message'] = f"文件解析: 文件 {files_done}/{files_total}, 已解析 {rows_parsed} 条记录"
+
+        # Parse and standardize all files (concurrently for larger uploads), then merge once
+        reports = ingest_uploads(files, workers=app.config['INGEST_WORKERS'], on_progress=report_file_progress)
+        file_stats = [{key: report[key] for key in ('filename', 'rows', 'seconds', 'error')} for report in reports]
+        task['files'] = file_stats
+        errors = [report['error'] for report in reports if report['error']]
+        if errors:
+            raise ValueError('\n\n'.join(errors))
+        dfs = [report['df'] for report in reports]
+        df_sources = [report['filename'] for report in reports]  # Upload filename of each parsed DataFrame
+
+        # Merge all dataframes
+        df = pd.concat(dfs, ignore_index=True)
+        del dfs[:], reports[:]  # The merged frame is the only copy kept
+        print(f"Merged {len(df_sources)} files. Total rows: {len(df)}", flush=True)
+
+        # Categoricals for repetitive fields, nullable integer years (see dtype_compaction.py)
+        df, memory_stats = compact_dtypes(df)
+
+        # Per-row source preference for the 'preferred_source' keep policy:
+        # the chosen file (or all members of the chosen archive) first, then the other files in upload order
+        file_ranks = [0 if name == preferred_source or name.startswith(f'{preferred_source}/') else i + 1
+                      for i, name in enumerate(df_sources)]
+        source_rank = np.repeat(file_ranks, [stat['rows'] for stat in file_stats])
+    except Exception as e:
+        print(f"❌ Task Error: {e}", flush=True)
+        task['status'] = 'error'
+        task['error'] = str(e)
+        return
+    finally:
+        for _, path in uploads:
+            remove_spool(path)
+        for path in member_paths:
+            remove_spool(path)
+
+    if task.get('cancelled'):
+        return
+    screen_literature_task(task_id, df, title_abstract_keywords, journal_keywords, api_key, ai_criteria,
+                           remove_duplicates_flag, source_rank=source_rank, file_stats=file_stats,
+                           memory_stats=memory_stats, **kwargs)
+
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    """JSON error for uploads over MAX_CONTENT_LENGTH."""
+    limit_mb = app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024)
+    return jsonify({'error': f'Upload too large: the limit is {limit_mb:g} MB (set MAX_UPLOAD_MB to raise it)'}), 413
+
+
 @app.route('/')
 def index():
     """Serve the main page."""
@@ -1099,269 +714,38 @@ def screen():
         api_key = request.form.get('api_key', '').strip()
         ai_criteria = request.form.get('ai_criteria', '').strip()
         ai_model = request.form.get('ai_model', 'deepseek').strip()  # Get selected model
-        
-        # Read and merge files
-        dfs = []
-        
-        # WoS to Standard Field Mapping (标准字段名: TI, AB, KW, PY, TY, LA, T2/J2, AU)
-        WOS_MAPPING = {
-            'TI': 'TI',           # Title -> TI
-            'AB': 'AB',           # Abstract -> AB
-            'AU': 'AU',           # Authors -> AU
-            'SO': 'T2',           # Source title -> T2
-            'PY': 'PY',           # Year -> PY
-            'DE': 'KW',           # Author Keywords -> KW
-            'ID': 'KW',           # Keywords Plus -> KW (also merge with DE)
-            'DI': 'DO',           # DOI -> DO
-            'DT': 'TY',           # Document Type -> TY
-            'CR': 'References',
-            'C1': 'Affiliations',
-            'TC': 'Cited by',
-            'SN': 'ISSN',
-            'EI': 'EISSN',
-            'LA': 'LA',           # Language -> LA
-            'J2': 'T2',           # Journal Name -> T2
-            'T2': 'T2',           # Journal Name -> T2
-        }
-
-        for file in files:
-            filename = file.filename.lower()
-            try:
-                if filename.endswith('.xlsx'):
-                    df = pd.read_excel(file, engine='openpyxl')
-                elif filename.endswith('.xls'):
-                    df = pd.read_excel(file, engine='xlrd')
-                elif filename.endswith('.ris'):
-                    # RIS file support
-                    content = file.read()
-                    df = parse_ris_file(content)
-                    print(f"   Parsed RIS file: {filename}, {len(df)} records", flush=True)
-                elif filename.endswith('.bib'):
-                    # BibTeX file support
-                    content = file.read()
-                    df = parse_bibtex_file(content)
-                    print(f"   Parsed BibTeX file: {filename}, {len(df)} records", flush=True)
-                elif filename.endswith('.rtf'):
-                    # RTF file support
-                    content = file.read()
-                    df = parse_rtf_file(content)
-                    print(f"   Parsed RTF file: {filename}, {len(df)} records", flush=True)
-                elif filename.endswith('.csv') or filename.endswith('.txt'):
-                    # WoS exports often come as tab-delimited .txt or .csv
-                    content = file.read()
-                    
-                    # Auto-detect RIS format in TXT files
-                    try:
-                        # Try multiple encodings to decode
-                        preview = None
-                        for enc in ['utf-8-sig', 'utf-8', 'latin-1']:
-                            try:
-                                preview = content.decode(enc, errors='ignore')[:2000]
-                                break
-                            except:
-                                continue
-                        
-                        if preview:
-                            # Remove BOM and check for RIS markers
-                            preview_clean = preview.lstrip('\ufeff').strip()
-                            # Check for RIS format indicators
-                            has_ris_start = preview_clean.startswith('TY  -') or preview_clean.startswith('TY -')
-                            has_ris_markers = 'TY  -' in preview or 'ER  -' in preview
-                            has_ris_fields = ('AB  -' in preview or 'TI  -' in preview) and 'ER  -' in preview
-                            
-                            print(f"   File format detection: has_ris_start={has_ris_start}, has_ris_markers={has_ris_markers}, has_ris_fields={has_ris_fields}", flush=True)
-                            
-                            if has_ris_start or has_ris_fields:
-                                print(f"   ✓ Detected RIS format in {filename}, parsing as RIS...", flush=True)
-                                df = parse_ris_file(content)
-                                if df is not None and len(df) > 0:
-                                    print(f"   ✓ Successfully parsed RIS file: {filename}, {len(df)} records", flush=True)
-                                    dfs.append(df)
-                                    continue
-                                else:
-                                    print(f"   ✗ RIS parsing returned empty, trying CSV...", flush=True)
-                    except Exception as e:
-                        print(f"   ✗ RIS detection/parsing failed: {str(e)[:100]}, trying CSV...", flush=True)
-                    
-                    # Try different parsing strategies
-                    df = None
-                    parse_error = None
-                    best_df = None
-                    best_score = 0
-                    
-                    # Strategy 1: Tab-delimited with error handling (for WoS/Scopus exports)
-                    # Extended encoding list including Windows and Mac formats
-                    encodings_to_try = [
-                        'utf-8', 'utf-8-sig',  # Standard UTF-8
-                        'latin-1', 'iso-8859-1',  # Western European
-                        'cp1252', 'windows-1252',  # Windows Western
-                        'gbk', 'gb18030',  # Chinese
-                        'utf-16', 'utf-16-le', 'utf-16-be',  # UTF-16 variants
-                        'ascii'  # Pure ASCII fallback
-                    ]
-                    
-                    for encoding in encodings_to_try:
-                        try:
-                            test_df = pd.read_csv(
-                                io.BytesIO(content), 
-                                sep='\t', 
-                                encoding=encoding,
-                                on_bad_lines='skip',  # Skip problematic lines
-                                engine='python',  # More flexible parser
-                                quoting=3,  # QUOTE_NONE - don't interpret quotes
-                                escapechar='\\',
-                                encoding_errors='ignore'  # Ignore encoding errors
-                            )
-                            # Calculate score: prefer more columns and presence of known fields
-                            score = len(test_df.columns)
-                            if 'TI' in test_df.columns or 'Title' in test_df.columns:
-                                score += 100
-                            if 'AB' in test_df.columns or 'Abstract' in test_df.columns:
-                                score += 50
-                            if 'SO' in test_df.columns or 'Source title' in test_df.columns or 'Source Title' in test_df.columns:
-                                score += 30
-                            
-                            print(f"   Tab-delimited ({encoding}): {len(test_df)} rows, {len(test_df.columns)} cols, score={score}", flush=True)
-                            
-                            if score > best_score and len(test_df.columns) > 2:
-                                best_df = test_df
-                                best_score = score
-                                df = test_df
-                        except Exception as e:
-                            parse_error = str(e)
-                            # Don't print every failure, only important ones
-                            if 'utf-8' in encoding or 'latin' in encoding:
-                                print(f"   Tab-delimited ({encoding}): Failed - {str(e)[:80]}", flush=True)
-                            continue
-                    
-                    # Strategy 2: Comma-delimited fallback (only if tab-delimited didn't work well)
-                    if best_score < 50:  # Only try comma if no good tab result
-                        for encoding in encodings_to_try:
-                            try:
-                                test_df = pd.read_csv(
-                                    io.BytesIO(content),
-                                    encoding=encoding,
-                                    on_bad_lines='skip',
-                                    engine='python',
-                                    encoding_errors='ignore'
-                                )
-                                # Calculate score
-                                score = len(test_df.columns)
-                                if 'TI' in test_df.columns or 'Title' in test_df.columns:
-                                    score += 100
-                                if 'AB' in test_df.columns or 'Abstract' in test_df.columns:
-                                    score += 50
-                                
-                                print(f"   Comma-delimited ({encoding}): {len(test_df)} rows, {len(test_df.columns)} cols, score={score}", flush=True)
-                                
-                                if score > best_score and len(test_df.columns) > 2:
-                                    best_df = test_df
-                                    best_score = score
-                                    df = test_df
-                            except Exception as e:
-                                parse_error = str(e)
-                                continue
-                    
-                    # If still no good result, the file might have issues
-                    if df is None or len(df) == 0 or len(df.columns) <= 1:
-                        error_msg = f'无法正确解析文件: {file.filename}。'
-                        if len(df.columns) <= 1:
-                            # Show first few lines for debugging
-                            try:
-                                preview = content.decode('utf-8', errors='ignore')[:500]
-                                error_msg += f'\n\n文件似乎不是标准的CSV/TXT格式（只检测到{len(df.columns)}列）。'
-                                error_msg += f'\n\n💡 建议：'
-                                error_msg += f'\n1. 如果是从Excel导出的，请直接上传.xlsx文件'
-                                error_msg += f'\n2. 如果是WoS/Scopus导出，请确保选择"制表符分隔"格式'
-                                error_msg += f'\n3. 检查文件是否包含完整的文献数据（标题、摘要等列）'
-                                print(f"\n⚠️  File parsing issue for {file.filename}:", flush=True)
-                                print(f"   Columns detected: {len(df.columns)}", flush=True)
-                                print(f"   Rows: {len(df)}", flush=True)
-                                print(f"   First column name: {df.columns[0] if len(df.columns) > 0 else 'N/A'}", flush=True)
-                                print(f"   File preview: {preview[:200]}...", flush=True)
-                            except:
-                                pass
-                        elif parse_error:
-                            error_msg += f' (错误: {parse_error})'
-                        return jsonify({'error': error_msg}), 400
-                    
-                    # Sanity check: warn if too many rows (likely parsing error)
-                    if len(df) > 50000:
-                        print(f"   ⚠️  WARNING: Parsed {len(df)} rows - this seems unusually large!", flush=True)
-                        print(f"   File might be improperly formatted. Columns found: {list(df.columns[:10])}", flush=True)
-                else:
-                    return jsonify({'error': f'Unsupported file format: {file.filename}'}), 400
-                
-                # Standardize Columns
-                # Check if it looks like WoS (has TI and SO)
-                if 'TI' in df.columns and 'SO' in df.columns:
-                    print(f"   Detected WoS format for {filename}, standardizing...", flush=True)
-                    df = df.rename(columns=WOS_MAPPING)
-
-                # Add standard field names if not exist (标准字段名: TI, AB, KW, PY, TY, LA, T2/J2, AU)
-                # Map standard field names to legacy names for frontend compatibility
-                standard_to_legacy = {
-                    'TI': 'Title',
-                    'AB': 'Abstract',
-                    'AU': 'Authors',
-                    'T2': 'Source title',
-                    'PY': 'Year',
-                    'KW': 'Keywords',
-                    'DO': 'DOI',
-                    'TY': 'Type',
-                    'UR': 'URL',
-                    'LA': 'Language',
-                }
-
-                for std_col, legacy_col in standard_to_legacy.items():
-                    if std_col in df.columns and legacy_col not in df.columns:
-                        df[legacy_col] = df[std_col]
-
-                # Ensure essential columns exist (for compatibility)
-                required_cols = ['Title', 'Abstract', 'Source title']
-                for col in required_cols:
-                    if col not in df.columns:
-                        # Try case-insensitive match
-                        found = False
-                        for existing_col in df.columns:
-                            if existing_col.lower() == col.lower():
-                                df = df.rename(columns={existing_col: col})
-                                found = True
-                                break
-                        if not found:
-                            df[col] = '' # Create empty if missing
-
-                # Also ensure standard columns exist if legacy columns present
-                legacy_to_standard = {
-                    'Title': 'TI',
-                    'Abstract': 'AB',
-                    'Authors': 'AU',
-                    'Source title': 'T2',
-                    'Year': 'PY',
-                    'Keywords': 'KW',
-                    'DOI': 'DO',
-                    'Type': 'TY',
-                    'URL': 'UR',
-                    'Language': 'LA',
-                }
-
-                for legacy_col, std_col in legacy_to_standard.items():
-                    if legacy_col in df.columns and std_col not in df.columns:
-                        df[std_col] = df[legacy_col]
-                
-                dfs.append(df)
-            except Exception as e:
-                return jsonify({'error': f'Error reading file {file.filename}: {str(e)}'}), 400
-        
-        if not dfs:
-            return jsonify({'error': 'No valid files processed'}), 400
-            
-        # Merge all dataframes
-        df = pd.concat(dfs, ignore_index=True)
-        print(f"Merged {len(dfs)} files. Total rows: {len(df)}", flush=True)
+        try:
+            keyword_workers = int(request.form.get('keyword_workers', app.config['SCREENING_WORKERS']))
+        except ValueError:
+            keyword_workers = app.config['SCREENING_WORKERS']
+        keyword_workers = max(1, min(keyword_workers, os.cpu_count() or 1))
+        try:
+            ai_concurrency = int(request.form.get('ai_concurrency', app.config['AI_CONCURRENCY']))
+        except ValueError:
+            ai_concurrency = app.config['AI_CONCURRENCY']
+        ai_concurrency = max(1, min(ai_concurrency, MAX_AI_CONCURRENCY))
+        try:
+            ai_batch_size = int(request.form.get('ai_batch_size', app.config['AI_BATCH_SIZE']))
+        except ValueError:
+            ai_batch_size = app.config['AI_BATCH_SIZE']
+        ai_batch_size = max(1, min(ai_batch_size, MAX_AI_BATCH_SIZE))
+        match_mode = request.form.get('match_mode', 'substring').strip()
+        if match_mode not in MATCH_MODES:
+            return jsonify({'error': f'Unsupported match mode: {match_mode}'}), 400
+        dedup_method = request.form.get('dedup_method', 'doi_title').strip()
+        if dedup_method not in DEDUP_METHODS:
+            return jsonify({'error': f'Unsupported deduplication method: {dedup_method}'}), 400
+        dedup_keep = request.form.get('dedup_keep', 'first').strip()
+        if dedup_keep not in KEEP_POLICIES:
+            return jsonify({'error': f'Unsupported duplicate keep policy: {dedup_keep}'}), 400
+        preferred_source = request.form.get('preferred_source', '').strip()
+        project = request.form.get('project', '').strip()
         
         # Get deduplication preference
         remove_duplicates_flag = request.form.get('remove_duplicates', 'false').lower() == 'true'
+
+        # Spool the uploads; parsing runs in the background task so the request returns at once
+        uploads = [(file.filename, spool_upload(file.stream, app.config['UPLOAD_SPOOL_DIR'])) for file in files]
         
         # Create task
         task_id = str(uuid.uuid4())
@@ -1370,19 +754,25 @@ def screen():
             'progress': 0,
             'message': 'Queued...',
             'result': None,
-            'screening_log': [],  # 记录每条文献的处理情况
+            'screening_log': ScreeningLog(),  # 记录每条文献的处理情况（环形缓冲）
             'screening_log_count': 0  # 已处理数量，用于限制日志长度
         }
         
         # Start background thread
-        thread = threading.Thread(target=screen_literature_task, 
-                                args=(task_id, df, ta_keywords, journal_keywords, api_key, ai_criteria, remove_duplicates_flag),
-                                kwargs={'ai_model': ai_model})
+        thread = threading.Thread(target=ingest_and_screen_task, 
+                                args=(task_id, uploads, ta_keywords, journal_keywords, api_key, ai_criteria, remove_duplicates_flag),
+                                kwargs={'ai_model': ai_model, 'keyword_workers': keyword_workers,
+                                        'match_mode': match_mode, 'ai_concurrency': ai_concurrency,
+                                        'ai_batch_size': ai_batch_size, 'dedup_method': dedup_method,
+                                        'dedup_keep': dedup_keep, 'preferred_source': preferred_source,
+                                        'project': project})
         thread.daemon = True
         thread.start()
         
         return jsonify({'task_id': task_id})
     
+    except RequestEntityTooLarge:
+        raise  # Answered by upload_too_large
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1402,9 +792,13 @@ def task_status(task_id):
 
     # 添加筛选日志（只返回最近100条）
     if 'screening_log' in task:
-        response['screening_log'] = task['screening_log'][-100:]
+        response['screening_log'] = task['screening_log'].tail(100)
         response['screening_log_count'] = task.get('screening_log_count', 0)
 
+    # Per-file parse report (filename, rows, seconds, error) once the files are parsed
+    if 'files' in task:
+        response['files'] = task['files']
+
     if task['status'] == 'completed':
         response['stats'] = task['result']['stats']
     elif task['status'] == 'error':
@@ -1436,8 +830,14 @@ def download(task_id, dataset, format):
     
     Args:
         task_id: The task identifier
-        dataset: 'cleaned', 'removed', or 'both'
-        format: 'csv', 'xlsx', 'xls', 'txt', or 'ris'
+        dataset: 'cleaned', 'removed', 'duplicates' (duplicate clusters),
+            'seen' (records from earlier project rounds), or 'both'
+        format: 'csv', 'xlsx', 'xls', 'txt', 'ris', 'bib', 'parquet' or
+            'feather' (Arrow IPC; the columnar formats need pyarrow)
+
+    Query args:
+        legacy_columns: '1' to add legacy column names (Title, Abstract, ...)
+            next to the standard tags in table formats
     """
     print(f"📥 Download request: task_id={task_id}, dataset={dataset}, format={format}", flush=True)
     
@@ -1455,13 +855,19 @@ def download(task_id, dataset, format):
         timestamp = result['timestamp']
         df_kept = result['df_kept']
         df_removed = result['df_removed']
-        title_col = result.get('title_col', 'Title')
-        abstract_col = result.get('abstract_col', 'Abstract')
-        source_col = result.get('source_col', 'Source title')
+        df_duplicates = result.get('df_duplicates')
+        df_seen = result.get('df_seen')
+        title_col = result.get('title_col', 'TI')
+        abstract_col = result.get('abstract_col', 'AB')
+        source_col = result.get('source_col', 'T2')
+        # Legacy column names (Title, Abstract, ...) are only added to table exports when asked for
+        legacy_columns = request.args.get('legacy_columns', '').lower() in ('1', 'true')
         
         # Helper function to convert df to requested format
         def df_to_buffer(df, fmt, filename_base):
             buffer = io.BytesIO()
+            if legacy_columns and fmt in ('csv', 'xlsx', 'xls', 'txt', 'parquet', 'feather'):
+                df = with_legacy_columns(df)
             
             if fmt == 'csv':
                 csv_str = df.to_csv(index=False, encoding='utf-8')
@@ -1476,9 +882,8 @@ def download(task_id, dataset, format):
                 filename = f'{filename_base}.xlsx'
                 
             elif fmt == 'xls':
-                # Use xlwt for old Excel format
-                with pd.ExcelWriter(buffer, engine='xlwt') as writer:
-                    df.to_excel(writer, index=False, sheet_name='Sheet1')
+                # Old Excel format, written with xlwt (pandas no longer has an xlwt writer)
+                df_to_xls(df, buffer)
                 mimetype = 'application/vnd.ms-excel'
                 filename = f'{filename_base}.xls'
                 
@@ -1501,6 +906,12 @@ def download(task_id, dataset, format):
                 mimetype = 'application/x-bibtex'
                 filename = f'{filename_base}.bib'
                 
+            elif fmt in COLUMNAR_FORMATS:
+                # Typed columns (Exclusion_Reason included) written from one Arrow table
+                write_columnar(df, fmt, buffer)
+                mimetype = COLUMNAR_MIMETYPES[fmt]
+                filename = f'{filename_base}.{fmt}'
+                
             else:
                 raise ValueError(f"Unsupported format: {fmt}")
             
@@ -1518,6 +929,20 @@ def download(task_id, dataset, format):
             print(f"   Preparing removed data: {filename}", flush=True)
             return send_file(buffer, as_attachment=True, download_name=filename, mimetype=mimetype)
         
+        elif dataset == 'duplicates':
+            if df_duplicates is None:
+                return "Deduplication was not enabled for this task", 404
+            buffer, filename, mimetype = df_to_buffer(df_duplicates, format, f'duplicate_groups_{timestamp}')
+            print(f"   Preparing duplicate groups: {filename}", flush=True)
+            return send_file(buffer, as_attachment=True, download_name=filename, mimetype=mimetype)
+        
+        elif dataset == 'seen':
+            if df_seen is None:
+                return "No project was given for this task", 404
+            buffer, filename, mimetype = df_to_buffer(df_seen, format, f'previously_seen_{timestamp}')
+            print(f"   Preparing previously seen records: {filename}", flush=True)
+            return send_file(buffer, as_attachment=True, download_name=filename, mimetype=mimetype)
+        
         # Download both as ZIP
         elif dataset == 'both':
             print(f"   Preparing ZIP file with format: {format}", flush=True)
@@ -1530,6 +955,16 @@ def download(task_id, dataset, format):
                 # Add removed file
                 buffer_removed, filename_removed, _ = df_to_buffer(df_removed, format, f'removed_data_{timestamp}')
                 zf.writestr(filename_removed, buffer_removed.read())
+                
+                # Add duplicate clusters (only when deduplication found any)
+                if df_duplicates is not None and len(df_duplicates):
+                    buffer_dup, filename_dup, _ = df_to_buffer(df_duplicates, format, f'duplicate_groups_{timestamp}')
+                    zf.writestr(filename_dup, buffer_dup.read())
+                
+                # Add records seen in earlier rounds of the project
+                if df_seen is not None and len(df_seen):
+                    buffer_seen, filename_seen, _ = df_to_buffer(df_seen, format, f'previously_seen_{timestamp}')
+                    zf.writestr(filename_seen, buffer_seen.read())
             
             zip_buffer.seek(0)
             return send_file(zip_buffer, as_attachment=True,
@@ -1539,6 +974,9 @@ def download(task_id, dataset, format):
         print(f"❌ Invalid dataset: {dataset}", flush=True)
         return "Invalid dataset type", 400
         
+    except ColumnarUnavailable as e:
+        print(f"❌ Download Error: {e}", flush=True)
+        return str(e), 501
     except Exception as e:
         print(f"❌ Download Error: {e}", flush=True)
         import traceback
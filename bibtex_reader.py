@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fast BibTeX Reader
+快速 BibTeX 解析
+
+Reads .bib exports without building bibtexparser's pyparsing tree:
+
+- The text is cut into spans at every line that starts with '@' (the
+  same places where bibtexparser starts a new entry, string, preamble
+  or comment); bytes input (e.g. a memory-mapped upload) is decoded one
+  span at a time, so the file is never held as one large str
+- Each span is parsed by a small scanner that follows bibtexparser's
+  grammar and value cleaning (braced / quoted values joined with '#',
+  @string and month macros, repeated fields, non-standard entry types
+  skipped), and entries go straight into per-column lists
+- Span groups can be parsed in parallel through any map() function, e.g.
+  a process pool's (files with @string definitions are parsed in order)
+- If a span is not well-formed (or uses an undefined macro), the whole
+  file is parsed with bibtexparser instead, so results never differ
+"""
+
+import codecs
+import re
+from itertools import chain, islice, repeat
+
+import bibtexparser
+from bibtexparser.bibdatabase import COMMON_STRINGS, STANDARD_TYPES
+
+
+# BibTeX entry type -> document type (BibTeX: entry type -> TY)
+BIBTEX_TYPE_MAPPING = {
+    'article': 'Article',
+    'book': 'Book',
+    'inproceedings': 'Conference',
+    'conference': 'Conference',
+    'incollection': 'Book Chapter',
+    'inbook': 'Book Chapter',
+    'phdthesis': 'Thesis',
+    'mastersthesis': 'Thesis',
+    'techreport': 'Report',
+    'misc': 'Generic',
+}
+
+# Standard columns (标准字段名) plus the extra BibTeX columns
+COLUMNS = ('TI', 'AB', 'T2', 'AU', 'PY', 'DO', 'KW', 'TY', 'UR', 'LA', 'Publisher', 'Volume', 'Pages')
+
+# Spans per parallel task
+SPANS_PER_TASK = 5000
+
+# Whitespace skipped between tokens (pyparsing's default)
+WHITESPACE = ' \t\n\r'
+
+# Span boundaries: after the last line break before an '@' (so spans start at a line start)
+SPAN_START = re.compile(r'\n(?=[ \t\r]*@)')
+BYTES_SPAN_START = re.compile(rb'\n(?=[ \t\r]*@)')
+STRING_DEFINITION = re.compile(r'@[ \t\n\r]*string', re.IGNORECASE)
+BYTES_STRING_DEFINITION = re.compile(rb'@[ \t\n\r]*string', re.IGNORECASE)
+KEYWORD = re.compile(r'@(comment|string|preamble)(?![A-Za-z0-9_$])', re.IGNORECASE)
+ENTRY_HEAD = re.compile(r'@([A-Za-z]+)[ \t\n\r]*([{(])([^,]*),')
+FIELD_NAME = re.compile(r'[ \t\n\r]*([A-Za-z0-9_\-().+]+)[ \t\n\r]*=[ \t\n\r]*')
+STRING_NAME = re.compile(r'[A-Za-z0-9_\-:]+')
+INTEGER = re.compile(r'[0-9]+')
+BRACE = re.compile(r'[{}]')
+QUOTE_OR_BRACE = re.compile(r'[{}"]')
+CLOSERS = {'{': '}', '(': ')'}
+
+
+class Fallback(Exception):
+    """Span outside the scanner's grammar; parse the file with bibtexparser."""
+
+
+def strip_after_new_lines(value):
+    """Strip leading whitespace from all but the first line (as bibtexparser does)."""
+    lines = value.splitlines()
+    if len(lines) > 1:
+        lines = [lines[0]] + [line.lstrip() for line in lines[1:]]
+    return '\n'.join(lines)
+
+
+def skip_whitespace(text, pos):
+    while pos < len(text) and text[pos] in WHITESPACE:
+        pos += 1
+    return pos
+
+
+def delimited_end(text, pos):
+    """End of the braced value starting at text[pos] == '{' (after its closing brace)."""
+    depth = 0
+    for match in BRACE.finditer(text, pos):
+        depth += 1 if match.group() == '{' else -1
+        if depth == 0:
+            return match.end()
+    raise Fallback('unbalanced braces')
+
+
+def quoted_end(text, pos):
+    """End of the quoted value starting at text[pos] == '"' (after its closing quote)."""
+    depth = 0
+    for match in QUOTE_OR_BRACE.finditer(text, pos + 1):
+        char = match.group()
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            if depth == 0:
+                raise Fallback('closing brace in quoted value')
+            depth -= 1
+        elif depth == 0:
+            return match.end()
+    raise Fallback('unterminated quoted value')
+
+
+def parse_string_expr(text, pos):
+    """
+    Parse a '#'-joined list of braced values, quoted values and macro names.
+
+    Returns:
+        Tuple of (parts, end): parts are strings, or (name,) tuples for macros
+    """
+    parts = []
+    while True:
+        pos = skip_whitespace(text, pos)
+        char = text[pos:pos + 1]
+        if char == '{':
+            end = delimited_end(text, pos)
+            parts.append(text[pos + 1:end - 1])
+        elif char == '"':
+            end = quoted_end(text, pos)
+            parts.append(text[pos + 1:end - 1])
+        else:
+            match = STRING_NAME.match(text, pos)
+            if not match:
+                raise Fallback('value expected')
+            end = match.end()
+            parts.append((match.group().lower(),))
+        pos = skip_whitespace(text, end)
+        if text[pos:pos + 1] != '#':
+            return parts, pos
+        pos += 1
+
+
+def expand(parts, strings, clean_lines):
+    """Value of a parsed string expression, like bibtexparser's _clean_val."""
+    if len(parts) == 1 and isinstance(parts[0], str):
+        value = strip_after_new_lines(parts[0]) if clean_lines else parts[0]
+        return '' if not value or value == '{}' else value
+    values = []
+    for part in parts:
+        if isinstance(part, str):
+            values.append(strip_after_new_lines(part) if clean_lines else part)
+        elif part[0] in strings:
+            values.append(strings[part[0]])
+        else:
+            raise Fallback(f'undefined string {part[0]}')
+    return ''.join(values)
+
+
+def parse_value(text, pos, strings):
+    """Field value (integer or string expression) at pos; returns (value, end)."""
+    match = INTEGER.match(text, pos)
+    if match:
+        return match.group(), skip_whitespace(text, match.end())
+    parts, pos = parse_string_expr(text, pos)
+    return expand(parts, strings, clean_lines=True), pos
+
+
+def parse_entry(text, pos, strings):
+    """
+    Parse the entry starting at pos ('@type{key, field = value, ...}').
+
+    Returns:
+        Tuple of (fields dict with ENTRYTYPE, end)
+    """
+    head = ENTRY_HEAD.match(text, pos)
+    if not head:
+        raise Fallback('entry header')
+    key = head.group(3).strip()
+    if not key or any(char.isspace() for char in key):
+        raise Fallback('citation key')
+    closer = CLOSERS[head.group(2)]
+
+    pairs = []
+    pos = head.end()
+    while True:
+        match = FIELD_NAME.match(text, pos)
+        if not match:
+            raise Fallback('field expected')
+        value, pos = parse_value(text, match.end(), strings)
+        pairs.append((match.group(1), value))
+
+        char = text[pos:pos + 1]
+        if char == ',':
+            pos = skip_whitespace(text, pos + 1)
+            char = text[pos:pos + 1]
+            if char != closer:
+                continue
+        if char != closer:
+            raise Fallback('entry not closed')
+        # Repeated fields resolve as in bibtexparser: the first value per exact
+        # name, then names are lowercased in order of their last occurrence
+        fields = {}
+        for name, value in {name: value for name, value in reversed(pairs)}.items():
+            fields[name.lower()] = value
+        fields['ENTRYTYPE'] = head.group(1).lower()
+        return fields, pos + 1
+
+
+def parse_macro(text, pos, keyword, strings):
+    """Parse an @string definition (stored in strings) or an @preamble at pos; returns its end."""
+    pos = skip_whitespace(text, pos)
+    closer = CLOSERS.get(text[pos:pos + 1])
+    if closer is None:
+        raise Fallback(f'@{keyword} delimiter')
+    pos = skip_whitespace(text, pos + 1)
+
+    if keyword == 'string':
+        name = STRING_NAME.match(text, pos)
+        if not name:
+            raise Fallback('@string name')
+        pos = skip_whitespace(text, name.end())
+        if text[pos:pos + 1] != '=':
+            raise Fallback('@string =')
+        parts, pos = parse_string_expr(text, pos + 1)
+        strings[name.group().lower()] = expand(parts, strings, clean_lines=False)
+    else:
+        match = INTEGER.match(text, pos)
+        pos = skip_whitespace(text, match.end()) if match else parse_string_expr(text, pos)[1]
+
+    if text[pos:pos + 1] != closer:
+        raise Fallback(f'@{keyword} not closed')
+    return pos + 1
+
+
+def parse_span(span, strings, entries):
+    """Parse one span (text up to the next line starting with '@'), appending entry dicts."""
+    pos = skip_whitespace(span, 0)
+    while pos < len(span):
+        if span[pos] != '@':
+            # Implicit comment: runs to the end of the span
+            return
+        keyword = KEYWORD.match(span, pos)
+        if keyword and keyword.group(1).lower() == 'comment':
+            return
+        if keyword:
+            pos = parse_macro(span, keyword.end(), keyword.group(1).lower(), strings)
+        else:
+            fields, pos = parse_entry(span, pos, strings)
+            if fields['ENTRYTYPE'] in STANDARD_TYPES:
+                entries.append(fields)
+        pos = skip_whitespace(span, pos)
+
+
+def new_columns():
+    return {name: [] for name in COLUMNS}
+
+
+def append_entries(columns, entries):
+    """Append bibtexparser-style entry dicts to the columns."""
+    title, abstract, source, authors, year, doi, keywords, doc_type, url, language, publisher, volume, pages = \
+        columns.values()
+    for entry in entries:
+        get = entry.get
+        title.append(get('title', '').replace('{', '').replace('}', ''))
+        abstract.append(get('abstract', ''))
+        source.append(get('journal', '') or get('booktitle', ''))
+        authors.append(get('author', '').replace(' and ', '; '))
+        year.append(get('year', ''))
+        doi.append(get('doi', ''))
+        keywords.append(get('keywords', ''))
+        entry_type = get('ENTRYTYPE', '')
+        doc_type.append(BIBTEX_TYPE_MAPPING.get(entry_type, entry_type))
+        url.append(get('url', ''))
+        language.append(get('language', ''))
+        publisher.append(get('publisher', ''))
+        volume.append(get('volume', ''))
+        pages.append(get('pages', ''))
+
+
+def parse_spans(spans, strings):
+    """
+    Parse a group of spans into columns (one parallel task).
+
+    @string definitions are added to strings, so they carry over to the
+    next group when groups are parsed in order.
+
+    Returns:
+        Columns dict, or None if a span needs bibtexparser
+    """
+    entries = []
+    try:
+        for span in spans:
+            parse_span(span, strings, entries)
+    except Fallback:
+        return None
+    columns = new_columns()
+    append_entries(columns, entries)
+    return columns
+
+
+def iter_spans(source):
+    """
+    Cut str or UTF-8 bytes-like source before every line that starts with '@'.
+
+    Spans are yielded as str with tabs expanded (pyparsing expands tabs
+    before parsing; spans start at a line start, so columns match).
+    """
+    if isinstance(source, str):
+        start = 1 if source[:1] == '\ufeff' else 0
+        ends = (match.end() for match in SPAN_START.finditer(source, start))
+        for end in chain(ends, [len(source)]):
+            yield source[start:end].expandtabs()
+            start = end
+    else:
+        start = len(codecs.BOM_UTF8) if source[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+        ends = (match.end() for match in BYTES_SPAN_START.finditer(source, start))
+        for end in chain(ends, [len(source)]):
+            # A line break never falls inside a UTF-8 character, so spans decode on their own
+            yield str(source[start:end], 'utf-8').expandtabs()
+            start = end
+
+
+def span_groups(spans):
+    """Lists of up to SPANS_PER_TASK spans."""
+    while True:
+        group = list(islice(spans, SPANS_PER_TASK))
+        if not group:
+            return
+        yield group
+
+
+def read_bibtex(source, mapper=map):
+    """
+    Parse BibTeX into per-column lists.
+
+    Args:
+        source: Decoded .bib text, or its UTF-8 bytes / any bytes-like
+            buffer such as an mmap
+        mapper: map()-like function used for span groups (e.g. a process
+            pool's map); only used when there is more than one group
+
+    Returns:
+        Dict of column name -> list of values (COLUMNS)
+    """
+    in_text = isinstance(source, str)
+    # @string definitions apply to the entries after them, so such files are parsed in order
+    has_strings = (STRING_DEFINITION if in_text else BYTES_STRING_DEFINITION).search(source) is not None
+
+    spans = iter_spans(source)
+    groups = span_groups(spans)
+    try:
+        first = next(groups, [])
+        second = next(groups, None)
+        if second is None or has_strings:
+            strings = dict(COMMON_STRINGS)
+            results = (parse_spans(group, strings) for group in chain([first], [second] if second else [], groups))
+        else:
+            results = mapper(parse_spans, chain([first, second], groups), repeat(COMMON_STRINGS))
+
+        columns = new_columns()
+        for result in results:
+            if result is None:
+                break
+            for name, values in result.items():
+                columns[name].extend(values)
+        else:
+            return columns
+    finally:
+        # Release the span scanner (and with it any buffer export of an mmap source)
+        spans.close()
+
+    text = source if in_text else str(source, 'utf-8')
+    columns = new_columns()
+    append_entries(columns, bibtexparser.loads(text).entries)
+    return columns
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Column Alias Layer
+字段别名层
+
+Task DataFrames store every bibliographic field once, under its standard
+tag (标准字段名: TI, AB, AU, T2, PY, KW, DO, TY, UR, LA). The legacy names
+(Title, Abstract, Source title, ...) are aliases:
+
+- canonical_columns() renames legacy-named upload columns to the tags
+- resolve_column() finds a field by either name
+- with_legacy_columns() adds the legacy names at export time only, as
+  references to the tag columns (no copy under pandas copy-on-write)
+"""
+
+
+# Standard tag -> legacy name shown by older exports and the frontend
+STANDARD_TO_LEGACY = {
+    'TI': 'Title',
+    'AB': 'Abstract',
+    'AU': 'Authors',
+    'T2': 'Source title',
+    'PY': 'Year',
+    'KW': 'Keywords',
+    'DO': 'DOI',
+    'TY': 'Type',
+    'UR': 'URL',
+    'LA': 'Language',
+}
+
+# Legacy names are matched case-insensitively
+LEGACY_TO_STANDARD = {legacy.lower(): standard for standard, legacy in STANDARD_TO_LEGACY.items()}
+
+# Fields every task DataFrame has (created empty if missing)
+REQUIRED_FIELDS = ('TI', 'AB', 'T2')
+
+
+def is_empty(series):
+    """Cells that are missing or blank."""
+    return series.isna() | (series.astype(str).str.strip() == '')
+
+
+def canonical_columns(df):
+    """
+    Store every field under its standard tag.
+
+    Legacy-named columns are renamed to their tag; if the tag column
+    already exists, its empty cells are filled from the legacy column,
+    which is then dropped. Missing REQUIRED_FIELDS are added empty.
+    """
+    renames = {}
+    merged = []
+    for column in df.columns:
+        standard = LEGACY_TO_STANDARD.get(str(column).lower())
+        if standard is None or column == standard:
+            continue
+        if standard in df.columns or standard in renames.values():
+            merged.append((column, standard))
+        else:
+            renames[column] = standard
+
+    df = df.rename(columns=renames)
+    for column, standard in merged:
+        df[standard] = df[standard].where(~is_empty(df[standard]), df[column])
+    if merged:
+        df = df.drop(columns=[column for column, _ in merged])
+
+    for field in REQUIRED_FIELDS:
+        if field not in df.columns:
+            df[field] = ''
+    return df
+
+
+def resolve_column(df, name):
+    """Actual column for a standard tag or legacy name (either spelling), or None."""
+    if name in df.columns:
+        return name
+    standard = LEGACY_TO_STANDARD.get(str(name).lower(), name)
+    if standard in df.columns:
+        return standard
+    legacy = STANDARD_TO_LEGACY.get(standard)
+    return legacy if legacy in df.columns else None
+
+
+def with_legacy_columns(df):
+    """Copy of df with legacy alias columns appended for every standard tag present."""
+    aliases = {legacy: df[standard] for standard, legacy in STANDARD_TO_LEGACY.items()
+               if standard in df.columns and legacy not in df.columns}
+    return df.assign(**aliases) if aliases else df
+
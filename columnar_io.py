@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parquet / Arrow IPC Import and Export
+Parquet / Arrow 列式格式导入导出
+
+Reads and writes screening datasets as Parquet and Arrow IPC (Feather v2)
+files, so downstream bibliometrics tools get typed columns instead of
+re-parsing CSV/XLSX:
+
+- pyarrow is optional and only imported when one of these formats is used;
+  without it, reading or writing raises ColumnarUnavailable with an install
+  hint
+- Reading keeps the pandas metadata that pandas writes (dtypes such as
+  nullable integers and categoricals come back as they were written)
+- Writing converts the DataFrame to an Arrow table once and writes that
+  table; numeric and Arrow-backed columns are handed over without a copy.
+  Object columns that mix types (e.g. integer and text years from
+  different exports) are written as text, and repeated column names get
+  read_csv-style suffixes
+"""
+
+import io
+import os
+
+import pandas as pd
+
+
+# Format name -> upload extensions
+COLUMNAR_FORMATS = {
+    'parquet': ('.parquet',),
+    'feather': ('.feather', '.arrow', '.ipc'),
+}
+
+COLUMNAR_EXTENSIONS = tuple(ext for extensions in COLUMNAR_FORMATS.values() for ext in extensions)
+
+MIMETYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'feather': 'application/vnd.apache.arrow.file',
+}
+
+
+class ColumnarUnavailable(ImportError):
+    """pyarrow is not installed."""
+
+
+def require_pyarrow():
+    """Import pyarrow lazily; raises ColumnarUnavailable with an install hint."""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ColumnarUnavailable('Parquet / Arrow files need pyarrow: pip install pyarrow')
+    return pyarrow
+
+
+def columnar_format(filename):
+    """'parquet' / 'feather' for a Parquet or Arrow IPC filename, else None."""
+    name = str(filename).lower()
+    for fmt, extensions in COLUMNAR_FORMATS.items():
+        if name.endswith(extensions):
+            return fmt
+    return None
+
+
+def read_columnar(source, fmt):
+    """
+    Read a Parquet or Arrow IPC (Feather) file into a DataFrame.
+
+    Args:
+        source: File content as bytes, a binary file or a path
+        fmt: 'parquet' or 'feather'
+    """
+    require_pyarrow()
+    from pyarrow import feather, parquet
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    memory_map = isinstance(source, (str, os.PathLike))
+    if fmt == 'parquet':
+        table = parquet.read_table(source, memory_map=memory_map)
+    else:
+        table = feather.read_table(source, memory_map=memory_map)
+    return table.to_pandas()
+
+
+def unique_names(names):
+    """Column names made unique the way read_csv does it (Exclusion_Reason, Exclusion_Reason.1, ...)."""
+    seen = set()
+    unique = []
+    for name in map(str, names):
+        candidate, count = name, 0
+        while candidate in seen:
+            count += 1
+            candidate = f'{name}.{count}'
+        seen.add(candidate)
+        unique.append(candidate)
+    return unique
+
+
+def arrow_table(df):
+    """Arrow table of a DataFrame (without its index); mixed-type object columns become text."""
+    pa = require_pyarrow()
+    names = unique_names(df.columns)
+    if names != list(df.columns):
+        # e.g. a re-screened removed_data file: its Exclusion_Reason plus the new one
+        df = df.set_axis(names, axis=1)
+    mixed = [name for name in df.columns
+             if df[name].dtype == object and pd.api.types.infer_dtype(df[name], skipna=True).startswith('mixed')]
+    if mixed:
+        df = df.copy(deep=False)
+        for name in mixed:
+            df[name] = df[name].where(df[name].isna(), df[name].astype(str))
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def write_columnar(df, fmt, sink):
+    """
+    Write a DataFrame as Parquet or Arrow IPC (Feather v2).
+
+    Args:
+        df: DataFrame to write
+        fmt: 'parquet' or 'feather'
+        sink: Binary file or path
+    """
+    table = arrow_table(df)
+    from pyarrow import feather, parquet
+
+    if fmt == 'parquet':
+        parquet.write_table(table, sink)
+    else:
+        feather.write_feather(table, sink)
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent Corpus Fingerprint Index
+项目级文献指纹库 (SQLite)
+
+Reviews run in rounds: every /screen call of a project records compact
+fingerprints of the screened records, and later uploads are checked against
+them with indexed lookups instead of re-uploading the whole history:
+
+- DOI hash (canonical DOI)
+- Title hash (normalized title within its year / first-author block)
+- MinHash LSH band keys plus the normalized title, so near-duplicate titles
+  from earlier rounds are found and confirmed like in near_duplicates.py
+
+Hashes are stable 64-bit blake2b digests, so the index stays valid across
+processes and restarts.
+"""
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from deduplication import canonical_doi, first_author_surname, normalized_titles, publication_year
+from near_duplicates import (DEFAULT_THRESHOLD, LSH_BANDS, MAX_BUCKET_PAIRS, band_keys, minhash_signatures, normalize_title,
+                             title_shingles, titles_match, word_hashes)
+
+
+# Default index file (override with CORPUS_INDEX_PATH, empty string disables)
+DEFAULT_INDEX_PATH = os.path.join(tempfile.gettempdir(), 'literature_screening_corpus.sqlite3')
+
+# How a record matched an earlier round
+MATCH_DOI = 'DOI'
+MATCH_TITLE = 'Title'
+MATCH_NEAR_DUPLICATE = 'Near-duplicate title'
+
+
+def stable_hashes(values):
+    """
+    Signed 64-bit blake2b hash per value (hashed once per distinct value).
+
+    Returns:
+        Tuple of (int64 hashes, bool mask of non-missing values)
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    digests = [int.from_bytes(hashlib.blake2b(str(u).encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+               for u in uniques]
+    hashes = np.array(digests + [0], dtype=np.int64)
+    return hashes[codes], codes >= 0
+
+
+def exact_fingerprints(df, title_col=None, doi_col=None, year_col=None, author_col=None):
+    """
+    DOI and title hashes of every row of df (the exact dedup keys).
+
+    Returns:
+        Dict of arrays: doi / title / block (int64 hashes) and has_doi /
+        has_title (bool)
+    """
+    n = len(df)
+
+    def column(name):
+        return df[name] if name and name in df.columns else pd.Series([np.nan] * n, dtype=object)
+
+    year = pd.Series(publication_year(column(year_col)), dtype=object).fillna('')
+    surname = pd.Series(first_author_surname(column(author_col)), dtype=object).fillna('')
+    block_text = (year + '|' + surname).to_numpy(dtype=object)
+
+    doi, has_doi = stable_hashes(canonical_doi(column(doi_col)))
+    titles = pd.Series(normalized_titles(column(title_col)), dtype=object)
+    title, has_title = stable_hashes(titles.where(titles.isna(), titles + '|' + block_text))
+    block, _ = stable_hashes(block_text)
+    return {'doi': doi, 'has_doi': has_doi, 'title': title, 'has_title': has_title, 'block': block}
+
+
+def corpus_fingerprints(df, title_col=None, doi_col=None, year_col=None, author_col=None):
+    """
+    Fingerprints of every row of df.
+
+    Returns:
+        Dict of arrays: doi / title / block (int64 hashes), has_doi / has_title
+        (bool), normalized (normalized titles) and bands ((LSH_BANDS, n)
+        int64 bucket keys within the row's block)
+    """
+    n = len(df)
+    exact = exact_fingerprints(df, title_col, doi_col, year_col, author_col)
+    block = exact['block']
+
+    raw_titles = (df[title_col] if title_col and title_col in df.columns
+                  else pd.Series([np.nan] * n, dtype=object)).to_numpy(dtype=object)
+    shingles, offsets, vocabulary = title_shingles(raw_titles)
+    signatures = minhash_signatures(shingles, offsets, word_hashes(vocabulary))
+    # Band buckets are per block: near-duplicates must share year and first author anyway,
+    # and it keeps buckets of common title words small
+    block_mix = block.view(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+    bands = np.empty((LSH_BANDS, n), dtype=np.int64)
+    for band in range(LSH_BANDS):
+        bands[band] = (band_keys(signatures, band) ^ block_mix).view(np.int64)
+
+    return {
+        'doi': exact['doi'], 'has_doi': exact['has_doi'],
+        'title': exact['title'], 'has_title': exact['has_title'] & (np.diff(offsets) > 0),
+        'block': block,
+        'normalized': np.array([normalize_title(t) for t in raw_titles], dtype=object),
+        'bands': bands,
+    }
+
+
+class CorpusIndex:
+    """
+    SQLite-backed fingerprint store, one namespace per project.
+
+    One connection is shared by all task threads and guarded by a lock.
+    Lookups go through a temporary key table joined (CROSS JOIN keeps it as
+    the outer loop) against the primary-key indexes, so a whole upload is
+    checked in a handful of queries.
+    """
+
+    def __init__(self, path, threshold=DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript('''
+                CREATE TABLE IF NOT EXISTS projects (
+                    project_id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS records (
+                    project_id INTEGER NOT NULL,
+                    record_id INTEGER NOT NULL,
+                    block INTEGER NOT NULL,
+                    title TEXT NOT NULL,
+                    first_seen REAL NOT NULL,
+                    PRIMARY KEY (project_id, record_id)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS doi_keys (
+                    project_id INTEGER NOT NULL,
+                    doi_hash INTEGER NOT NULL,
+                    record_id INTEGER NOT NULL,
+                    PRIMARY KEY (project_id, doi_hash)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS title_keys (
+                    project_id INTEGER NOT NULL,
+                    title_hash INTEGER NOT NULL,
+                    record_id INTEGER NOT NULL,
+                    PRIMARY KEY (project_id, title_hash)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS band_keys (
+                    project_id INTEGER NOT NULL,
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    record_id INTEGER NOT NULL,
+                    PRIMARY KEY (project_id, band, bucket, record_id)
+                ) WITHOUT ROWID;
+                CREATE TEMP TABLE IF NOT EXISTS lookup_keys (
+                    row INTEGER NOT NULL,
+                    band INTEGER NOT NULL,
+                    key INTEGER NOT NULL
+                );
+            ''')
+
+    def _project_id(self, project, create=False):
+        row = self._conn.execute('SELECT project_id FROM projects WHERE name = ?', (project,)).fetchone()
+        if row is None and create:
+            return self._conn.execute('INSERT INTO projects (name) VALUES (?)', (project,)).lastrowid
+        return row[0] if row else None
+
+    def _join(self, rows, keys, query, project_id, bands=None):
+        """Load (row, band, key) into the temp table and run a join query against it."""
+        self._conn.execute('DELETE FROM lookup_keys')
+        if bands is None:
+            bands = np.zeros(len(rows), dtype=np.int64)
+        self._conn.executemany('INSERT INTO lookup_keys VALUES (?, ?, ?)',
+                               zip(rows.tolist(), bands.tolist(), keys.tolist()))
+        return self._conn.execute(query, (project_id,)).fetchall()
+
+    def lookup(self, project, fingerprints):
+        """
+        Find rows already recorded for this project.
+
+        Returns:
+            Dict with 'match' (object array: None, MATCH_DOI, MATCH_TITLE or
+            MATCH_NEAR_DUPLICATE) and 'first_seen' (float array of epoch
+            seconds, NaN for new rows)
+        """
+        n = len(fingerprints['doi'])
+        match = np.full(n, None, dtype=object)
+        first_seen = np.full(n, np.nan)
+        with self._lock, self._conn:
+            project_id = self._project_id(project)
+            if project_id is None or n == 0:
+                return {'match': match, 'first_seen': first_seen}
+
+            exact_steps = (
+                (MATCH_DOI, 'doi', 'doi_keys', 'doi_hash'),
+                (MATCH_TITLE, 'title', 'title_keys', 'title_hash'),
+            )
+            for kind, field, table, column in exact_steps:
+                rows = np.flatnonzero(fingerprints[f'has_{field}'] & (match == None))  # noqa: E711
+                if len(rows) == 0:
+                    continue
+                found = self._join(rows, fingerprints[field][rows], f'''
+                    SELECT l.row, r.first_seen FROM lookup_keys l
+                    CROSS JOIN {table} k ON k.project_id = ?1 AND k.{column} = l.key
+                    CROSS JOIN records r ON r.project_id = k.project_id AND r.record_id = k.record_id
+                ''', project_id)
+                for row, seen in found:
+                    match[row], first_seen[row] = kind, seen
+
+            # Near-duplicate titles: LSH band candidates, confirmed within the same block
+            rows = np.flatnonzero(fingerprints['has_title'] & (match == None))  # noqa: E711
+            if len(rows):
+                bands = fingerprints['bands'][:, rows]
+                # Oversized buckets (very common title words) are skipped, like in lsh_candidates
+                found = self._join(np.tile(rows, LSH_BANDS), bands.ravel(), f'''
+                    SELECT DISTINCT l.row, r.block, r.title, r.first_seen FROM lookup_keys l
+                    CROSS JOIN band_keys k ON k.project_id = ?1 AND k.band = l.band AND k.bucket = l.key
+                    CROSS JOIN records r ON r.project_id = k.project_id AND r.record_id = k.record_id
+                    WHERE (SELECT COUNT(*) FROM (
+                        SELECT 1 FROM band_keys c WHERE c.project_id = ?1 AND c.band = l.band AND c.bucket = l.key
+                        LIMIT {MAX_BUCKET_PAIRS + 1})) <= {MAX_BUCKET_PAIRS}
+                ''', project_id, bands=np.repeat(np.arange(LSH_BANDS), len(rows)))
+                for row, block, title, seen in found:
+                    if match[row] is None and block == fingerprints['block'][row] and \
+                            titles_match(fingerprints['normalized'][row], title, self.threshold):
+                        match[row], first_seen[row] = MATCH_NEAR_DUPLICATE, seen
+        return {'match': match, 'first_seen': first_seen}
+
+    def add(self, project, fingerprints, rows=None):
+        """Record fingerprints (optionally only the given row positions) for a project."""
+        if rows is None:
+            rows = np.arange(len(fingerprints['doi']))
+        rows = np.asarray(rows, dtype=np.int64)
+        now = time.time()
+        with self._lock, self._conn:
+            project_id = self._project_id(project, create=True)
+            start = self._conn.execute('SELECT COALESCE(MAX(record_id), -1) + 1 FROM records WHERE project_id = ?',
+                                       (project_id,)).fetchone()[0]
+            ids = np.arange(start, start + len(rows), dtype=np.int64)
+            self._conn.executemany('INSERT INTO records VALUES (?, ?, ?, ?, ?)', zip(
+                [project_id] * len(rows), ids.tolist(), fingerprints['block'][rows].tolist(),
+                fingerprints['normalized'][rows].tolist(), [now] * len(rows)))
+            # The earliest record keeps a DOI / title key
+            for field, table in (('doi', 'doi_keys'), ('title', 'title_keys')):
+                keep = fingerprints[f'has_{field}'][rows]
+                self._conn.executemany(f'INSERT OR IGNORE INTO {table} VALUES (?, ?, ?)', zip(
+                    [project_id] * int(keep.sum()), fingerprints[field][rows[keep]].tolist(), ids[keep].tolist()))
+            keep = fingerprints['has_title'][rows]
+            bands = fingerprints['bands'][:, rows[keep]]
+            self._conn.executemany('INSERT OR IGNORE INTO band_keys VALUES (?, ?, ?, ?)', zip(
+                [project_id] * bands.size, np.repeat(np.arange(LSH_BANDS), bands.shape[1]).tolist(),
+                bands.ravel().tolist(), np.tile(ids[keep], LSH_BANDS).tolist()))
+
+    def count(self, project):
+        """Number of records stored for a project."""
+        with self._lock:
+            project_id = self._project_id(project)
+            if project_id is None:
+                return 0
+            return self._conn.execute('SELECT COUNT(*) FROM records WHERE project_id = ?', (project_id,)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(path, threshold=DEFAULT_THRESHOLD):
+    """
+    Return the shared index for a path, or None if the index is disabled
+    (empty path) or the database cannot be opened.
+    """
+    if not path:
+        return None
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            try:
+                index = CorpusIndex(path, threshold)
+            except sqlite3.Error as e:
+                print(f"⚠️ Corpus index disabled ({path}): {e}", flush=True)
+                return None
+            _indexes[path] = index
+        return index
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Duplicate Record Resolution
+重复记录识别与合并
+
+Columnar dedup engine used by app.remove_duplicates:
+
+- DOIs are canonicalized in one vectorized pass ("https://doi.org/10.1/X",
+  "doi:10.1/x " and "10.1/X" are the same record)
+- Titles only match within a block of (publication year, first-author
+  surname), so distinct papers sharing a generic title ("Editorial") stay
+  apart; missing year/author values form their own block value
+- Every match rule becomes integer keys (or row pairs for near-duplicate
+  titles) and rows are merged into clusters by min-label propagation
+- One row per cluster is kept according to a keep policy
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from near_duplicates import DEFAULT_THRESHOLD, near_duplicate_pairs
+
+
+# Which record of a duplicate cluster survives
+KEEP_POLICIES = ('first', 'most_complete', 'preferred_source')
+
+DOI_PATTERN = r'(10\.\d{4,9}/\S+)'
+
+# Author name tokens that are initials ("J.", "JA", "J.-P.")
+INITIALS_PATTERN = re.compile(r'(?:[A-Z]\.?-?){1,3}')
+
+NON_LETTERS = re.compile(r'[^a-z]')
+PUNCTUATION = re.compile(r'[^\w\s]+')
+
+
+def canonical_doi(values):
+    """
+    Canonical lowercase DOI per row ('10.xxxx/...'), NaN where none is found.
+
+    URL and "doi:" prefixes, surrounding whitespace and trailing punctuation
+    are dropped.
+    """
+    text = pd.Series(values, dtype=object).where(pd.notna(values), '').astype(str).str.lower()
+    text = text.str.replace('%2f', '/', regex=False)
+    doi = text.str.extract(DOI_PATTERN, expand=False)
+    return doi.str.rstrip('.,;)').astype(object).where(doi.notna(), np.nan)
+
+
+def publication_year(values):
+    """Four-digit publication year per row as a string, NaN where missing."""
+    text = pd.Series(values, dtype=object).where(pd.notna(values), '').astype(str)
+    return text.str.extract(r'\b(1[5-9]\d\d|20\d\d)\b', expand=False).astype(object)
+
+
+def map_unique(values, func):
+    """Apply func once per distinct non-missing value and broadcast the results back (object array)."""
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    mapped = np.array([func(value) for value in uniques] + [np.nan], dtype=object)
+    return mapped[codes]
+
+
+def surname_of(authors):
+    """Surname of the first author in one author string (see first_author_surname)."""
+    first = re.split(r'\s*;\s*|\s+and\s+', str(authors).strip(), maxsplit=1)[0]
+    words = first.split(',', 1)[0].split()
+    if len(words) > 1 and INITIALS_PATTERN.fullmatch(words[-1]):
+        words = words[:-1]
+    elif len(words) > 1 and ',' not in first:
+        words = words[-1:]
+    surname = unicodedata.normalize('NFKD', ''.join(words)).encode('ascii', 'ignore').decode('ascii')
+    return NON_LETTERS.sub('', surname.lower()) or np.nan
+
+
+def first_author_surname(values):
+    """
+    Lowercase ASCII surname of the first author, NaN where missing.
+
+    Handles "Smith, John; Doe, Jane" (WoS/RIS), "Smith J., Doe A." (Scopus),
+    "Smith JA" (PubMed) and "John Smith and Jane Doe" (BibTeX). Names are
+    parsed once per distinct author string.
+    """
+    return map_unique(values, surname_of)
+
+
+def normalized_titles(values):
+    """Lowercase title without punctuation and repeated whitespace, NaN where empty."""
+    return map_unique(values, lambda title: ' '.join(PUNCTUATION.sub('', str(title).lower()).split()) or np.nan)
+
+
+def key_codes(*columns):
+    """Integer code per row for the combination of key columns (-1 if the first column is missing)."""
+    first = pd.Series(columns[0], dtype=object).reset_index(drop=True)
+    codes = pd.factorize(first.fillna(''))[0].astype(np.int64)
+    for column in columns[1:]:
+        other = pd.factorize(pd.Series(column, dtype=object).reset_index(drop=True).fillna(''))[0]
+        codes = pd.factorize(codes * (int(other.max(initial=0)) + 1) + other)[0].astype(np.int64)
+    codes[first.isna().to_numpy()] = -1
+    return codes
+
+
+def propagate_labels(labels, codes=None, pairs=None):
+    """
+    Merge clusters sharing a key code (or joined by a row pair) until stable.
+
+    Labels are row positions; every row ends up labelled with the smallest
+    row position of its connected cluster.
+    """
+    labels = labels.copy()
+    valid = codes >= 0 if codes is not None else None
+    while True:
+        previous = labels.copy()
+        if codes is not None and valid.any():
+            minimum = np.full(codes.max() + 1, len(labels), dtype=np.int64)
+            np.minimum.at(minimum, codes[valid], labels[valid])
+            labels[valid] = minimum[codes[valid]]
+        if pairs is not None and len(pairs):
+            joined = np.minimum(labels[pairs[:, 0]], labels[pairs[:, 1]])
+            np.minimum.at(labels, pairs[:, 0], joined)
+            np.minimum.at(labels, pairs[:, 1], joined)
+        # Pointer jumping: a label always points at a row with a smaller or equal label
+        while True:
+            jumped = labels[labels]
+            if (jumped == labels).all():
+                break
+            labels = jumped
+        if (labels == previous).all():
+            return labels
+
+
+def completeness(df):
+    """Number of non-empty cells per row (one column at a time, no string copy of the whole frame)."""
+    filled = np.zeros(len(df), dtype=np.int64)
+    # By position, so repeated column names (e.g. two KW columns) are each counted once
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        filled += (column.notna() & (column.astype(str).str.strip() != '')).to_numpy(dtype=np.int64)
+    return filled
+
+
+def cluster_duplicates(df, title_col=None, doi_col=None, year_col=None, author_col=None,
+                       method='doi_title', threshold=DEFAULT_THRESHOLD):
+    """
+    Assign a cluster label (smallest row position of the cluster) to every row.
+
+    Args:
+        method: 'doi', 'title', 'doi_title' or 'fuzzy' (doi_title plus
+            near-duplicate titles within the same block)
+
+    Returns:
+        Tuple of (labels int64 array, list of (step name, duplicates added))
+    """
+    n = len(df)
+    labels = np.arange(n, dtype=np.int64)
+    steps = []
+
+    def column(name):
+        return df[name] if name and name in df.columns else pd.Series([np.nan] * n, dtype=object)
+
+    def record(name, new_labels):
+        added = int((labels == np.arange(n)).sum() - (new_labels == np.arange(n)).sum())
+        steps.append((name, added))
+        return new_labels
+
+    if method in ('doi', 'doi_title', 'fuzzy') and doi_col in df.columns:
+        labels = record('DOI-based', propagate_labels(labels, codes=key_codes(canonical_doi(column(doi_col)))))
+
+    if method in ('title', 'doi_title', 'fuzzy') and title_col in df.columns:
+        year, surname = publication_year(column(year_col)), first_author_surname(column(author_col))
+        titles = normalized_titles(column(title_col))
+        labels = record('Title-based', propagate_labels(labels, codes=key_codes(titles, year, surname)))
+
+        if method == 'fuzzy' and n > 1:
+            blocks = key_codes(year.fillna(''), surname)
+            pairs = near_duplicate_pairs(column(title_col).to_numpy(dtype=object), threshold, blocks=blocks)
+            labels = record('Near-duplicate titles', propagate_labels(labels, pairs=pairs))
+
+    return labels, steps
+
+
+def select_representatives(labels, keep='first', df=None, source_rank=None):
+    """
+    Boolean mask of the row kept for each cluster.
+
+    keep:
+        'first': earliest row
+        'most_complete': row with the most non-empty fields (ties: earliest)
+        'preferred_source': row with the lowest source_rank (ties: earliest)
+    """
+    n = len(labels)
+    if keep == 'most_complete' and df is not None:
+        rank = -completeness(df)
+    elif keep == 'preferred_source' and source_rank is not None:
+        rank = np.asarray(source_rank, dtype=np.int64)
+    else:
+        rank = np.zeros(n, dtype=np.int64)
+    order = np.lexsort((np.arange(n), rank, labels))
+    first = np.r_[True, labels[order][1:] != labels[order][:-1]] if n else np.zeros(0, dtype=bool)
+    kept = np.zeros(n, dtype=bool)
+    kept[order[first]] = True
+    return kept
+
+
+def duplicate_groups(df, labels, kept):
+    """Rows of clusters with more than one record, with Duplicate_Cluster ids (1..k) and Duplicate_Kept."""
+    sizes = np.bincount(labels, minlength=len(labels))
+    grouped = np.flatnonzero(sizes[labels] > 1)
+    grouped = grouped[np.lexsort((grouped, labels[grouped]))]
+    groups = df.iloc[grouped].copy()
+    groups.insert(0, 'Duplicate_Kept', kept[grouped])
+    groups.insert(0, 'Duplicate_Cluster', pd.factorize(labels[grouped])[0] + 1)
+    return groups.reset_index(drop=True)
+
+
+def deduplicate(df, title_col='Title', doi_col='DOI', year_col=None, author_col=None, method='doi_title',
+                threshold=DEFAULT_THRESHOLD, keep='first', source_rank=None):
+    """
+    Cluster duplicate records and keep one row per cluster (original order).
+
+    Returns:
+        Tuple of (deduplicated_df, duplicate_info_dict, duplicate_groups_df)
+    """
+    original_count = len(df)
+    labels, steps = cluster_duplicates(df, title_col, doi_col, year_col, author_col, method, threshold)
+    kept = select_representatives(labels, keep, df, source_rank)
+    groups = duplicate_groups(df, labels, kept)
+    df_clean = df[kept].reset_index(drop=True)
+
+    dedup_info = {
+        'original_count': int(original_count),
+        'duplicates_removed': int(original_count - len(df_clean)),
+        'final_count': int(len(df_clean)),
+        'clusters': int(groups['Duplicate_Cluster'].max()) if len(groups) else 0,
+        'details': [f"{name}: {count} duplicates" for name, count in steps if count],
+        'method': method,
+        'keep': keep
+    }
+    return df_clean, dedup_info, groups
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compact Column Types
+紧凑列类型
+
+Shrinks the merged upload DataFrame right after ingestion, where every
+field arrives as a column of Python strings:
+
+- Repetitive text columns (Source title, Type, Language, ...: at most
+  CATEGORY_MAX_RATIO distinct values per row) become categoricals, one
+  small integer code per row plus each distinct value once
+- The year column becomes a nullable Int16 column when every value is a
+  whole year
+- With pyarrow installed, the other text columns are stored as
+  Arrow-backed strings (one buffer per column instead of one Python
+  object per cell); without it they are left as they are
+
+Values and missing cells are unchanged, so screening, deduplication and
+every exporter see the same records. compact_dtypes() also reports the
+memory before and after, which the web app adds to the task stats.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Text columns with at most this many distinct values per row become categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+# Checked in full; other text columns only if their first SAMPLE_ROWS rows look repetitive
+CATEGORY_COLUMNS = ('T2', 'TY', 'LA', 'J2')
+
+# Columns holding publication years
+YEAR_COLUMNS = ('PY',)
+
+SAMPLE_ROWS = 1000
+
+
+def memory_bytes(df):
+    """Memory used by a DataFrame in bytes, including the strings it holds."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def arrow_string_dtype():
+    """pandas' 'str' dtype with Arrow storage, or None without pyarrow."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return None
+    return pd.StringDtype('pyarrow', na_value=np.nan)
+
+
+def is_text(series):
+    """String column: the 'str' dtype, or object dtype holding only strings (and missing cells)."""
+    if isinstance(series.dtype, pd.StringDtype):
+        return True
+    return series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty')
+
+
+def as_category(series, check_sample=False):
+    """Categorical version of a text column, or None if it has too many distinct values."""
+    if check_sample and len(series) > SAMPLE_ROWS:
+        if series.iloc[:SAMPLE_ROWS].nunique() > SAMPLE_ROWS * CATEGORY_MAX_RATIO:
+            return None
+    codes, uniques = pd.factorize(series)
+    if len(uniques) > len(series) * CATEGORY_MAX_RATIO:
+        return None
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=series.index, name=series.name)
+
+
+def as_years(series):
+    """Nullable Int16 version of a year column, or None if any value is not a whole year."""
+    if is_text(series):
+        text = series.str.strip()
+        present = series.notna() & (text != '')
+        if not text[present].str.fullmatch(r'\d{1,4}').all():
+            return None
+        return pd.to_numeric(text.where(present), errors='coerce').astype('Int16')
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        present = series.dropna()
+        if not ((present % 1 == 0) & (present.abs() <= np.iinfo(np.int16).max)).all():
+            return None
+        return series.astype('Int16')
+    return None
+
+
+def compact_dtypes(df):
+    """
+    Store the columns of a merged upload in compact dtypes.
+
+    Args:
+        df: DataFrame from ingestion (standard column tags)
+
+    Returns:
+        Tuple of (compacted DataFrame, report dict with bytes_before,
+        bytes_after, bytes_saved and the new dtype of each changed column)
+    """
+    bytes_before = memory_bytes(df)
+    string_dtype = arrow_string_dtype()
+    compacted = {}
+    for name in df.columns:
+        series = df[name]
+        if not isinstance(series, pd.Series):
+            continue  # Repeated column name
+        if name in YEAR_COLUMNS:
+            new = as_years(series)
+        elif is_text(series):
+            new = as_category(series, check_sample=name not in CATEGORY_COLUMNS)
+            if new is None and string_dtype is not None and series.dtype != string_dtype:
+                new = series.astype(string_dtype)
+        else:
+            new = None
+        if new is not None:
+            compacted[name] = new
+
+    if compacted:
+        df = df.copy(deep=False)
+        for name, series in compacted.items():
+            df[name] = series
+    bytes_after = memory_bytes(df)
+    report = {
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_saved': bytes_before - bytes_after,
+        'columns': {name: str(series.dtype) for name, series in compacted.items()},
+    }
+    print(f"🗜️ Compact dtypes: {bytes_before / 1e6:.1f} MB -> {bytes_after / 1e6:.1f} MB "
+          f"({len(compacted)} columns)", flush=True)
+    return df, report
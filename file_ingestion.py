@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Parallel Upload Ingestion
+并行文件解析
+
+Parses every uploaded file (CSV/TXT, Excel, RIS, BibTeX, RTF, Parquet,
+Arrow IPC) into a DataFrame with standard columns. A multi-file upload
+is parsed in a process pool, one file per task, so a batch of WoS chunks
+and RIS files takes about as long as its slowest file:
+
+- parse_upload() parses and standardizes one file
+- load_upload() wraps it with timing and error capture (the pool task)
+- ingest_uploads() runs all uploads and returns the reports in upload
+  order; small batches are parsed inline, where a pool would only add
+  start-up and pickling cost
+- spool_upload() keeps an upload as a file in the spool directory, so
+  parsing can run in the background task after the request has returned;
+  spooled files are parsed from disk (streamed by the CSV/TXT, Excel and
+  RIS readers, memory-mapped for BibTeX and RTF), and pool workers get
+  the spool path instead of the content
+- expand_uploads() replaces .zip, .tar.gz/.tgz and .gz uploads with one
+  upload per member: members are decompressed as a stream, chunk by
+  chunk, into their own spool files and then parsed like any other file
+  (in the pool for larger batches), so a zip of 50 WoS chunks is parsed
+  like 50 uploaded files
+"""
+
+import gzip
+import io
+import mmap
+import os
+import posixpath
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+from bibtex_reader import read_bibtex
+from column_aliases import canonical_columns
+from columnar_io import COLUMNAR_EXTENSIONS, columnar_format, read_columnar
+from ris_reader import read_ris
+from rtf_reader import read_rtf
+from table_sniffer import read_table
+
+
+# Uploads smaller than this in total are parsed inline
+MIN_PARALLEL_BYTES = 4 * 1024 * 1024
+
+# Copy buffer for spooling uploads
+SPOOL_CHUNK = 1024 * 1024
+
+# Directory for spooled uploads (removed once parsed)
+DEFAULT_SPOOL_DIR = os.path.join(tempfile.gettempdir(), 'literature_screening_uploads')
+
+# Extensions parse_upload() reads
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.ris', '.bib', '.rtf', '.csv', '.txt') + COLUMNAR_EXTENSIONS
+
+# Archive kind -> extensions (.tar.gz before .gz)
+ARCHIVE_FORMATS = {
+    'tar': ('.tar.gz', '.tgz', '.tar'),
+    'zip': ('.zip',),
+    'gzip': ('.gz',),
+}
+
+ARCHIVE_EXTENSIONS = tuple(ext for extensions in ARCHIVE_FORMATS.values() for ext in extensions)
+
+# WoS to Standard Field Mapping (标准字段名: TI, AB, KW, PY, TY, LA, T2/J2, AU)
+WOS_MAPPING = {
+    'TI': 'TI',           # Title -> TI
+    'AB': 'AB',           # Abstract -> AB
+    'AU': 'AU',           # Authors -> AU
+    'SO': 'T2',           # Source title -> T2
+    'PY': 'PY',           # Year -> PY
+    'DE': 'KW',           # Author Keywords -> KW
+    'ID': 'KW',           # Keywords Plus -> KW (also merge with DE)
+    'DI': 'DO',           # DOI -> DO
+    'DT': 'TY',           # Document Type -> TY
+    'CR': 'References',
+    'C1': 'Affiliations',
+    'TC': 'Cited by',
+    'SN': 'ISSN',
+    'EI': 'EISSN',
+    'LA': 'LA',           # Language -> LA
+    'J2': 'T2',           # Journal Name -> T2
+    'T2': 'T2',           # Journal Name -> T2
+}
+
+# Worker count -> ProcessPoolExecutor
+_pools = {}
+_pool_lock = threading.Lock()
+
+
+class UploadError(ValueError):
+    """A file that cannot be parsed; the message is shown to the user as is."""
+
+
+def parse_ris_file(file_content):
+    """Parse RIS file content (bytes or a binary file) and convert to DataFrame."""
+    try:
+        # Streaming reader: tag lines go straight into per-column lists (see ris_reader.py)
+        df = read_ris(file_content)
+        
+        if df.empty:
+            raise ValueError("No RIS entries found in file")
+        
+        print(f"   RIS parser: Found {len(df)} entries, created DataFrame with {len(df)} rows", flush=True)
+        return df
+    except Exception as e:
+        print(f"   RIS parser error: {str(e)}", flush=True)
+        raise ValueError(f"Error parsing RIS file: {str(e)}")
+
+
+def parse_bibtex_file(file_content, workers=1):
+    """
+    Parse BibTeX file content (bytes or an mmap) and convert to DataFrame.
+
+    Entries are read by the fast scanner in bibtex_reader.py; with
+    workers > 1, large files are parsed in the ingestion process pool.
+    """
+    try:
+        # UTF-8 is decoded span by span (see bibtex_reader.py)
+        columns = read_bibtex(file_content, mapper=get_pool(workers).map if workers > 1 else map)
+        return pd.DataFrame(columns)
+    except Exception as e:
+        raise ValueError(f"Error parsing BibTeX file: {str(e)}")
+
+
+def parse_rtf_file(file_content):
+    """
+    Parse RTF file content and convert to DataFrame.
+    
+    RTF files from reference managers (like EndNote, Zotero) typically contain
+    structured bibliographic data. The single-pass reader (see rtf_reader.py)
+    extracts the %X fields (Title, Abstract, Authors, Journal, Year, etc.).
+    """
+    try:
+        df = read_rtf(file_content)
+        
+        if df.empty:
+            raise ValueError("Could not extract any bibliographic records from RTF file. The file may not be in a supported format.")
+        
+        print(f"   RTF parser: Found {len(df)} entries, created DataFrame with {len(df)} rows", flush=True)
+        return df
+        
+    except Exception as e:
+        print(f"   RTF parser error: {str(e)}", flush=True)
+        raise ValueError(f"Error parsing RTF file: {str(e)}")
+
+
+def parse_delimited(filename, source):
+    """
+    Parse a CSV/TXT upload: RIS content saved as .txt, else a tab- or comma-delimited table.
+
+    Args:
+        filename: Upload filename (for messages)
+        source: File content as bytes or a seekable binary file
+    """
+    in_memory = isinstance(source, (bytes, bytearray))
+    head = source[:8000] if in_memory else source.read(8000)
+
+    # Auto-detect RIS format in TXT files
+    try:
+        # 4 bytes per character at most, so this covers the first 2000 characters
+        preview = head.decode('utf-8-sig', errors='ignore')[:2000]
+        # Remove BOM and check for RIS markers
+        preview_clean = preview.lstrip('\ufeff').strip()
+        has_ris_start = preview_clean.startswith('TY  -') or preview_clean.startswith('TY -')
+        has_ris_markers = 'TY  -' in preview or 'ER  -' in preview
+        has_ris_fields = ('AB  -' in preview or 'TI  -' in preview) and 'ER  -' in preview
+
+        print(f"   File format detection: has_ris_start={has_ris_start}, has_ris_markers={has_ris_markers}, has_ris_fields={has_ris_fields}", flush=True)
+
+        if has_ris_start or has_ris_fields:
+            print(f"   ✓ Detected RIS format in {filename}, parsing as RIS...", flush=True)
+            if not in_memory:
+                source.seek(0)
+            df = parse_ris_file(source)
+            print(f"   ✓ Successfully parsed RIS file: {filename}, {len(df)} records", flush=True)
+            return df
+    except Exception as e:
+        print(f"   ✗ RIS detection/parsing failed: {str(e)[:100]}, trying CSV...", flush=True)
+
+    # Sniff encoding and delimiter from a sample, then parse once with the C engine
+    parse_error = None
+    try:
+        if not in_memory:
+            source.seek(0)
+        df, dialect = read_table(source)
+        if df is not None:
+            print(f"   Parsed {dialect['delimiter']}-delimited ({dialect['encoding']}): {len(df)} rows, {len(df.columns)} cols, score={dialect['score']}", flush=True)
+    except Exception as e:
+        df, parse_error = None, str(e)
+
+    # If still no good result, the file might have issues
+    if df is None or len(df) == 0 or len(df.columns) <= 1:
+        error_msg = f'无法正确解析文件: {filename}。'
+        if df is not None and len(df.columns) <= 1:
+            # Show first few lines for debugging
+            preview = head.decode('utf-8', errors='ignore')[:500]
+            error_msg += f'\n\n文件似乎不是标准的CSV/TXT格式（只检测到{len(df.columns)}列）。'
+            error_msg += f'\n\n💡 建议：'
+            error_msg += f'\n1. 如果是从Excel导出的，请直接上传.xlsx文件'
+            error_msg += f'\n2. 如果是WoS/Scopus导出，请确保选择"制表符分隔"格式'
+            error_msg += f'\n3. 检查文件是否包含完整的文献数据（标题、摘要等列）'
+            print(f"\n⚠️  File parsing issue for {filename}:", flush=True)
+            print(f"   Columns detected: {len(df.columns)}", flush=True)
+            print(f"   Rows: {len(df)}", flush=True)
+            print(f"   First column name: {df.columns[0] if len(df.columns) > 0 else 'N/A'}", flush=True)
+            print(f"   File preview: {preview[:200]}...", flush=True)
+        elif parse_error:
+            error_msg += f' (错误: {parse_error})'
+        elif df is None:
+            error_msg += '\n\n未检测到制表符或逗号分隔的多列数据。'
+        raise UploadError(error_msg)
+
+    # Sanity check: warn if too many rows (likely parsing error)
+    if len(df) > 50000:
+        print(f"   ⚠️  WARNING: Parsed {len(df)} rows - this seems unusually large!", flush=True)
+        print(f"   File might be improperly formatted. Columns found: {list(df.columns[:10])}", flush=True)
+    return df
+
+
+def join_cells(frame):
+    """'; '-join of the non-empty cells of each row (NaN where all are empty)."""
+    joined = None
+    for i in range(frame.shape[1]):
+        part = frame.iloc[:, i]
+        part = part.where(part.notna(), '').astype(str).str.strip().to_numpy(dtype=object)
+        if joined is None:
+            joined = part
+            continue
+        both = (joined != '') & (part != '')
+        joined = np.where(both, joined + '; ' + part, np.where(joined != '', joined, part))
+    return pd.Series(joined, index=frame.index, dtype=object).replace('', np.nan)
+
+
+def merge_repeated_columns(df):
+    """
+    Collapse columns that share a name after WOS_MAPPING into one column.
+
+    Keywords (KW, from DE and ID) are '; '-joined; for other fields the
+    first non-missing cell wins. The merged column takes the place of the
+    first one.
+    """
+    repeated = df.columns[df.columns.duplicated()].unique()
+    if len(repeated) == 0:
+        return df
+    merged = {}
+    for name in repeated:
+        frame = df.loc[:, df.columns == name]
+        if name == 'KW':
+            merged[name] = join_cells(frame)
+        else:
+            merged[name] = frame.bfill(axis=1).iloc[:, 0]
+    keep = ~df.columns.duplicated()
+    df = df.loc[:, keep].copy()
+    for name, column in merged.items():
+        df[name] = column
+    return df
+
+
+@contextmanager
+def mapped_content(source):
+    """Bytes-like content of an upload: bytes as is, a read-only mmap of a file on disk, else the read content."""
+    if isinstance(source, (bytes, bytearray)):
+        yield source
+        return
+    try:
+        buffer = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, OSError, ValueError, io.UnsupportedOperation):
+        # In-memory streams, and empty files (which cannot be mapped)
+        yield source.read()
+        return
+    with buffer:
+        yield buffer
+
+
+def parse_upload(filename, source, workers=1):
+    """
+    Parse one uploaded file into a DataFrame with standard columns.
+
+    Args:
+        filename: Upload filename (the extension selects the parser)
+        source: File content as bytes, a binary file, or the path of a spooled upload
+        workers: Worker processes a single large file may use (BibTeX)
+
+    Raises:
+        UploadError: Unsupported or unreadable file (message for the user)
+    """
+    name = filename.lower()
+    if not name.endswith(SUPPORTED_EXTENSIONS):
+        raise UploadError(f'Unsupported file format: {filename}')
+
+    fmt = columnar_format(name)
+    if isinstance(source, (str, os.PathLike)) and fmt is None:
+        with open(source, 'rb') as stream:
+            return parse_upload(filename, stream, workers)
+
+    try:
+        if fmt:
+            # Spooled Parquet / Arrow files are memory-mapped by pyarrow
+            df = read_columnar(source, fmt)
+            print(f"   Parsed {fmt} file: {name}, {len(df)} records, {len(df.columns)} cols", flush=True)
+        elif name.endswith(('.xlsx', '.xls')):
+            stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+            df = pd.read_excel(stream, engine='openpyxl' if name.endswith('.xlsx') else 'xlrd')
+        elif name.endswith('.ris'):
+            # RIS is read straight from the stream (see ris_reader.py)
+            df = parse_ris_file(source)
+            print(f"   Parsed RIS file: {name}, {len(df)} records", flush=True)
+        elif name.endswith(('.bib', '.rtf')):
+            with mapped_content(source) as content:
+                if name.endswith('.bib'):
+                    df = parse_bibtex_file(content, workers)
+                    print(f"   Parsed BibTeX file: {name}, {len(df)} records", flush=True)
+                else:
+                    df = parse_rtf_file(content)
+                    print(f"   Parsed RTF file: {name}, {len(df)} records", flush=True)
+        else:
+            # WoS exports often come as tab-delimited .txt or .csv
+            df = parse_delimited(filename, source)
+    except UploadError:
+        raise
+    except Exception as e:
+        raise UploadError(f'Error reading file {filename}: {str(e)}')
+
+    # Standardize Columns
+    # Check if it looks like WoS (has TI and SO)
+    if 'TI' in df.columns and 'SO' in df.columns:
+        print(f"   Detected WoS format for {name}, standardizing...", flush=True)
+        df = df.rename(columns=WOS_MAPPING)
+        # DE + ID -> one KW column (and SO / J2 / T2 -> one T2 column)
+        df = merge_repeated_columns(df)
+
+    # Store each field once under its standard tag (标准字段名: TI, AB, KW, PY, TY, LA, T2, AU);
+    # legacy names (Title, Abstract, ...) are aliases resolved on lookup and export
+    return canonical_columns(df)
+
+
+def load_upload(filename, source, workers=1):
+    """
+    Parse one upload and report how it went; never raises (pool task).
+
+    Returns:
+        Dict with filename, df (None on error), rows, seconds, error
+    """
+    start = time.time()
+    try:
+        df, error = parse_upload(filename, source, workers), None
+    except Exception as e:
+        df, error = None, str(e)
+    return {
+        'filename': filename,
+        'df': df,
+        'rows': 0 if df is None else len(df),
+        'seconds': round(time.time() - start, 3),
+        'error': error,
+    }
+
+
+def get_pool(workers):
+    """
+    Return the shared ingestion process pool for this worker count.
+
+    One pool is kept per worker count, so a pool is never shut down while
+    another upload may still have work queued on it.
+    """
+    with _pool_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # 'spawn' so workers never inherit Flask threads or locks via fork
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+        return pool
+
+
+def spool_file(spool_dir=None):
+    """New temporary file in the spool directory (deleted on close), e.g. for werkzeug to write an upload to."""
+    spool_dir = spool_dir or DEFAULT_SPOOL_DIR
+    os.makedirs(spool_dir, exist_ok=True)
+    return tempfile.NamedTemporaryFile('w+b', dir=spool_dir, prefix='upload-')
+
+
+def spool_upload(stream, spool_dir=None):
+    """
+    Keep an upload for the background task as a file in the spool directory.
+
+    A stream that already is a file on disk (see spool_file) is hard-linked
+    under a new name, so it outlives the request without a copy; other
+    streams are copied in chunks. The caller removes the file when done.
+
+    Returns:
+        Path of the spooled file
+    """
+    spool_dir = spool_dir or DEFAULT_SPOOL_DIR
+    os.makedirs(spool_dir, exist_ok=True)
+    path = os.path.join(spool_dir, f'upload-{uuid.uuid4().hex}')
+    name = getattr(stream, 'name', None)
+    if isinstance(name, str) and os.path.isfile(name):
+        try:
+            os.link(name, path)
+            return path
+        except OSError:
+            pass  # No hard links here (other file system, FAT, ...); copy instead
+    stream.seek(0)
+    with open(path, 'xb') as spool:
+        shutil.copyfileobj(stream, spool, SPOOL_CHUNK)
+    return path
+
+
+def remove_spool(path):
+    """Delete a spooled upload (no error if it is already gone)."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def archive_format(filename):
+    """'tar' / 'zip' / 'gzip' for an archive filename, else None."""
+    name = str(filename).lower()
+    for fmt, extensions in ARCHIVE_FORMATS.items():
+        if name.endswith(extensions):
+            return fmt
+    return None
+
+
+def archive_members(filename, stream):
+    """
+    Yield (member name, decompressing stream) for the files in an archive.
+
+    Tar archives are read in streaming mode, one member after the other;
+    a .gz file has a single member named after the archive.
+    """
+    fmt = archive_format(filename)
+    if fmt == 'gzip':
+        yield os.path.basename(filename)[:-len('.gz')], gzip.GzipFile(fileobj=stream, mode='rb')
+    elif fmt == 'zip':
+        with zipfile.ZipFile(stream) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    with archive.open(info) as member:
+                        yield info.filename, member
+    else:
+        with tarfile.open(fileobj=stream, mode='r|*') as archive:
+            for info in archive:
+                if info.isfile():
+                    yield info.name, archive.extractfile(info)
+
+
+def expand_archive(filename, source, spool_dir=None, max_bytes=None):
+    """
+    Decompress the supported files of an archive upload into spool files.
+
+    Members are streamed to disk in chunks, never held in memory as a
+    whole. Folders inside the archive are kept in the member names
+    (e.g. 'wos.zip/part1/savedrecs.txt'); other file types and macOS
+    metadata (__MACOSX/, ._*) are skipped. The caller removes the spooled
+    files when done.
+
+    Args:
+        filename: Archive filename (.zip, .tar.gz/.tgz/.tar or .gz)
+        source: Archive content as bytes, a binary file or a path
+        spool_dir: Directory for the member files
+        max_bytes: Limit on the decompressed size of all members
+
+    Returns:
+        List of (member filename, spooled member path)
+
+    Raises:
+        UploadError: Unreadable archive, no supported files, or over max_bytes
+    """
+    spool_dir = spool_dir or DEFAULT_SPOOL_DIR
+    os.makedirs(spool_dir, exist_ok=True)
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as stream:
+            return expand_archive(filename, stream, spool_dir, max_bytes)
+
+    members = []
+    total_bytes = 0
+    entries = archive_members(filename, source)
+    try:
+        for name, stream in entries:
+            base = posixpath.basename(name)
+            if name.startswith('__MACOSX/') or base.startswith('.') or not base.lower().endswith(SUPPORTED_EXTENSIONS):
+                print(f"   Skipped {filename}/{name} (not a supported file)", flush=True)
+                continue
+            path = os.path.join(spool_dir, f'upload-{uuid.uuid4().hex}')
+            members.append((f'{filename}/{name}', path))
+            with open(path, 'xb') as spool:
+                while True:
+                    chunk = stream.read(SPOOL_CHUNK)
+                    if not chunk:
+                        break
+                    total_bytes += len(chunk)
+                    if max_bytes is not None and total_bytes > max_bytes:
+                        raise UploadError(f'Archive {filename} is larger than {max_bytes / (1024 * 1024):g} MB '
+                                          f'when decompressed')
+                    spool.write(chunk)
+    except Exception as e:
+        for _, path in members:
+            remove_spool(path)
+        if isinstance(e, UploadError):
+            raise
+        raise UploadError(f'Error reading archive {filename}: {str(e)}')
+    finally:
+        entries.close()
+
+    if not members:
+        raise UploadError(f'No supported files in archive {filename} '
+                          f'(expected {", ".join(SUPPORTED_EXTENSIONS)})')
+    print(f"   📦 {filename}: {len(members)} files, {total_bytes / 1e6:.1f} MB decompressed", flush=True)
+    return members
+
+
+def expand_uploads(uploads, spool_dir=None, max_bytes=None):
+    """
+    Replace each archive in a list of uploads with its members (see expand_archive).
+
+    Args:
+        uploads: List of (filename, bytes, binary file or spooled upload path)
+        spool_dir: Directory for the member files
+        max_bytes: Limit on the decompressed size of each archive
+
+    Returns:
+        (uploads with archives expanded, spool paths of the members)
+    """
+    expanded, member_paths = [], []
+    try:
+        for filename, source in uploads:
+            if archive_format(filename) is None:
+                expanded.append((filename, source))
+                continue
+            members = expand_archive(filename, source, spool_dir, max_bytes)
+            expanded.extend(members)
+            member_paths.extend(path for _, path in members)
+    except Exception:
+        for path in member_paths:
+            remove_spool(path)
+        raise
+    return expanded, member_paths
+
+
+def upload_size(source):
+    """Size in bytes of upload content, a spooled upload path or a seekable binary file."""
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    position = source.tell()
+    size = source.seek(0, io.SEEK_END)
+    source.seek(position)
+    return size
+
+
+def ingest_uploads(uploads, workers=1, on_progress=None):
+    """
+    Parse all uploads, in parallel when it pays off.
+
+    Args:
+        uploads: List of (filename, bytes, binary file or spooled upload path)
+        workers: Maximum worker processes (1 = parse inline)
+        on_progress: Optional callback(files_done, files_total, rows_parsed),
+            called as each file finishes
+
+    Returns:
+        List of load_upload() reports in upload order
+    """
+    start = time.time()
+    total_bytes = sum(upload_size(source) for _, source in uploads)
+    file_workers = min(workers, len(uploads)) if total_bytes >= MIN_PARALLEL_BYTES else 1
+
+    rows_parsed = 0
+
+    def finished(files_done, report):
+        nonlocal rows_parsed
+        rows_parsed += report['rows']
+        if on_progress is not None:
+            on_progress(files_done, len(uploads), rows_parsed)
+
+    if file_workers <= 1:
+        # Parsed here; a single large BibTeX file can still spread its entries over the pool
+        reports = []
+        for files_done, (filename, source) in enumerate(uploads, 1):
+            reports.append(load_upload(filename, source, workers))
+            finished(files_done, reports[-1])
+    else:
+        pool = get_pool(workers)
+        # Workers get the raw bytes or the spool path; parsed DataFrames come back pickled
+        futures = [pool.submit(load_upload, filename,
+                               source if isinstance(source, (bytes, bytearray, str, os.PathLike)) else source.read())
+                   for filename, source in uploads]
+        for files_done, future in enumerate(as_completed(futures), 1):
+            finished(files_done, future.result())
+        reports = [future.result() for future in futures]
+
+    for report in reports:
+        status = f"❌ {report['error'][:100]}" if report['error'] else f"{report['rows']} rows"
+        print(f"   📄 {report['filename']}: {status} in {report['seconds']:.2f}s", flush=True)
+    print(f"📥 Parsed {len(uploads)} files ({total_bytes / 1e6:.1f} MB, {file_workers} workers) "
+          f"in {time.time() - start:.2f}s", flush=True)
+    return reports
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized Keyword Screening Engine
+列式关键词筛选引擎
+
+Evaluates a keyword blacklist against whole Title/Abstract/Source title
+columns at once instead of walking the DataFrame row by row. Each field is
+lowercased a single time and every keyword is normalized a single time.
+
+Semantics match the original per-row loop exactly:
+- Non-string cells (NaN, numbers) never match
+- Within one field the *first keyword in blacklist order* that occurs wins
+- Reasons are joined with ' | ' in Title, Abstract, Journal order
+"""
+
+import numpy as np
+import pandas as pd
+
+from keyword_matcher import get_matcher
+
+
+# Blacklists at least this long are matched with one Aho-Corasick pass per
+# cell (keyword_matcher.py). Shorter lists are faster as one C-level
+# substring scan per keyword over the whole column.
+AUTOMATON_MIN_KEYWORDS = 64
+
+# Reason labels used by the web app (app.py)
+DEFAULT_LABELS = {
+    'title': 'Title',
+    'abstract': 'Abstract',
+    'source': 'Journal',
+}
+
+
+def normalize_keywords(blacklist):
+    """
+    Lowercase every keyword once. Returns list of (original, needle).
+
+    Surrounding spaces are kept, as in the original screener loop, so " ai "
+    matches the word "ai" but not "said" (the web app strips its keywords
+    when it reads the form). Blank keywords are dropped: an empty needle
+    would match every cell while reporting '' as the keyword.
+    """
+    return [(keyword, keyword.lower()) for keyword in blacklist if keyword.strip()]
+
+
+def lowercase_field(series):
+    """
+    Lowercase a text column once.
+
+    Returns an object ndarray where non-string cells are None so they can
+    never match (same as the `isinstance(text, str)` guard in the loop).
+    """
+    values = series.to_numpy(dtype=object)
+    is_text = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+    lowered = np.full(len(values), None, dtype=object)
+    if is_text.any():
+        lowered[is_text] = pd.Series(values[is_text], dtype=object).str.lower().to_numpy(dtype=object)
+    return lowered
+
+
+def first_match(lowered, blacklist, match_mode='substring'):
+    """
+    Find the first blacklisted keyword (in blacklist order) for every cell.
+
+    Args:
+        lowered: Object ndarray from lowercase_field()
+        blacklist: Keywords in priority order
+        match_mode: 'substring' (default) or 'word' (whole words/phrases)
+
+    Returns:
+        Object ndarray with the matched original keyword or '' per cell
+    """
+    matched = np.full(len(lowered), '', dtype=object)
+    pending = np.flatnonzero(np.fromiter((v is not None for v in lowered), dtype=bool, count=len(lowered)))
+    if len(pending) == 0 or not blacklist:
+        return matched
+
+    if match_mode != 'substring' or len(blacklist) >= AUTOMATON_MIN_KEYWORDS:
+        matcher = get_matcher(blacklist, match_mode)
+        matched[pending] = [matcher.first_keyword(text) for text in lowered[pending]]
+        return matched
+
+    for original, needle in normalize_keywords(blacklist):
+        if len(pending) == 0:
+            break
+        hits = pd.Series(lowered[pending], dtype=object).str.contains(needle, regex=False).to_numpy(dtype=bool)
+        if hits.any():
+            matched[pending[hits]] = original
+            pending = pending[~hits]
+
+    return matched
+
+
+def match_field(series, blacklist, match_mode='substring'):
+    """
+    first_match() for a column. Categorical columns (see dtype_compaction.py)
+    are matched once per category and the result is broadcast by code.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        matched = first_match(lowercase_field(pd.Series(series.cat.categories, dtype=object)), blacklist, match_mode)
+        # Missing cells have code -1, which picks the trailing ''
+        return np.append(matched, '')[series.cat.codes.to_numpy()]
+    return first_match(lowercase_field(series), blacklist, match_mode)
+
+
+def screen_keywords(df, title_col, abstract_col, source_col, ta_blacklist, journal_blacklist, labels=None,
+                    match_mode='substring'):
+    """
+    Screen a DataFrame against title/abstract and journal blacklists.
+
+    Args:
+        df: DataFrame to screen
+        title_col / abstract_col / source_col: Column names (None to skip)
+        ta_blacklist: Keywords checked in title and abstract
+        journal_blacklist: Keywords checked in source title
+        labels: Reason labels dict with 'title', 'abstract', 'source' keys
+        match_mode: 'substring' (default) or 'word' (whole words/phrases)
+
+    Returns:
+        Tuple of (excluded bool ndarray, reasons list, counts dict)
+    """
+    labels = labels or DEFAULT_LABELS
+    n = len(df)
+
+    field_matches = {}
+    for field, col, blacklist in (('title', title_col, ta_blacklist),
+                                  ('abstract', abstract_col, ta_blacklist),
+                                  ('source', source_col, journal_blacklist)):
+        if col:
+            field_matches[field] = match_field(df[col], blacklist, match_mode)
+        else:
+            field_matches[field] = np.full(n, '', dtype=object)
+
+    return combine_matches(field_matches, labels)
+
+
+def combine_matches(field_matches, labels=None):
+    """
+    Turn per-field matched keywords into exclusion flags, reasons and counts.
+
+    Args:
+        field_matches: Dict with 'title', 'abstract', 'source' object ndarrays
+            holding the matched keyword or '' per row
+        labels: Reason labels dict with 'title', 'abstract', 'source' keys
+
+    Returns:
+        Tuple of (excluded bool ndarray, reasons list, counts dict)
+    """
+    labels = labels or DEFAULT_LABELS
+    ordered = [(labels[field], field_matches[field]) for field in ('title', 'abstract', 'source')]
+
+    title_hit = field_matches['title'] != ''
+    abstract_hit = field_matches['abstract'] != ''
+    source_hit = field_matches['source'] != ''
+    ta_hit = title_hit | abstract_hit
+    excluded = ta_hit | source_hit
+
+    reasons = [''] * len(excluded)
+    for pos in np.flatnonzero(excluded):
+        reasons[pos] = ' | '.join(
+            f"{label}: '{matched[pos]}'" for label, matched in ordered if matched[pos]
+        )
+
+    counts = {
+        'title_abstract_excluded': int(ta_hit.sum()),
+        'journal_excluded': int((source_hit & ~ta_hit).sum()),
+    }
+    return excluded, reasons, counts
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-Pattern Keyword Matchers
+多模式关键词匹配器
+
+Two matching modes, both returning the first blacklisted keyword in
+blacklist order (same as the original `for keyword in blacklist` loop):
+
+- 'substring': Aho-Corasick automaton, one pass over the characters.
+  "cell" matches "Excellence" (original behaviour).
+- 'word': Whole-word/phrase matching. Text is tokenized once into integer
+  token ids and phrases are looked up in a hash index, so the cost per
+  record is O(tokens) whatever the blacklist size. "cell" no longer
+  matches "Excellence", and "clinical trial" matches "A Clinical Trial of"
+  but not "clinical trials".
+
+Compiled matchers are cached by a hash of the keyword list, so repeated jobs
+with the same `ta_keywords` / `journal_keywords` skip the rebuild.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+
+# Maximum number of compiled matchers kept in memory
+MATCHER_CACHE_SIZE = 32
+
+# Matching modes accepted by get_matcher() / screen_keywords()
+MATCH_MODES = ('substring', 'word')
+
+# Word tokens for whole-word matching ("game-theoretic" -> game, theoretic)
+TOKEN_PATTERN = re.compile(r'\w+')
+
+_matcher_cache = OrderedDict()
+_matcher_cache_lock = threading.Lock()
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over lowercased keywords (padding kept).
+
+    The goto/fail functions are flattened into a deterministic transition
+    table, and every state stores the smallest blacklist index it (or any
+    suffix of it) completes, so scanning is one dict lookup per character.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.no_match = len(self.keywords)
+
+        goto = [{}]
+        best = [self.no_match]
+        for index, keyword in enumerate(self.keywords):
+            needle = keyword.lower()
+            if not needle.strip():
+                # Blank keywords would match everywhere and report ''
+                continue
+            state = 0
+            for ch in needle:
+                next_state = goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][ch] = next_state
+                    goto.append({})
+                    best.append(self.no_match)
+                state = next_state
+            best[state] = min(best[state], index)
+
+        # Breadth-first pass: fail links, inherited outputs and full transitions
+        delta = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            best[state] = min(best[state], best[0])
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            transitions = dict(delta[fail[state]])
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0)
+                best[child] = min(best[child], best[fail[child]])
+                transitions[ch] = child
+                queue.append(child)
+            delta[state] = transitions
+
+        self._delta = delta
+        self._best = best
+
+    def find_first(self, text_lower):
+        """
+        Return the index of the first matching keyword in blacklist order,
+        or -1 if no keyword occurs in the (already lowercased) text.
+        """
+        delta = self._delta
+        best = self._best
+        found = best[0]
+        if found == 0:
+            return 0
+        state = 0
+        for ch in text_lower:
+            state = delta[state].get(ch, 0)
+            if best[state] < found:
+                found = best[state]
+                if found == 0:
+                    break
+        return found if found < self.no_match else -1
+
+    def first_keyword(self, text_lower):
+        """Return the matched original keyword or '' if none matches."""
+        index = self.find_first(text_lower)
+        return self.keywords[index] if index >= 0 else ''
+
+
+class TokenPhraseIndex:
+    """
+    Whole-word/phrase matcher over an integer token vocabulary.
+
+    Only tokens that occur in some keyword get an id; every other text token
+    maps to -1 and is skipped. Phrases are stored as tuples of ids, grouped
+    by their first token, with the smallest blacklist index per phrase.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self.no_match = len(self.keywords)
+        self.vocab = {}
+        self.phrases = {}
+        self.lengths = {}
+
+        for index, keyword in enumerate(self.keywords):
+            tokens = TOKEN_PATTERN.findall(keyword.lower())
+            if not tokens:
+                # Keywords without word characters cannot match whole words
+                continue
+            ids = tuple(self.vocab.setdefault(token, len(self.vocab)) for token in tokens)
+            if index < self.phrases.get(ids, self.no_match):
+                self.phrases[ids] = index
+            self.lengths.setdefault(ids[0], set()).add(len(ids))
+
+        self.lengths = {first: sorted(lengths) for first, lengths in self.lengths.items()}
+
+    def token_ids(self, text_lower):
+        """Tokenize text once into ids (-1 for tokens not in any keyword)."""
+        vocab = self.vocab
+        return [vocab.get(token, -1) for token in TOKEN_PATTERN.findall(text_lower)]
+
+    def find_first(self, text_lower):
+        """Return the index of the first matching keyword, or -1."""
+        ids = self.token_ids(text_lower)
+        phrases = self.phrases
+        lengths = self.lengths
+        found = self.no_match
+        for pos, token_id in enumerate(ids):
+            if token_id < 0:
+                continue
+            for length in lengths.get(token_id, ()):
+                index = phrases.get(tuple(ids[pos:pos + length]), self.no_match)
+                if index < found:
+                    found = index
+                    if found == 0:
+                        return 0
+        return found if found < self.no_match else -1
+
+    def first_keyword(self, text_lower):
+        """Return the matched original keyword or '' if none matches."""
+        index = self.find_first(text_lower)
+        return self.keywords[index] if index >= 0 else ''
+
+
+def blacklist_hash(blacklist):
+    """Stable hash of a keyword list (order matters for first-match semantics)."""
+    digest = hashlib.sha1()
+    for keyword in blacklist:
+        digest.update(keyword.encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+def get_matcher(blacklist, match_mode='substring'):
+    """Return a compiled matcher for the blacklist and mode, building it only once."""
+    if match_mode not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode: {match_mode}")
+    key = (match_mode, blacklist_hash(blacklist))
+    with _matcher_cache_lock:
+        matcher = _matcher_cache.get(key)
+        if matcher is not None:
+            _matcher_cache.move_to_end(key)
+            return matcher
+
+    matcher = TokenPhraseIndex(blacklist) if match_mode == 'word' else KeywordAutomaton(blacklist)
+
+    with _matcher_cache_lock:
+        _matcher_cache[key] = matcher
+        while len(_matcher_cache) > MATCHER_CACHE_SIZE:
+            _matcher_cache.popitem(last=False)
+    return matcher
+
+
+def get_automaton(blacklist):
+    """Return the cached Aho-Corasick automaton for the blacklist."""
+    return get_matcher(blacklist, 'substring')
@@ -11,12 +11,19 @@ This script automates the initial screening process for systematic reviews
 by filtering literature based on title, abstract, and journal keywords.
 """
 
+import argparse
 import pandas as pd
 import os
 import sys
+import tempfile
 from datetime import datetime
 from pathlib import Path
 
+from columnar_io import ColumnarUnavailable, columnar_format, read_columnar, require_pyarrow, write_columnar
+from file_ingestion import UploadError, archive_format, expand_archive, ingest_uploads
+from keyword_engine import screen_keywords
+from keyword_matcher import get_matcher
+
 
 # ============================================================================
 # 🔧 CONFIGURATION SECTION - 配置区域
@@ -83,10 +90,18 @@ COLUMN_MAPPINGS = {
     # Abstract columns  
     "abstract": ["Abstract", "abstract", "AB", "Description"],
     # Source/Journal columns
-    "source": ["Source Title", "source title", "SO", "Source", "Journal", 
+    "source": ["Source Title", "source title", "SO", "T2", "Source", "Journal", 
                "Publication Name", "Publication", "Journal Title"],
 }
 
+# 🏷️ Exclusion reason labels written to Exclusion_Reason
+# 排除原因标签
+REASON_LABELS = {
+    "title": "Title contains",
+    "abstract": "Abstract contains",
+    "source": "Journal contains",
+}
+
 
 # ============================================================================
 # 🚀 MAIN SCREENING LOGIC - 主筛选逻辑
@@ -101,28 +116,48 @@ def find_column(df: pd.DataFrame, column_type: str) -> str | None:
     return None
 
 
-def contains_blacklisted_keyword(text: str, blacklist: list) -> tuple[bool, str]:
+def contains_blacklisted_keyword(text: str, blacklist: list, match_mode: str = "substring") -> tuple[bool, str]:
     """
     Check if text contains any blacklisted keyword.
+    match_mode='word' only matches whole words/phrases.
     Returns (is_blacklisted, matched_keyword).
     """
     if pd.isna(text) or not isinstance(text, str):
         return False, ""
     
-    text_lower = text.lower()
-    for keyword in blacklist:
-        if keyword.lower() in text_lower:
-            return True, keyword
-    return False, ""
+    keyword = get_matcher(blacklist, match_mode).first_keyword(text.lower())
+    return (True, keyword) if keyword else (False, "")
+
+
+def read_archive(input_file: str) -> pd.DataFrame:
+    """
+    Read every supported file in a .zip / .tar.gz / .gz archive into one DataFrame.
+
+    Members are decompressed one at a time into a temporary directory and
+    parsed in parallel with the web app's parsers (WoS, RIS, BibTeX, ...),
+    so columns come out under the standard tags (TI, AB, T2, ...).
+    """
+    with tempfile.TemporaryDirectory() as spool_dir:
+        members = expand_archive(Path(input_file).name, input_file, spool_dir)
+        reports = ingest_uploads(members, workers=min(4, os.cpu_count() or 1))
+    errors = [report['error'] for report in reports if report['error']]
+    if errors:
+        raise UploadError('\n'.join(errors))
+    print(f"   Read {len(reports)} files from the archive")
+    return pd.concat([report['df'] for report in reports], ignore_index=True)
 
 
-def screen_literature(input_file: str, output_dir: str = None) -> dict:
+def screen_literature(input_file: str, output_dir: str = None, match_mode: str = "substring",
+                      output_format: str = "csv") -> dict:
     """
     Main screening function.
     
     Args:
-        input_file: Path to the input Excel/CSV file
+        input_file: Path to the input Excel/CSV/Parquet/Arrow IPC file, or a
+            .zip/.tar.gz/.gz archive of files in any format the web app reads
         output_dir: Directory for output files (defaults to input file's directory)
+        match_mode: 'substring' (default) or 'word' (whole words/phrases only)
+        output_format: 'csv' (default), 'parquet' or 'feather' (Arrow IPC)
     
     Returns:
         Dictionary with screening statistics
@@ -139,8 +174,20 @@ def screen_literature(input_file: str, output_dir: str = None) -> dict:
     
     print(f"\n📂 Reading file: {input_path.name}")
     
-    if input_path.suffix.lower() in ['.xlsx', '.xls']:
+    if archive_format(input_path.name):
+        try:
+            df = read_archive(input_file)
+        except UploadError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+    elif input_path.suffix.lower() in ['.xlsx', '.xls']:
         df = pd.read_excel(input_file, engine='openpyxl')
+    elif columnar_format(input_path.name):
+        try:
+            df = read_columnar(input_file, columnar_format(input_path.name))
+        except ColumnarUnavailable as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
     elif input_path.suffix.lower() == '.csv':
         # Try different encodings
         for encoding in ['utf-8', 'utf-8-sig', 'gbk', 'latin-1']:
@@ -154,7 +201,7 @@ def screen_literature(input_file: str, output_dir: str = None) -> dict:
             sys.exit(1)
     else:
         print(f"❌ Error: Unsupported file format - {input_path.suffix}")
-        print("   Supported formats: .xlsx, .xls, .csv")
+        print("   Supported formats: .xlsx, .xls, .csv, .parquet, .feather/.arrow, .zip/.tar.gz/.gz archives")
         sys.exit(1)
     
     total_records = len(df)
@@ -179,54 +226,24 @@ def screen_literature(input_file: str, output_dir: str = None) -> dict:
     df['_EXCLUSION_REASON'] = ''
     
     # Screening process
-    print(f"\n⏳ Screening in progress...")
-    
-    excluded_count = 0
-    title_abstract_excluded = 0
-    journal_excluded = 0
-    
-    for idx, row in df.iterrows():
-        exclusion_reasons = []
-        
-        # Check Title
-        if title_col:
-            is_excluded, keyword = contains_blacklisted_keyword(
-                row[title_col], TITLE_ABSTRACT_BLACKLIST
-            )
-            if is_excluded:
-                exclusion_reasons.append(f"Title contains: '{keyword}'")
-        
-        # Check Abstract
-        if abstract_col:
-            is_excluded, keyword = contains_blacklisted_keyword(
-                row[abstract_col], TITLE_ABSTRACT_BLACKLIST
-            )
-            if is_excluded:
-                exclusion_reasons.append(f"Abstract contains: '{keyword}'")
-        
-        # Count title/abstract exclusions
-        if exclusion_reasons:
-            title_abstract_excluded += 1
-        
-        # Check Source/Journal
-        if source_col:
-            is_excluded, keyword = contains_blacklisted_keyword(
-                row[source_col], JOURNAL_BLACKLIST
-            )
-            if is_excluded:
-                exclusion_reasons.append(f"Journal contains: '{keyword}'")
-                if len(exclusion_reasons) == 1:  # Only journal exclusion
-                    journal_excluded += 1
-        
-        # Mark as excluded if any reason found
-        if exclusion_reasons:
-            df.at[idx, '_EXCLUDED'] = True
-            df.at[idx, '_EXCLUSION_REASON'] = ' | '.join(exclusion_reasons)
-            excluded_count += 1
+    print(f"\n⏳ Screening in progress... (match mode: {match_mode})")
+    
+    excluded, reasons, counts = screen_keywords(
+        df, title_col, abstract_col, source_col,
+        TITLE_ABSTRACT_BLACKLIST, JOURNAL_BLACKLIST,
+        labels=REASON_LABELS,
+        match_mode=match_mode,
+    )
+    df['_EXCLUDED'] = excluded
+    df['_EXCLUSION_REASON'] = reasons
+    
+    excluded_count = int(excluded.sum())
+    title_abstract_excluded = counts['title_abstract_excluded']
+    journal_excluded = counts['journal_excluded']
     
     # Split into kept and removed dataframes
-    df_kept = df[df['_EXCLUDED'] == False].drop(columns=['_EXCLUDED', '_EXCLUSION_REASON'])
-    df_removed = df[df['_EXCLUDED'] == True].copy()
+    df_kept = df[~df['_EXCLUDED']].drop(columns=['_EXCLUDED', '_EXCLUSION_REASON'])
+    df_removed = df[df['_EXCLUDED']].copy()
     df_removed = df_removed.rename(columns={'_EXCLUSION_REASON': 'Exclusion_Reason'})
     df_removed = df_removed.drop(columns=['_EXCLUDED'])
     
@@ -239,13 +256,16 @@ def screen_literature(input_file: str, output_dir: str = None) -> dict:
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
-    # Save cleaned data
-    cleaned_file = output_dir / f"cleaned_data_{timestamp}.csv"
-    df_kept.to_csv(cleaned_file, index=False, encoding='utf-8-sig')
-    
-    # Save removed data
-    removed_file = output_dir / f"removed_data_{timestamp}.csv"
-    df_removed.to_csv(removed_file, index=False, encoding='utf-8-sig')
+    # Save cleaned and removed data
+    cleaned_file = output_dir / f"cleaned_data_{timestamp}.{output_format}"
+    removed_file = output_dir / f"removed_data_{timestamp}.{output_format}"
+    if output_format == 'csv':
+        df_kept.to_csv(cleaned_file, index=False, encoding='utf-8-sig')
+        df_removed.to_csv(removed_file, index=False, encoding='utf-8-sig')
+    else:
+        # Typed columns for downstream tools (needs pyarrow)
+        write_columnar(df_kept, output_format, cleaned_file)
+        write_columnar(df_removed, output_format, removed_file)
     
     # Calculate statistics
     kept_count = len(df_kept)
@@ -310,9 +330,18 @@ def main():
     ╚═══════════════════════════════════════════════════════════╝
     """)
     
+    parser = argparse.ArgumentParser(description="Literature screening for meta-analysis / 文献粗筛工具")
+    parser.add_argument("input_file", nargs="?", help="Excel, CSV, Parquet or Arrow IPC (Feather) file, or a .zip/.tar.gz/.gz archive of exports, to screen")
+    parser.add_argument("-o", "--output-dir", help="Directory for output files (default: next to input)")
+    parser.add_argument("-w", "--whole-word", action="store_true",
+                        help="Match keywords as whole words/phrases only / 仅匹配完整单词")
+    parser.add_argument("-f", "--format", choices=["csv", "parquet", "feather"], default="csv",
+                        help="Output file format (parquet/feather need pyarrow) / 输出文件格式")
+    args = parser.parse_args()
+    
     # Check for command line argument
-    if len(sys.argv) > 1:
-        input_file = sys.argv[1]
+    if args.input_file:
+        input_file = args.input_file
     else:
         # Interactive mode
         print("Please enter the path to your literature file (Excel or CSV):")
@@ -322,9 +351,17 @@ def main():
     if not input_file:
         print("❌ No file provided. Exiting.")
         sys.exit(1)
+    if args.format != "csv":
+        try:
+            require_pyarrow()
+        except ColumnarUnavailable as e:
+            print(f"❌ {e}")
+            sys.exit(1)
     
     # Run screening
-    results = screen_literature(input_file)
+    results = screen_literature(input_file, args.output_dir,
+                                match_mode="word" if args.whole_word else "substring",
+                                output_format=args.format)
     
     print("\n🎉 All done! Press Enter to exit...")
     input()
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Near-Duplicate Title Detection (MinHash + LSH)
+近似重复标题检测
+
+Finds titles that differ by a typo, a subtitle or a "Correction:" style
+prefix without comparing every pair of records:
+
+1. Titles are lowercased and split into words in one pass. Punctuation and
+   stopwords are stripped on the (much smaller) vocabulary instead of on
+   every title, and every distinct word shingle gets an integer id.
+2. Each title gets a MinHash signature: the minimum of NUM_PERM random
+   hash values over its shingles, computed with numpy per permutation.
+3. LSH banding: signatures are cut into bands, and titles that agree on a
+   whole band become candidate pairs (sub-quadratic).
+4. Candidates are confirmed with the exact shingle Jaccard similarity, full
+   containment of a long enough title (an added subtitle) or a character
+   similarity check (typos), and merged into clusters with union-find.
+"""
+
+import hashlib
+import re
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+
+# MinHash signature length and LSH bands (rows per band = NUM_PERM // LSH_BANDS)
+NUM_PERM = 64
+LSH_BANDS = 16
+
+# Jaccard similarity of title shingles needed to call two titles duplicates
+DEFAULT_THRESHOLD = 0.8
+
+# A title whose shingles are all contained in another title counts as a
+# duplicate (added subtitle) if it has at least this many shingles
+MIN_CONTAINED_SHINGLES = 5
+
+# Character-level similarity (difflib ratio) that also confirms a pair, so a
+# typo in a short title still matches while a changed word does not
+CHAR_SIMILARITY = 0.95
+
+# Candidates whose estimated similarity (share of equal MinHash values) is
+# below this are dropped before the exact check
+ESTIMATE_PREFILTER = 0.3
+
+# Buckets larger than this are linked to their first member only, instead
+# of generating every pair
+MAX_BUCKET_PAIRS = 64
+
+# Notice prefixes that do not change which paper a title refers to
+NOTICE_WORDS = ('correction', 'corrigendum', 'erratum', 'retraction', 'retracted', 'addendum',
+                'expression of concern')
+NOTICE_PREFIX_PATTERN = re.compile(
+    r'^\s*(?:' + '|'.join(NOTICE_WORDS) + r')(?:\s+(?:note|notice|to|of|for))*\s*[:\-–—]\s*'
+)
+
+# Letters and digits of a token ("game-theoretic:" -> game, theoretic)
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+# Row separator token (removed from titles beforehand; not whitespace for str.split())
+ROW_END = '\x00'
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from in into is of on or the to with
+""".split())
+
+
+def normalize_title(title):
+    """Normalized form of one title, used for the character similarity check."""
+    if not isinstance(title, str):
+        return ''
+    return ' '.join(WORD_PATTERN.findall(NOTICE_PREFIX_PATTERN.sub('', title.lower())))
+
+
+def lowercase_titles(titles):
+    """Lowercase titles and drop notice prefixes ('' for non-strings)."""
+    text = pd.Series(np.asarray(titles, dtype=object), dtype=object)
+    text = text.where(text.map(lambda v: isinstance(v, str)), '').astype(str).str.lower()
+    text = text.str.replace(ROW_END, ' ', regex=False)
+    notice = text.str.lstrip().str.startswith(NOTICE_WORDS)
+    if notice.any():
+        text[notice] = text[notice].str.replace(NOTICE_PREFIX_PATTERN, '', regex=True)
+    return text.to_numpy(dtype=object)
+
+
+def title_shingles(titles):
+    """
+    Map the distinct word shingles of every title to integer ids.
+
+    Returns:
+        Tuple of (shingle ids int64 array, row offsets int64 array of n + 1,
+        vocabulary list of words by id) where row i owns
+        ids[offsets[i]:offsets[i + 1]] (sorted, unique)
+    """
+    lowered = lowercase_titles(titles)
+    n = len(lowered)
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.zeros(1, dtype=np.int64), []
+
+    # One C-level whitespace split over all titles; ROW_END tokens mark row ends
+    raw = np.array(f' {ROW_END} '.join(lowered).split() + [ROW_END], dtype=object)
+    raw_codes, raw_vocab = pd.factorize(raw)
+
+    # Clean the raw vocabulary once and map every raw token to its word ids
+    word_ids = {}
+    parts = []
+    end_code = -1
+    for code, token in enumerate(raw_vocab):
+        if token == ROW_END:
+            end_code = code
+        words = [w for w in WORD_PATTERN.findall(token) if w not in STOPWORDS]
+        parts.append([word_ids.setdefault(w, len(word_ids)) for w in words])
+    is_end = raw_codes == end_code
+    rows = np.cumsum(is_end) - is_end
+    part_counts = np.fromiter((len(p) for p in parts), dtype=np.int64, count=len(parts))
+    part_starts = np.cumsum(part_counts) - part_counts
+    flat_parts = np.fromiter((w for p in parts for w in p), dtype=np.int64, count=int(part_counts.sum()))
+
+    # Expand every raw token occurrence into its word ids
+    counts = part_counts[raw_codes]
+    total = int(counts.sum())
+    within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    codes = flat_parts[np.repeat(part_starts[raw_codes], counts) + within]
+    rows = np.repeat(rows, counts)
+
+    # Sort by (row, shingle) and drop repeats within a title
+    vocab = max(len(word_ids), 1)
+    key = np.sort(rows * vocab + codes)
+    if len(key):
+        key = key[np.r_[True, key[1:] != key[:-1]]]
+
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(key // vocab, minlength=n), out=offsets[1:])
+    return key % vocab, offsets, list(word_ids)
+
+
+def word_hashes(words):
+    """Stable 64-bit hash per word (the same across runs and processes)."""
+    return np.fromiter((int.from_bytes(hashlib.blake2b(w.encode('utf-8'), digest_size=8).digest(), 'little')
+                        for w in words), dtype=np.uint64, count=len(words))
+
+
+def minhash_signatures(shingles, offsets, hashes, num_perm=NUM_PERM, seed=1):
+    """
+    MinHash signatures as a (num_perm, n) uint32 array, one row per permutation.
+
+    Every shingle gets num_perm hash values (multiply-shift of its stable
+    word hash, so signatures can be stored and compared across runs); a
+    title's signature is the minimum over its shingles, taken one
+    permutation at a time with reduceat. Titles without shingles get
+    all-max signatures (and are never candidates).
+
+    Args:
+        hashes: word_hashes() of the vocabulary, indexed by shingle id
+    """
+    n = len(offsets) - 1
+    empty_value = np.iinfo(np.uint32).max
+    signatures = np.full((num_perm, n), empty_value, dtype=np.uint32)
+    if len(shingles) == 0:
+        return signatures
+
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(1, 2 ** 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    offsets_b = rng.integers(0, 2 ** 63, size=num_perm, dtype=np.uint64)
+    starts = np.minimum(offsets[:-1], len(shingles) - 1)
+    empty = offsets[:-1] == offsets[1:]
+    for perm in range(num_perm):
+        values = ((hashes * multipliers[perm] + offsets_b[perm]) >> np.uint64(32)).astype(np.uint32)
+        signatures[perm] = np.minimum.reduceat(values[shingles], starts)
+    if empty.any():
+        signatures[:, empty] = empty_value
+    return signatures
+
+
+def band_keys(signatures, band, bands=LSH_BANDS, seed=2, columns=None):
+    """64-bit bucket key of one LSH band for every title (or the given columns)."""
+    rows_per_band = signatures.shape[0] // bands
+    mixers = np.random.default_rng(seed).integers(1, 2 ** 63, size=(rows_per_band, 1), dtype=np.uint64) | np.uint64(1)
+    block = signatures[band * rows_per_band:(band + 1) * rows_per_band]
+    block = (block if columns is None else block[:, columns]).astype(np.uint64)
+    # Mix the band's values into one key (wrapping multiply-add)
+    return (block * mixers).sum(axis=0, dtype=np.uint64)
+
+
+def lsh_candidates(signatures, valid, bands=LSH_BANDS, seed=2):
+    """
+    Candidate pairs (i < j) of titles agreeing on at least one whole band.
+
+    Returns:
+        int64 array of shape (m, 2)
+    """
+    candidates = np.flatnonzero(valid)
+    pairs = []
+
+    for band in range(bands):
+        keys = band_keys(signatures, band, bands, seed, candidates)
+        # Hash-based check first: only the few titles sharing a key get sorted
+        shared = pd.Series(keys).duplicated(keep=False).to_numpy()
+        if not shared.any():
+            continue
+        members, keys = candidates[shared], keys[shared]
+        order = np.lexsort((members, keys))
+        members, keys = members[order], keys[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        sizes = np.diff(np.r_[starts, len(keys)])
+
+        # Pairs (the common case) are emitted vectorized, larger buckets one by one
+        two = starts[sizes == 2]
+        pairs.append(np.stack([members[two], members[two + 1]], axis=1))
+        for start, size in zip(starts[sizes > 2], sizes[sizes > 2]):
+            bucket = members[start:start + size]
+            if size <= MAX_BUCKET_PAIRS:
+                left, right = np.triu_indices(size, k=1)
+                pairs.append(np.stack([bucket[left], bucket[right]], axis=1))
+            else:
+                pairs.append(np.stack([np.full(size - 1, bucket[0]), bucket[1:]], axis=1))
+
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(pairs).astype(np.int64), axis=0)
+
+
+def confirm_pairs(pairs, signatures, shingles, offsets, titles, threshold=DEFAULT_THRESHOLD):
+    """
+    Keep candidate pairs that are real near-duplicates: exact shingle Jaccard
+    >= threshold, full containment of a long enough title (added subtitle),
+    or character similarity >= CHAR_SIMILARITY (typos).
+    """
+    if len(pairs) == 0:
+        return pairs
+    estimate = (signatures[:, pairs[:, 0]] == signatures[:, pairs[:, 1]]).mean(axis=0)
+    pairs = pairs[estimate >= min(threshold, ESTIMATE_PREFILTER)]
+
+    normalized = {}
+    confirmed = []
+    for i, j in pairs.tolist():
+        a = set(shingles[offsets[i]:offsets[i + 1]].tolist())
+        b = set(shingles[offsets[j]:offsets[j + 1]].tolist())
+        if shingles_match(a, b, threshold):
+            confirmed.append((i, j))
+            continue
+        for k in (i, j):
+            if k not in normalized:
+                normalized[k] = normalize_title(titles[k])
+        if characters_match(normalized[i], normalized[j]):
+            confirmed.append((i, j))
+    return np.array(confirmed, dtype=np.int64).reshape(-1, 2)
+
+
+def shingles_match(a, b, threshold=DEFAULT_THRESHOLD):
+    """Jaccard >= threshold, or one long enough shingle set fully contained in the other."""
+    if not a or not b:
+        return False
+    common = len(a & b)
+    return common / len(a | b) >= threshold or common == min(len(a), len(b)) >= MIN_CONTAINED_SHINGLES
+
+
+def characters_match(a, b):
+    """Character similarity of two normalized titles >= CHAR_SIMILARITY."""
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    return matcher.quick_ratio() >= CHAR_SIMILARITY and matcher.ratio() >= CHAR_SIMILARITY
+
+
+def titles_match(a, b, threshold=DEFAULT_THRESHOLD):
+    """Near-duplicate check for two normalized titles (see normalize_title)."""
+    if shingles_match(set(a.split()) - STOPWORDS, set(b.split()) - STOPWORDS, threshold):
+        return True
+    return bool(a and b) and characters_match(a, b)
+
+
+def cluster_pairs(n, pairs):
+    """Union-find over confirmed pairs. Returns the smallest row index of each row's cluster."""
+    labels = np.arange(n, dtype=np.int64)
+    parent = {}
+
+    def find(x):
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while parent.get(x, x) != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for i, j in pairs.tolist():
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+    for node in list(parent):
+        labels[node] = find(node)
+    return labels
+
+
+def near_duplicate_pairs(titles, threshold=DEFAULT_THRESHOLD, blocks=None, num_perm=NUM_PERM, bands=LSH_BANDS, seed=1):
+    """
+    Confirmed near-duplicate title pairs.
+
+    Args:
+        titles: Sequence/Series of titles (non-strings are ignored)
+        threshold: Jaccard similarity of word shingles needed for a match
+        blocks: Optional integer block code per row; only rows in the same
+            block can match
+
+    Returns:
+        int64 array of shape (m, 2) with row positions (i < j)
+    """
+    titles = np.asarray(titles, dtype=object)
+    shingles, offsets, vocabulary = title_shingles(titles)
+    signatures = minhash_signatures(shingles, offsets, word_hashes(vocabulary), num_perm, seed)
+    pairs = lsh_candidates(signatures, np.diff(offsets) > 0, bands, seed + 1)
+    if blocks is not None and len(pairs):
+        blocks = np.asarray(blocks)
+        pairs = pairs[blocks[pairs[:, 0]] == blocks[pairs[:, 1]]]
+    return confirm_pairs(pairs, signatures, shingles, offsets, titles, threshold)
+
+
+def find_near_duplicates(titles, threshold=DEFAULT_THRESHOLD, blocks=None, **kwargs):
+    """
+    Cluster near-duplicate titles.
+
+    Returns:
+        int64 array with the cluster representative (smallest row position)
+        for each row; row i is a duplicate if result[i] != i
+    """
+    pairs = near_duplicate_pairs(titles, threshold, blocks, **kwargs)
+    return cluster_pairs(len(titles), pairs)
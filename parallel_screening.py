@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-core Sharded Keyword Screening
+多进程分片关键词筛选
+
+Splits the Title/Abstract/Source title columns into row shards and screens
+them in a process pool. Column text is packed once into shared memory
+(UTF-8 bytes + row offsets); workers attach by name and read only their
+row range, so no DataFrame is ever pickled. Each worker returns compact
+keyword-index arrays which are merged back in row order.
+"""
+
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from keyword_engine import combine_matches, first_match, lowercase_field, match_field, screen_keywords
+
+
+# Rows per shard never go below this (smaller shards cost more in IPC than they save)
+MIN_SHARD_ROWS = 2000
+
+# Shards per worker, so progress updates are reasonably fine-grained
+SHARDS_PER_WORKER = 4
+
+# Worker count -> ProcessPoolExecutor
+_pools = {}
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers):
+    """
+    Return the shared screening process pool for this worker count.
+
+    Jobs may ask for different worker counts; each count keeps its own pool,
+    so one job never shuts down a pool another job is still submitting to.
+    """
+    with _pool_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # 'spawn' so workers never inherit Flask threads or locks via fork
+            pool = _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'))
+        return pool
+
+
+def pack_column(series):
+    """
+    Copy a text column into one shared memory block.
+
+    Layout: int64 offsets[n + 1] | uint8 is_text[n] | UTF-8 data
+
+    Returns:
+        Tuple of (SharedMemory, descriptor dict to send to workers)
+    """
+    values = series.to_numpy(dtype=object)
+    n = len(values)
+    is_text = np.fromiter((isinstance(v, str) for v in values), dtype=np.uint8, count=n)
+    encoded = [v.encode('utf-8', 'surrogatepass') if flag else b'' for v, flag in zip(values, is_text)]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+    data_start = offsets.nbytes + is_text.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(data_start + int(offsets[-1]), 1))
+    buf = shm.buf
+    buf[:offsets.nbytes] = offsets.tobytes()
+    buf[offsets.nbytes:data_start] = is_text.tobytes()
+    buf[data_start:data_start + int(offsets[-1])] = b''.join(encoded)
+    del buf
+
+    return shm, {'name': shm.name, 'rows': n}
+
+
+def attach_shared_memory(name):
+    """Attach to an existing block without letting this process unlink it on exit."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: spawned workers share the parent's resource tracker,
+        # so the extra registration is released by the parent's unlink()
+        return shared_memory.SharedMemory(name=name)
+
+
+def read_rows(descriptor, start, stop):
+    """Decode rows [start, stop) of a packed column. Non-text rows become None."""
+    n = descriptor['rows']
+    shm = attach_shared_memory(descriptor['name'])
+    try:
+        offsets = np.frombuffer(shm.buf, dtype=np.int64, count=n + 1)
+        is_text = np.frombuffer(shm.buf, dtype=np.uint8, count=n, offset=offsets.nbytes)
+        data_start = offsets.nbytes + is_text.nbytes
+        row_offsets = offsets[start:stop + 1] - offsets[start]
+        flags = is_text[start:stop].astype(bool)
+        chunk = bytes(shm.buf[data_start + int(offsets[start]):data_start + int(offsets[stop])])
+        del offsets, is_text
+    finally:
+        shm.close()
+
+    return [
+        chunk[row_offsets[i]:row_offsets[i + 1]].decode('utf-8', 'surrogatepass') if flags[i] else None
+        for i in range(stop - start)
+    ]
+
+
+def screen_shard(columns, start, stop, ta_blacklist, journal_blacklist, match_mode='substring'):
+    """
+    Worker entry point: screen rows [start, stop) of every packed column.
+
+    Returns:
+        Tuple of (start, dict of field -> int32 keyword index array, -1 = no match)
+    """
+    results = {}
+    for field, descriptor in columns.items():
+        blacklist = journal_blacklist if field == 'source' else ta_blacklist
+        positions = {}
+        for index, keyword in enumerate(blacklist):
+            positions.setdefault(keyword, index)
+        lowered = lowercase_field(pd.Series(read_rows(descriptor, start, stop), dtype=object))
+        matched = first_match(lowered, blacklist, match_mode)
+        results[field] = np.fromiter((positions.get(k, -1) if k else -1 for k in matched),
+                                     dtype=np.int32, count=len(matched))
+    return start, results
+
+
+def screen_keywords_parallel(df, title_col, abstract_col, source_col, ta_blacklist, journal_blacklist,
+                             workers, labels=None, shard_size=None, progress_callback=None,
+                             match_mode='substring'):
+    """
+    Sharded, multi-process version of keyword_engine.screen_keywords().
+
+    Args:
+        workers: Number of worker processes (<= 1 screens in-process)
+        shard_size: Rows per shard (default: spread over workers * SHARDS_PER_WORKER)
+        progress_callback: Optional callable(shards_done, shards_total, rows_done)
+        match_mode: 'substring' (default) or 'word' (whole words/phrases)
+
+    Returns:
+        Tuple of (excluded bool ndarray, reasons list, counts dict)
+    """
+    n = len(df)
+    if workers <= 1 or n == 0:
+        excluded, reasons, counts = screen_keywords(
+            df, title_col, abstract_col, source_col, ta_blacklist, journal_blacklist, labels, match_mode
+        )
+        if progress_callback:
+            progress_callback(1, 1, n)
+        return excluded, reasons, counts
+
+    if shard_size is None:
+        shard_size = max(MIN_SHARD_ROWS, math.ceil(n / (workers * SHARDS_PER_WORKER)))
+    bounds = [(start, min(start + shard_size, n)) for start in range(0, n, shard_size)]
+
+    blocks = []
+    field_matches = {}
+    try:
+        columns = {}
+        for field, col in (('title', title_col), ('abstract', abstract_col), ('source', source_col)):
+            if col and isinstance(df[col].dtype, pd.CategoricalDtype):
+                # Matched here, once per category (usually Source title)
+                blacklist = journal_blacklist if field == 'source' else ta_blacklist
+                field_matches[field] = match_field(df[col], blacklist, match_mode)
+            elif col:
+                shm, descriptor = pack_column(df[col])
+                blocks.append(shm)
+                columns[field] = descriptor
+
+        indices = {field: np.full(n, -1, dtype=np.int32) for field in columns}
+        pool = get_pool(workers)
+        futures = {pool.submit(screen_shard, columns, start, stop, ta_blacklist, journal_blacklist, match_mode): (start, stop)
+                   for start, stop in bounds}
+
+        rows_done = 0
+        for done, future in enumerate(as_completed(futures), start=1):
+            start, results = future.result()
+            for field, shard_indices in results.items():
+                indices[field][start:start + len(shard_indices)] = shard_indices
+            shard_start, shard_stop = futures[future]
+            rows_done += shard_stop - shard_start
+            if progress_callback:
+                progress_callback(done, len(futures), rows_done)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    for field in ('title', 'abstract', 'source'):
+        if field in field_matches:
+            continue
+        blacklist = journal_blacklist if field == 'source' else ta_blacklist
+        matched = np.full(n, '', dtype=object)
+        if field in indices:
+            hit = indices[field] >= 0
+            matched[hit] = np.asarray(blacklist, dtype=object)[indices[field][hit]]
+        field_matches[field] = matched
+
+    return combine_matches(field_matches, labels)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throttled Progress Reporting
+节流进度上报 + 环形筛选日志
+
+Per-record bookkeeping (log list slicing, speed/ETA maths, message
+formatting) used to cost more than the screening itself. This module keeps
+the screening log in a fixed-size ring buffer and only publishes counters,
+speed and the ETA message to the task record every N records or every X
+seconds, whichever comes first.
+"""
+
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+
+# Entries kept in the screening log ring buffer
+LOG_SIZE = 500
+
+# Publish progress at most every N records ...
+FLUSH_EVERY = 200
+
+# ... or every X seconds, whichever comes first
+FLUSH_INTERVAL = 0.25
+
+
+def format_remaining(seconds):
+    """Format an ETA in seconds as the Chinese string shown in the UI."""
+    if seconds < 60:
+        return f"{int(seconds)}秒"
+    if seconds < 3600:
+        mins = int(seconds / 60)
+        secs = int(seconds % 60)
+        return f"{mins}分{secs}秒"
+    hours = int(seconds / 3600)
+    mins = int((seconds % 3600) / 60)
+    secs = int(seconds % 60)
+    return f"{hours}小时{mins}分{secs}秒"
+
+
+class ScreeningLog:
+    """Thread-safe fixed-size ring buffer of screening log entries."""
+
+    def __init__(self, maxlen=LOG_SIZE):
+        self._entries = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def append(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def tail(self, n):
+        """Return the last n entries as a list (oldest first)."""
+        with self._lock:
+            skip = max(len(self._entries) - n, 0)
+            return list(islice(self._entries, skip, None))
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ProgressTracker:
+    """
+    Batched progress reporting for one screening stage.
+
+    Args:
+        task: The task record dict (tasks[task_id])
+        total: Number of records in this stage
+        stage: Message prefix, e.g. '关键词筛选' or 'AI筛选'
+        track_processed: Also publish task['processed_count']
+        flush_every / flush_interval: Throttling thresholds
+    """
+
+    def __init__(self, task, total, stage, track_processed=False,
+                 flush_every=FLUSH_EVERY, flush_interval=FLUSH_INTERVAL):
+        self.task = task
+        self.total = total
+        self.stage = stage
+        self.track_processed = track_processed
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        if not isinstance(task.get('screening_log'), ScreeningLog):
+            task['screening_log'] = ScreeningLog()
+        self.log_buffer = task['screening_log']
+
+        self.start_time = time.time()
+        self.processed = 0
+        self.logged = 0
+        self._log_base = task.get('screening_log_count', 0)
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def log(self, idx, title, status, reason='', advance=True):
+        """Append a log entry; advance=True also counts the record as processed."""
+        self.log_buffer.append({
+            'idx': int(idx),
+            'title': title,
+            'status': status,  # 'kept' or 'excluded'
+            'reason': reason,
+            'timestamp': None
+        })
+        with self._lock:
+            self.logged += 1
+            if advance:
+                self.processed += 1
+            self._unflushed += 1
+        self._maybe_flush()
+
+    def advance(self, n=1, logged=0):
+        """Count n records as processed (and `logged` of them as logged) without log entries."""
+        with self._lock:
+            self.processed += n
+            self.logged += logged
+            self._unflushed += n
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self._unflushed >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Publish counters, speed and ETA message to the task record."""
+        with self._lock:
+            processed = self.processed
+            self._unflushed = 0
+            self._last_flush = time.monotonic()
+            self.task['screening_log_count'] = self._log_base + self.logged
+
+        if self.track_processed:
+            self.task['processed_count'] = processed
+        if self.total:
+            self.task['progress'] = int((processed / self.total) * 100)
+
+        elapsed = time.time() - self.start_time
+        if processed > 0 and elapsed > 0:
+            speed = processed / elapsed
+            self.task['speed'] = speed
+            remaining = self.total - processed
+            if remaining > 0 and speed > 0:
+                self.task['message'] = (
+                    f"{self.stage}: {processed}/{self.total}, 剩余约 {format_remaining(remaining / speed)}"
+                )
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Adaptive Rate Control for AI Provider Calls
+AI 调用自适应限流与退避
+
+- Token buckets on requests/min and tokens/min (0 = unlimited)
+- AIMD concurrency: +1 in-flight request after a window of successes,
+  halved on 429 / overload responses
+- Jittered exponential backoff for transient failures (timeouts, connection
+  errors, 429, 5xx) that honours Retry-After; a Retry-After also pauses every
+  worker sharing the controller, not just the one that got it
+
+The SDK clients are created with max_retries=0 so every 429 reaches this
+layer instead of being retried blindly inside the SDK.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+# Attempts per request for transient failures
+TRANSIENT_RETRIES = 8
+
+# Backoff: base * 2 ** attempt seconds, capped
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+
+# HTTP statuses worth retrying, and the ones that mean "slow down"
+RETRYABLE_STATUSES = (408, 409, 429, 500, 502, 503, 504, 529)
+OVERLOAD_STATUSES = (429, 503, 529)
+
+# Halve the concurrency at most once per this many seconds (one burst of
+# 429s from in-flight requests counts as a single overload signal)
+DECREASE_INTERVAL = 1.0
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at rate_per_min.
+
+    The bucket holds up to `capacity` (default: 10 seconds worth). A request
+    larger than the capacity waits for a full bucket and leaves it in debt.
+    """
+
+    def __init__(self, rate_per_min, capacity=None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity or max(1.0, rate_per_min / 6.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, n=1):
+        """Take n tokens if available. Returns 0 on success, else seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            needed = min(n, self.capacity)
+            if self.tokens >= needed:
+                self.tokens -= n
+                return 0.0
+            return (needed - self.tokens) / self.rate
+
+    def acquire(self, n=1):
+        """Block until n tokens are taken."""
+        while True:
+            wait = self.try_acquire(n)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+
+class RateController:
+    """
+    Shared rate state for one provider within a screening task.
+
+    Args:
+        max_concurrency: Upper bound (and starting value) for in-flight requests
+        requests_per_min / tokens_per_min: Token bucket rates (0 = unlimited)
+    """
+
+    def __init__(self, max_concurrency, requests_per_min=0, tokens_per_min=0, min_concurrency=1):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.concurrency = self.max_concurrency
+        self.request_bucket = TokenBucket(requests_per_min) if requests_per_min else None
+        self.token_bucket = TokenBucket(tokens_per_min) if tokens_per_min else None
+
+        self.retries = 0
+        self.rate_limited = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def limit(self):
+        """Current in-flight request limit (AIMD)."""
+        return self.concurrency
+
+    def acquire(self, tokens=0):
+        """Wait out any Retry-After pause, then take request and token budget."""
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause <= 0:
+                break
+            time.sleep(pause)
+        if self.request_bucket:
+            self.request_bucket.acquire(1)
+        if self.token_bucket and tokens:
+            self.token_bucket.acquire(tokens)
+
+    def on_success(self):
+        """Additive increase: +1 after `concurrency` consecutive successes."""
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.concurrency:
+                self._successes = 0
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def on_retry(self, status=None, retry_after=None):
+        """Record a transient failure; overloads halve the concurrency and may pause everyone."""
+        now = time.monotonic()
+        with self._lock:
+            self.retries += 1
+            if status in OVERLOAD_STATUSES:
+                self.rate_limited += 1
+                self._successes = 0
+                if now - self._last_decrease >= DECREASE_INTERVAL:
+                    self._last_decrease = now
+                    self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+
+def status_code(error):
+    """HTTP status of an SDK error, or None for transport errors."""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status
+
+
+def retry_after_seconds(error):
+    """Parse retry-after-ms / Retry-After (seconds or HTTP date) from an SDK error."""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(float(value) / 1000, 0.0)
+        except ValueError:
+            pass
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt, retry_after=None, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Full-jitter exponential backoff, never shorter than Retry-After."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def call_with_backoff(request, controller=None, tokens=0, transient_errors=(), attempts=TRANSIENT_RETRIES):
+    """
+    Run request() under the controller's limits, retrying transient failures.
+
+    Args:
+        request: Zero-argument callable making one provider call
+        controller: Optional RateController shared by the task's workers
+        tokens: Estimated tokens of this request (for the tokens/min bucket)
+        transient_errors: SDK exception types that are always retried
+            (timeouts, connection errors); errors with a retryable HTTP
+            status are retried too
+    """
+    for attempt in range(attempts):
+        if controller:
+            controller.acquire(tokens)
+        try:
+            response = request()
+        except Exception as e:
+            status = status_code(e)
+            if not (status in RETRYABLE_STATUSES or (status is None and isinstance(e, transient_errors))):
+                raise
+            if attempt == attempts - 1:
+                raise
+            retry_after = retry_after_seconds(e)
+            if controller:
+                controller.on_retry(status, retry_after)
+            delay = backoff_delay(attempt, retry_after)
+            reason = f"HTTP {status}" if status else type(e).__name__
+            print(f"   ⚠️ {reason} (attempt {attempt + 1}/{attempts}), retrying in {delay:.1f}s...", flush=True)
+            time.sleep(delay)
+            continue
+        if controller:
+            controller.on_success()
+        return response
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming RIS Reader
+流式 RIS 解析
+
+Reads RIS exports line by line from a byte stream and appends every
+record straight into per-column lists, instead of decoding the whole
+file, building a list of rispy entry dicts and another dict per record:
+
+- Tag lines follow rispy's rules ("XX  - value", records from TY to ER,
+  untagged lines continue the previous tag, the first value of a
+  single-value tag wins)
+- Only the fields used by the app are kept (TI/T1, AB, JO/T2, AU, PY,
+  DO, KW, TY, LA); records without an ER line are dropped
+- Columns use the standard tags only (legacy names are aliases, see
+  column_aliases.py)
+"""
+
+import io
+
+import pandas as pd
+
+from table_sniffer import SNIFF_BYTES, detect_encoding
+
+
+# RIS reference types shown as document types
+RIS_TYPE_MAPPING = {
+    'JOUR': 'Article',
+    'BOOK': 'Book',
+    'CHAP': 'Book Chapter',
+    'CONF': 'Conference',
+    'PAPR': 'Conference Paper',
+    'THES': 'Thesis',
+    'REPT': 'Report',
+    'REV': 'Review',
+    'ABST': 'Abstract',
+    'GEN': 'Generic',
+}
+
+# Tags read as lists (joined with '; ') and single-value tags kept per record
+LIST_TAGS = frozenset(('AU', 'KW'))
+SINGLE_TAGS = frozenset(('TY', 'TI', 'T1', 'AB', 'JO', 'T2', 'PY', 'DO', 'LA'))
+
+# Standard columns (标准字段名)
+STANDARD_COLUMNS = ('TI', 'AB', 'T2', 'AU', 'PY', 'DO', 'KW', 'TY', 'UR', 'LA')
+
+
+def iter_ris_records(lines):
+    """
+    Yield one dict of tag -> value (str, or list for LIST_TAGS) per RIS record.
+
+    Args:
+        lines: Iterable of text lines (trailing newlines allowed)
+    """
+    record = None
+    last_tag = None
+    for line in lines:
+        if record is None:
+            if line.startswith('TY'):
+                is_tag = line[2:5] == '  -'
+                record = {'TY': line[6:].strip() if is_tag else line.strip()}
+                last_tag = None
+            continue
+
+        if line[2:5] == '  -' and line[:2].isupper() and line[0:1].isalpha():
+            tag = line[:2]
+            if tag == 'ER':
+                yield record
+                record = None
+                continue
+            content = line[6:].strip()
+            last_tag = tag
+            if tag in LIST_TAGS:
+                record.setdefault(tag, []).append(content)
+            elif tag in SINGLE_TAGS:
+                record.setdefault(tag, content)
+        elif last_tag in LIST_TAGS:
+            record[last_tag].append(line.strip())
+        elif last_tag in SINGLE_TAGS:
+            record[last_tag] = record[last_tag] + ' ' + line.strip()
+
+
+def text_lines(source, encoding):
+    """Lines of a bytes object or binary file, split on '\\n' only (like rispy)."""
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    return io.TextIOWrapper(stream, encoding=encoding, newline='\n')
+
+
+def records_to_columns(records):
+    """Append records into per-column lists of the standard columns."""
+    columns = {name: [] for name in STANDARD_COLUMNS}
+    title, abstract, source, authors, year, doi, keywords, doc_type, url, language = columns.values()
+    for record in records:
+        get = record.get
+        title.append(get('TI') or get('T1', ''))
+        abstract.append(get('AB', ''))
+        source.append(get('JO') or get('T2', ''))
+        authors.append('; '.join(get('AU', ())))
+        year.append(get('PY') or '')
+        doi.append(get('DO', ''))
+        keywords.append('; '.join(get('KW', ())))
+        ref_type = get('TY', '')
+        doc_type.append(RIS_TYPE_MAPPING.get(ref_type, ref_type))
+        url.append('')
+        language.append(get('LA', ''))
+    return columns
+
+
+def read_ris(source):
+    """
+    Parse RIS content (bytes or a seekable binary file) into a DataFrame.
+
+    The encoding comes from table_sniffer.detect_encoding; if a later part
+    of the file does not decode, the file is read again as latin-1.
+
+    Returns:
+        DataFrame with the standard columns (empty if no complete record
+        was found)
+    """
+    in_memory = isinstance(source, (bytes, bytearray))
+    # One byte more than the sample lets detect_encoding drop a character cut off at its end
+    head = source[:SNIFF_BYTES + 1] if in_memory else source.read(SNIFF_BYTES + 1)
+    for encoding in (detect_encoding(head), 'latin-1'):
+        if not in_memory:
+            source.seek(0)
+        wrapper = text_lines(source, encoding)
+        try:
+            columns = records_to_columns(iter_ris_records(wrapper))
+            break
+        except UnicodeDecodeError:
+            continue
+        finally:
+            # Keep the caller's file open
+            wrapper.detach()
+
+    return pd.DataFrame(columns)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Single-pass RTF / EndNote Reader
+单遍 RTF / EndNote 解析
+
+Turns EndNote-style RTF exports ("\\par %T Title", "\\par %A Author", ...)
+into standard columns in one pass over the document:
+
+- The file is decoded once (UTF-8, else latin-1)
+- The tokenizer matches whole runs of plain text instead of one regex
+  match per character, and follows striprtf's rules (same destination,
+  special character and font charset tables), so its text is exactly
+  what striprtf.rtf_to_text returns
+- Text is split into lines as it is produced; blank lines end an entry,
+  %X tags select the field, and finished entries go straight into
+  per-column lists
+- Files without %X entries fall back to the paragraph heuristics (title
+  on the first line, year and DOI by pattern)
+"""
+
+import codecs
+import re
+
+import pandas as pd
+from striprtf.striprtf import (FONTTABLE, HYPERLINKS, charset_map, destinations, font_table_group,
+                               remove_pict_groups, sectionchars, specialchars)
+
+
+# Control words, hex escapes, control symbols, braces, raw line breaks, runs of plain text
+# (a lone backslash can only be left at the very end of the document)
+TOKEN = re.compile(
+    r"\\([a-z]{1,32})(-?\d{1,10})?[ ]?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|([^\\{}\r\n]+|\\)",
+    re.IGNORECASE,
+)
+
+# EndNote field codes -> standard columns (标准字段名: TI, AB, KW, PY, TY, LA, T2, AU)
+ENDNOTE_TAGS = {
+    'T': 'TI',           # Title
+    'A': 'AU',           # Author (one line per author)
+    'J': 'T2',           # Journal
+    'D': 'PY',           # Year
+    'K': 'KW',           # Keywords
+    'X': 'AB',           # Abstract
+    'N': 'AB',           # Notes, used as abstract
+    'U': 'UR',           # URL
+    'R': 'DO',           # DOI
+    '0': 'TY',           # Reference type
+    'L': 'LA',           # Language
+}
+
+STANDARD_COLUMNS = ('TI', 'AB', 'T2', 'AU', 'PY', 'DO', 'KW', 'TY', 'UR', 'LA')
+
+
+def rtf_text_pieces(text, encoding='cp1252'):
+    """
+    Yield the plain text of an RTF document in pieces.
+
+    Joined, the pieces equal striprtf.rtf_to_text(text, encoding).
+    """
+    text = HYPERLINKS.sub("\\1(\\2)", remove_pict_groups(text))
+    fonttbl = {font_id: charset_map.get(int(charset), encoding)
+               for font_id, charset, _ in FONTTABLE.findall(font_table_group(text))}
+
+    stack = []
+    default_font = current_font = None
+    ignorable = suppress_output = False
+    ucskip = 1           # ASCII characters to skip after a \u character
+    curskip = 0          # ASCII characters left to skip
+    hexes = None
+    depth = 0
+    in_document = False
+
+    for match in TOKEN.finditer(text):
+        word, arg, hex_code, char, brace, run = match.groups()
+        if hexes and not hex_code:
+            # Bytes from consecutive \'xx escapes decode together (multi-byte code pages)
+            yield bytes.fromhex(hexes).decode(fonttbl.get(current_font, encoding))
+            hexes = None
+
+        if run:
+            if curskip:
+                skipped = min(curskip, len(run))
+                curskip -= skipped
+                run = run[skipped:]
+            if run and not ignorable and not suppress_output:
+                yield run
+        elif brace:
+            curskip = 0
+            if brace == '{':
+                depth += 1
+                in_document = True
+                stack.append((ucskip, ignorable, suppress_output))
+            else:
+                depth -= 1
+                if stack:
+                    ucskip, ignorable, suppress_output = stack.pop()
+                else:
+                    ucskip, ignorable = 0, True
+                if in_document and depth <= 0:
+                    # Anything after the outer document group is discarded
+                    break
+        elif char:
+            curskip = 0
+            if char in specialchars:
+                if char in sectionchars:
+                    current_font = default_font
+                if not ignorable:
+                    yield specialchars[char]
+            elif char == '*':
+                ignorable = True
+        elif word:
+            curskip = 0
+            if word in destinations:
+                ignorable = True
+            elif word == 'ansicpg':
+                encoding = f'cp{arg}'
+                try:
+                    codecs.lookup(encoding)
+                except LookupError:
+                    encoding = 'utf8'
+            if ignorable or suppress_output:
+                pass
+            elif word in specialchars:
+                yield specialchars[word]
+            elif word == 'uc':
+                ucskip = int(arg)
+            elif word == 'u':
+                if arg is not None:
+                    code = int(arg)
+                    yield chr(code + 0x10000 if code < 0 else code)
+                curskip = ucskip
+            elif word == 'f':
+                current_font = arg
+            elif word == 'deff':
+                default_font = arg
+            elif word in ('fonttbl', 'colortbl'):
+                suppress_output = True
+        elif hex_code:
+            if curskip > 0:
+                curskip -= 1
+            elif not ignorable:
+                hexes = hex_code if not hexes else hexes + hex_code
+
+
+def text_lines(pieces):
+    """Split text pieces into lines (like str.split('\\n') on the joined text)."""
+    pending = []
+    for piece in pieces:
+        if '\n' not in piece:
+            pending.append(piece)
+            continue
+        first, *middle, last = piece.split('\n')
+        pending.append(first)
+        yield ''.join(pending)
+        yield from middle
+        pending = [last]
+    yield ''.join(pending)
+
+
+def endnote_columns(lines):
+    """
+    Collect EndNote entries from text lines into per-column lists.
+
+    An entry is a run of non-blank lines whose first line starts with '%';
+    untagged lines continue the previous field, repeated %A lines are
+    joined with '; ', and entries without a title are dropped.
+    """
+    columns = {name: [] for name in STANDARD_COLUMNS}
+    appenders = [(name, values.append) for name, values in columns.items()]
+    fields = None        # Fields of the current entry (None between entries)
+    skipping = False     # Inside an entry that does not start with '%'
+    tag = None
+    value = []
+
+    def store():
+        if tag and value:
+            text = ' '.join(value).strip()
+            if tag == 'AU' and fields.get('AU'):
+                fields['AU'] += '; ' + text
+            else:
+                fields[tag] = text
+
+    def finish():
+        store()
+        if fields.get('TI'):
+            for name, append in appenders:
+                append(fields.get(name, ''))
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if fields is not None:
+                finish()
+            fields, skipping = None, False
+            continue
+        if skipping:
+            continue
+        if fields is None:
+            if line[0] != '%':
+                skipping = True
+                continue
+            fields, tag, value = {}, None, []
+
+        if line[0] == '%':
+            store()
+            tag = ENDNOTE_TAGS.get(line[1:2].upper())
+            content = line[2:].strip()
+            value = [content] if content else []
+        elif tag:
+            value.append(line)
+    if fields is not None:
+        finish()
+    return columns
+
+
+def paragraph_records(text):
+    """Fallback for RTF without %X tags: one record per paragraph of at least 50 characters."""
+    records = []
+    for para in re.split(r'\n\s*\n+', text):
+        para = para.strip()
+        if len(para) < 50:  # Skip very short paragraphs
+            continue
+
+        lines = [l.strip() for l in para.split('\n') if l.strip()]
+        if lines:
+            # Heuristic: First line is often the title
+            record = {'TI': lines[0], 'AB': '', 'T2': '', 'AU': '', 'PY': '', 'DO': '', 'KW': '', 'TY': '', 'UR': ''}
+
+            year_match = re.search(r'\b(19|20)\d{2}\b', para)
+            if year_match:
+                record['PY'] = year_match.group(0)
+
+            doi_match = re.search(r'10\.\d{4,}/[^\s]+', para)
+            if doi_match:
+                record['DO'] = doi_match.group(0)
+
+            # Remaining lines as potential abstract
+            if len(lines) > 1:
+                remaining = ' '.join(lines[1:])
+                if len(remaining) > 100:
+                    record['AB'] = remaining[:1000]  # Limit length
+
+            records.append(record)
+    return records
+
+
+def read_rtf(content):
+    """
+    Parse RTF bytes (or any bytes-like buffer, e.g. an mmap) into a DataFrame of bibliographic records.
+
+    Returns:
+        DataFrame with the standard columns (empty if nothing was found)
+
+    Raises:
+        ValueError: The RTF could not be converted to text
+    """
+    try:
+        text = str(content, 'utf-8')
+    except UnicodeDecodeError:
+        text = str(content, 'latin-1')
+
+    try:
+        columns = endnote_columns(text_lines(rtf_text_pieces(text)))
+        if columns['TI']:
+            return pd.DataFrame(columns)
+        return pd.DataFrame(paragraph_records(''.join(rtf_text_pieces(text))))
+    except (ValueError, OverflowError, LookupError) as e:
+        raise ValueError(f"Could not decode RTF file with any supported encoding ({e})")
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI Stage Throughput Benchmark
+AI 筛选阶段吞吐量基准测试
+
+Starts scripts/fake_provider.py in-process, points the app at it and drives
+the full /screen -> /status flow with a synthetic dataset. Reports
+papers/sec, provider-side p50/p99 latency, retries and failed rows.
+
+Usage:
+    python scripts/bench_ai_stage.py --papers 500 --concurrency 8
+    python scripts/bench_ai_stage.py --model minimax --batch-size 10 --rate-limit-rate 0.05
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_provider import add_provider_arguments, provider_from_args
+
+
+def make_dataset(n):
+    """Synthetic CSV with n distinct papers."""
+    df = pd.DataFrame({
+        'Title': [f"Study {i} of learning analytics in higher education" for i in range(n)],
+        'Abstract': [f"Paper {i} examines how students interact with online course material." for i in range(n)],
+        'Source Title': ['Computers & Education'] * n,
+    })
+    return df.to_csv(index=False).encode('utf-8')
+
+
+def run(args):
+    provider = provider_from_args(args).start()
+
+    import app as screening_app
+    flask_app = screening_app.app
+    flask_app.config['DEEPSEEK_BASE_URL'] = provider.deepseek_base_url
+    flask_app.config['MINIMAX_BASE_URL'] = provider.minimax_base_url
+    flask_app.config['AI_REQUEST_TIMEOUT'] = args.request_timeout
+    provider_key = 'MINIMAX' if args.model == 'minimax' else 'DEEPSEEK'
+    flask_app.config[f'{provider_key}_RPM'] = args.client_rpm
+    flask_app.config[f'{provider_key}_TPM'] = args.client_tpm
+    if not args.use_cache:
+        flask_app.config['AI_CACHE_PATH'] = ''
+    client = flask_app.test_client()
+
+    response = client.post('/screen', data={
+        'file': (io.BytesIO(make_dataset(args.papers)), 'bench.csv'),
+        'ta_keywords': '',
+        'journal_keywords': '',
+        'api_key': 'bench-key',
+        'ai_criteria': 'Exclude papers that are not about education',
+        'ai_model': args.model,
+        'ai_concurrency': str(args.concurrency),
+        'ai_batch_size': str(args.batch_size),
+    }, content_type='multipart/form-data')
+    if response.status_code != 200:
+        raise SystemExit(f"❌ /screen failed: {response.status_code} {response.get_data(as_text=True)}")
+    task_id = response.get_json()['task_id']
+
+    start = time.perf_counter()
+    while True:
+        status = client.get(f'/status/{task_id}').get_json()
+        if status['status'] in ('completed', 'error'):
+            break
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    provider.stop()
+
+    if status['status'] == 'error':
+        raise SystemExit(f"❌ Task failed: {status.get('error')}")
+
+    stats = status['stats']
+    answered = status['screening_log_count']
+    provider_stats = provider.stats()
+    return {
+        'papers': args.papers,
+        'seconds': elapsed,
+        'papers_per_sec': args.papers / elapsed if elapsed > 0 else 0.0,
+        'answered': answered,
+        'failed_rows': args.papers - answered,
+        'ai_excluded': stats['ai_excluded'],
+        'cache_hits': stats.get('ai_cache_hits', 0),
+        'app_retries': stats.get('ai_retries', 0),
+        'app_rate_limited': stats.get('ai_rate_limited', 0),
+        **provider_stats,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the AI screening stage against a local fake provider')
+    parser.add_argument('--papers', type=int, default=200, help='Number of synthetic papers')
+    parser.add_argument('--model', choices=('deepseek', 'minimax'), default='deepseek')
+    parser.add_argument('--concurrency', type=int, default=4, help='ai_concurrency form field')
+    parser.add_argument('--batch-size', type=int, default=1, help='ai_batch_size form field')
+    parser.add_argument('--request-timeout', type=float, default=60.0, help='AI_REQUEST_TIMEOUT in seconds')
+    parser.add_argument('--use-cache', action='store_true', help='Keep the AI decision cache enabled')
+    parser.add_argument('--client-rpm', type=int, default=0, help='App-side requests/min budget (0 = unlimited)')
+    parser.add_argument('--client-tpm', type=int, default=0, help='App-side tokens/min budget (0 = unlimited)')
+    add_provider_arguments(parser)
+    args = parser.parse_args()
+
+    result = run(args)
+    print()
+    print("=" * 60)
+    print(f"📊 AI stage benchmark ({args.model}, concurrency {args.concurrency}, batch {args.batch_size})")
+    print("=" * 60)
+    print(f"Papers:          {result['papers']} in {result['seconds']:.2f}s -> {result['papers_per_sec']:.1f} papers/sec")
+    print(f"Answered:        {result['answered']} (failed rows: {result['failed_rows']}, cache hits: {result['cache_hits']})")
+    print(f"AI excluded:     {result['ai_excluded']}")
+    print(f"Requests:        {result['requests']} (retries: {result['retries']}, "
+          f"app-side retries: {result['app_retries']}, rate limited: {result['app_rate_limited']})")
+    print(f"Status codes:    {result['status_counts']}")
+    print(f"Latency p50/p99: {result['latency_p50_ms']:.0f} ms / {result['latency_p99_ms']:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSV / TXT Upload Parsing Benchmark
+CSV / TXT 上传解析基准测试
+
+Compares the single-pass sniffer (table_sniffer.read_table) with the
+previous approach of one python-engine parse per candidate encoding and
+delimiter, on a synthetic tab-delimited WoS export, and checks both
+produce the same records.
+
+Usage:
+    python scripts/bench_csv_sniffer.py --records 20000
+    python scripts/bench_csv_sniffer.py --records 20000 --encoding cp1252 --delimiter comma
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from table_sniffer import header_score, read_table
+
+LEGACY_ENCODINGS = ['utf-8', 'utf-8-sig', 'latin-1', 'iso-8859-1', 'cp1252', 'windows-1252',
+                    'gbk', 'gb18030', 'utf-16', 'utf-16-le', 'utf-16-be', 'ascii']
+
+
+def legacy_read(content):
+    """Previous /screen parsing: every encoding tab-delimited, then comma-delimited if needed."""
+    best_df, best_score = None, 0
+    for encoding in LEGACY_ENCODINGS:
+        try:
+            test_df = pd.read_csv(io.BytesIO(content), sep='\t', encoding=encoding, on_bad_lines='skip',
+                                  engine='python', quoting=3, escapechar='\\', encoding_errors='ignore')
+        except Exception:
+            continue
+        score = header_score(test_df.columns, 'tab')
+        if score > best_score and len(test_df.columns) > 2:
+            best_df, best_score = test_df, score
+    if best_score < 50:
+        for encoding in LEGACY_ENCODINGS:
+            try:
+                test_df = pd.read_csv(io.BytesIO(content), encoding=encoding, on_bad_lines='skip',
+                                      engine='python', encoding_errors='ignore')
+            except Exception:
+                continue
+            score = header_score(test_df.columns, 'comma')
+            if score > best_score and len(test_df.columns) > 2:
+                best_df, best_score = test_df, score
+    return best_df
+
+
+def make_export(records, encoding, delimiter):
+    """Synthetic WoS-style export as bytes."""
+    rows = [{
+        'PT': 'J', 'AU': f'Müller, K; Author{i}, B', 'TI': f'Étude {i} of deep learning for essay grading',
+        'SO': f'Journal {i % 50}', 'AB': ' '.join(['Abstract text about automated assessment.'] * 20),
+        'PY': 2000 + i % 25, 'DI': f'10.1000/{i}',
+    } for i in range(records)]
+    df = pd.DataFrame(rows)
+    if delimiter == 'tab':
+        text = df.to_csv(sep='\t', index=False, quoting=csv.QUOTE_NONE, escapechar='\\')
+    else:
+        text = df.to_csv(index=False)
+    return text.encode(encoding)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark CSV/TXT upload parsing')
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--encoding', default='utf-8')
+    parser.add_argument('--delimiter', choices=('tab', 'comma'), default='tab')
+    args = parser.parse_args()
+
+    content = make_export(args.records, args.encoding, args.delimiter)
+    print(f"📄 {args.records} records, {len(content) / 1e6:.1f} MB, {args.encoding}, {args.delimiter}-delimited", flush=True)
+
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_new, dialect = read_table(content)
+    new_seconds = time.time() - start
+
+    start = time.time()
+    df_old = legacy_read(content)
+    old_seconds = time.time() - start
+
+    print(f"Sniffer:  {new_seconds:.2f}s ({dialect['delimiter']}, {dialect['encoding']})")
+    print(f"Previous: {old_seconds:.2f}s -> {old_seconds / max(new_seconds, 1e-9):.1f}x faster")
+    print(f"Same shape and columns: {df_new.shape == df_old.shape and list(df_new.columns) == list(df_old.columns)}")
+    print(f"Same values: {df_new.astype(str).equals(df_old.astype(str))}")
+    if not args.encoding.lower().startswith('utf-8'):
+        print("   (the previous approach kept the first best-scoring encoding, UTF-8 with errors ignored, "
+              "which drops non-UTF-8 characters)")
+
+
+if __name__ == '__main__':
+    main()
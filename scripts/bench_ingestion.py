@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Multi-file Upload Ingestion Benchmark
+多文件上传解析基准测试
+
+Parses a typical multi-file upload (WoS .txt chunks plus RIS files) one
+file after another and with the ingestion process pool
+(file_ingestion.ingest_uploads), and compares both wall times with the
+slowest single file. The pool is started before timing, as it is reused
+across requests in the app.
+
+Usage:
+    python scripts/bench_ingestion.py --wos-files 8 --ris-files 2 --workers 4
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from file_ingestion import get_pool, ingest_uploads
+from bench_csv_sniffer import make_export as make_wos_export
+from bench_ris_reader import make_export as make_ris_export
+
+
+def timed_ingest(uploads, workers):
+    """Wall time and reports of one ingest_uploads() call (parser output suppressed)."""
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        reports = ingest_uploads(uploads, workers=workers)
+    return time.time() - start, reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark multi-file upload ingestion')
+    parser.add_argument('--wos-files', type=int, default=8)
+    parser.add_argument('--wos-records', type=int, default=500)
+    parser.add_argument('--ris-files', type=int, default=2)
+    parser.add_argument('--ris-records', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    uploads = [(f'wos_{i}.txt', make_wos_export(args.wos_records, 'utf-8', 'tab')) for i in range(args.wos_files)]
+    uploads += [(f'export_{i}.ris', make_ris_export(args.ris_records)) for i in range(args.ris_files)]
+    total = sum(len(content) for _, content in uploads)
+    print(f"📄 {len(uploads)} files, {total / 1e6:.1f} MB, {os.cpu_count()} CPUs", flush=True)
+
+    sequential, reports = timed_ingest(uploads, workers=1)
+    slowest = max(reports, key=lambda report: report['seconds'])
+
+    # Warm the pool up (worker start-up is paid once per app process)
+    workers = min(args.workers, len(uploads))
+    for future in [get_pool(args.workers).submit(time.sleep, 0.1) for _ in range(args.workers)]:
+        future.result()
+    parallel, parallel_reports = timed_ingest(uploads, workers=args.workers)
+
+    same = all(a['df'].equals(b['df']) for a, b in zip(reports, parallel_reports))
+    print(f"Slowest file:   {slowest['filename']} {slowest['seconds']:.2f}s")
+    print(f"One by one:     {sequential:.2f}s")
+    print(f"Pool ({workers} workers): {parallel:.2f}s -> {sequential / max(parallel, 1e-9):.1f}x faster")
+    print(f"Same output: {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RIS Parsing Benchmark
+RIS 解析基准测试
+
+Compares the streaming column reader (ris_reader.read_ris) with the
+previous rispy.loads + per-record dict approach on a synthetic RIS export:
+wall time, peak Python memory (tracemalloc) and identical output.
+
+Usage:
+    python scripts/bench_ris_reader.py --records 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+import rispy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ris_reader import RIS_TYPE_MAPPING, read_ris
+
+
+def legacy_read(content):
+    """Previous parse_ris_file: decode everything, rispy.loads, one dict per record."""
+    text = None
+    for encoding in ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']:
+        try:
+            text = content.decode(encoding)
+            break
+        except UnicodeDecodeError:
+            continue
+    records = []
+    for entry in rispy.loads(text):
+        ref_type = entry.get('type_of_reference', '')
+        record = {
+            'TI': entry.get('title') or entry.get('primary_title', ''),
+            'AB': entry.get('abstract', ''),
+            'T2': entry.get('journal_name') or entry.get('secondary_title', ''),
+            'AU': '; '.join(entry.get('authors', [])) if entry.get('authors') else '',
+            'PY': str(entry.get('year', '')) if entry.get('year') else '',
+            'DO': entry.get('doi', ''),
+            'KW': '; '.join(entry.get('keywords', [])) if entry.get('keywords') else '',
+            'TY': RIS_TYPE_MAPPING.get(ref_type, ref_type),
+            'UR': entry.get('url', ''),
+            'LA': entry.get('language', ''),
+        }
+        record.update({'Title': record['TI'], 'Abstract': record['AB'], 'Source title': record['T2'],
+                       'Authors': record['AU'], 'Year': record['PY'], 'DOI': record['DO'],
+                       'Keywords': record['KW'], 'Type': record['TY'], 'URL': record['UR']})
+        records.append(record)
+    return pd.DataFrame(records)
+
+
+def make_export(records):
+    """Synthetic RIS export as bytes."""
+    lines = []
+    for i in range(records):
+        lines += [
+            'TY  - JOUR',
+            f'TI  - Deep learning for automated essay grading, study {i}',
+            f'AU  - Müller, K', f'AU  - Author{i}, B', 'AU  - Third, C',
+            f'JO  - Journal of Educational Technology {i % 50}',
+            f'PY  - {2000 + i % 25}',
+            f'DO  - 10.1000/{i}',
+            'KW  - deep learning', 'KW  - assessment',
+            'AB  - ' + ' '.join(['Abstract text about automated assessment in higher education.'] * 12),
+            f'UR  - https://example.org/{i}',
+            'LA  - English',
+            'ER  - ',
+            '',
+        ]
+    return '\n'.join(lines).encode('utf-8')
+
+
+def measure(func, content):
+    """Wall time of one run, then peak traced memory of a second run (tracemalloc slows parsing down)."""
+    start = time.time()
+    df = func(content)
+    seconds = time.time() - start
+    tracemalloc.start()
+    func(content)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return df, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark RIS parsing')
+    parser.add_argument('--records', type=int, default=100000)
+    args = parser.parse_args()
+
+    content = make_export(args.records)
+    print(f"📄 {args.records} records, {len(content) / 1e6:.1f} MB", flush=True)
+
+    df_new, new_seconds, new_peak = measure(read_ris, content)
+    df_old, old_seconds, old_peak = measure(legacy_read, content)
+
+    print(f"Streaming reader: {new_seconds:.2f}s, peak {new_peak / 1e6:.0f} MB")
+    print(f"Previous:         {old_seconds:.2f}s, peak {old_peak / 1e6:.0f} MB "
+          f"-> {old_seconds / max(new_seconds, 1e-9):.1f}x faster, {old_peak / max(new_peak, 1):.1f}x less memory")
+    # The previous parser also stored every field under its legacy name
+    print(f"Same output: {df_new.equals(df_old[list(df_new.columns)])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Upload Memory Benchmark
+上传解析内存基准测试
+
+Parses a large synthetic export (WoS .txt, RIS or BibTeX) the way the
+app used to, from the whole upload read into memory as bytes, and from
+the spooled file on disk (file_ingestion.parse_upload with a path), each
+in a fresh process, and reports wall time and peak memory. Peak memory
+is the process' private (anonymous) memory high-water mark, sampled
+during the parse; pages of a memory-mapped upload are file-backed and
+not counted.
+
+Usage:
+    python scripts/bench_upload_memory.py --format bib --records 100000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+EXTENSIONS = {'wos': 'txt', 'ris': 'ris', 'bib': 'bib'}
+
+
+def make_export(fmt, records):
+    """Synthetic export as bytes."""
+    if fmt == 'wos':
+        from bench_csv_sniffer import make_export as make_wos_export
+        return make_wos_export(records, 'utf-8', 'tab')
+    if fmt == 'ris':
+        from bench_ris_reader import make_export as make_ris_export
+        return make_ris_export(records)
+    from bench_bibtex_reader import make_export as make_bib_export
+    return make_bib_export(records).encode('utf-8')
+
+
+def anonymous_memory():
+    """Private memory of this process in bytes (Linux)."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def run_child(path, mode):
+    """Parse path in this process and print seconds, rows and peak private memory as JSON."""
+    import contextlib
+    import io
+
+    from file_ingestion import parse_upload
+
+    peak = [anonymous_memory()]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.01):
+            peak[0] = max(peak[0], anonymous_memory())
+
+    baseline = peak[0]
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'bytes':
+            with open(path, 'rb') as f:
+                content = f.read()
+            df = parse_upload(os.path.basename(path), content)
+        else:
+            df = parse_upload(os.path.basename(path), path)
+    seconds = time.time() - start
+    done.set()
+    sampler.join()
+    peak[0] = max(peak[0], anonymous_memory())
+    print(json.dumps({'seconds': seconds, 'rows': len(df), 'peak': peak[0] - baseline}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark upload parsing memory')
+    parser.add_argument('--format', choices=sorted(EXTENSIONS), default='bib')
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(*args.child)
+        return
+
+    content = make_export(args.format, args.records)
+    with tempfile.TemporaryDirectory() as spool_dir:
+        path = os.path.join(spool_dir, f'export.{EXTENSIONS[args.format]}')
+        with open(path, 'wb') as f:
+            f.write(content)
+        print(f"📄 {args.records} {args.format} records, {len(content) / 1e6:.0f} MB", flush=True)
+        del content
+
+        results = {}
+        for mode in ('bytes', 'spooled'):
+            output = subprocess.run([sys.executable, __file__, '--child', path, mode],
+                                    check=True, capture_output=True, text=True).stdout
+            results[mode] = json.loads(output.strip().splitlines()[-1])
+
+    for mode, label in (('bytes', 'Read into memory'), ('spooled', 'Spooled file')):
+        result = results[mode]
+        print(f"{label + ':':18}{result['seconds']:.2f}s, {result['rows']} rows, peak {result['peak'] / 1e6:.0f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming Deduplication of Large Exports
+大型导出文件的流式去重
+
+Deduplicates CSV / tab-separated exports that do not fit in memory (see
+streaming_dedup.py) and writes kept and duplicate rows straight to disk.
+Several inputs are read one after the other with the columns of the first
+file; columns are detected like in the web app.
+
+Usage:
+    python scripts/dedup_large.py wos.csv scopus.csv --output kept.csv --duplicates removed.csv
+    python scripts/dedup_large.py export.txt --output kept.csv --chunk-size 20000 --max-memory-keys 1000000
+"""
+
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import find_column
+from streaming_dedup import DEFAULT_CHUNK_SIZE, DEFAULT_MAX_MEMORY_KEYS, stream_deduplicate
+
+
+def read_chunks(paths, chunk_size):
+    """Chunks of all input files, aligned to the columns of the first file."""
+    columns = None
+    for path in paths:
+        sep = '\t' if path.lower().endswith(('.txt', '.tsv')) else ','
+        for chunk in pd.read_csv(path, sep=sep, chunksize=chunk_size, dtype=str, encoding='utf-8-sig',
+                                 on_bad_lines='skip'):
+            if columns is None:
+                columns = list(chunk.columns)
+            yield chunk.reindex(columns=columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicate exports larger than memory, chunk by chunk')
+    parser.add_argument('inputs', nargs='+', help='CSV (or tab-separated .txt/.tsv) exports')
+    parser.add_argument('--output', required=True, help='CSV file for kept records')
+    parser.add_argument('--duplicates', help='CSV file for removed duplicate records')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows per chunk')
+    parser.add_argument('--max-memory-keys', type=int, default=DEFAULT_MAX_MEMORY_KEYS,
+                        help='Hashes kept in memory before spilling to a temporary SQLite file')
+    args = parser.parse_args()
+
+    chunks = read_chunks(args.inputs, args.chunk_size)
+    first = next(chunks, None)
+    if first is None:
+        sys.exit('No records found')
+
+    start = time.time()
+    info = stream_deduplicate(
+        itertools.chain([first], chunks), args.output, args.duplicates,
+        title_col=find_column(first, 'title'), doi_col=find_column(first, 'doi'),
+        year_col=find_column(first, 'year'), author_col=find_column(first, 'author'),
+        max_memory_keys=args.max_memory_keys)
+    print(f"✅ {info['original_count']} records → {info['final_count']} kept, "
+          f"{info['duplicates_removed']} duplicates removed in {time.time() - start:.1f}s "
+          f"({info['chunks']} chunks, {info['spilled_keys']} hashes spilled to disk)", flush=True)
+
+
+if __name__ == '__main__':
+    main()
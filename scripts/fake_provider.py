@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local Stand-in AI Provider
+本地模拟 AI 服务（DeepSeek / MiniMax 兼容接口）
+
+Speaks the two endpoints used by the AI screening stage:
+- OpenAI-style   POST .../chat/completions   (DeepSeek via OpenAI SDK)
+- Anthropic-style POST .../v1/messages       (MiniMax-M2.1 via Anthropic SDK)
+
+Answers are deterministic per paper title (single-paper and batched
+prompts), with configurable latency, 5xx errors, timeouts (slow responses),
+429s with Retry-After, malformed JSON and dropped batch ids.
+
+Usage:
+    python scripts/fake_provider.py --port 8765 --latency-ms 300 --rate-limit-rate 0.05
+    DEEPSEEK_BASE_URL=http://127.0.0.1:8765 MINIMAX_BASE_URL=http://127.0.0.1:8765/anthropic python app.py
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+LATENCY_MODES = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+SINGLE_TITLE_PATTERN = re.compile(r'^Title: (.*)$', re.MULTILINE)
+BATCH_PAPER_PATTERN = re.compile(r'^\[(\d+)\]\nTitle: (.*)$', re.MULTILINE)
+
+
+def decide(title, exclude_rate):
+    """Deterministic decision for a title (same answer on every run)."""
+    digest = hashlib.sha1(title.strip().lower().encode('utf-8')).hexdigest()
+    exclude = int(digest[:8], 16) / 0xFFFFFFFF < exclude_rate
+    return exclude, 'Fake: matches criteria' if exclude else 'Fake: relevant'
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+class FakeProvider:
+    """
+    Threaded fake provider server.
+
+    Args:
+        latency: One of LATENCY_MODES
+        latency_ms: Mean response latency in milliseconds
+        latency_sigma: Shape of the lognormal distribution
+        error_rate: Fraction of requests answered with HTTP 500 (529 for Anthropic)
+        rate_limit_rate: Fraction of requests answered with HTTP 429
+        timeout_rate: Fraction of requests that hang for hang_seconds
+        invalid_json_rate: Fraction of answers that are not valid JSON
+        drop_rate: Fraction of papers left out of batched answers
+        rpm: Requests per minute before 429s are returned (0 = unlimited)
+        retry_after: Retry-After seconds sent with injected 429s
+        exclude_rate: Fraction of papers the fake model excludes
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency='lognormal', latency_ms=300.0, latency_sigma=0.5,
+                 error_rate=0.0, rate_limit_rate=0.0, timeout_rate=0.0, hang_seconds=70.0,
+                 invalid_json_rate=0.0, drop_rate=0.0, rpm=0, retry_after=1.0, exclude_rate=0.3, seed=None):
+        if latency not in LATENCY_MODES:
+            raise ValueError(f"Unknown latency mode: {latency}")
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.invalid_json_rate = invalid_json_rate
+        self.drop_rate = drop_rate
+        self.rpm = rpm
+        self.retry_after = retry_after
+        self.exclude_rate = exclude_rate
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window = deque()
+        self.reset_stats()
+
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; avoid Nagle/delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip('/').endswith('/stats'):
+                    self._send(200, provider.stats())
+                else:
+                    self._send(404, {'error': {'message': 'Not found'}})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                path = self.path.split('?')[0].rstrip('/')
+                if path.endswith('/chat/completions'):
+                    status, payload, headers = provider.handle(body, 'openai')
+                elif path.endswith('/messages'):
+                    status, payload, headers = provider.handle(body, 'anthropic')
+                else:
+                    status, payload, headers = 404, {'error': {'message': 'Not found'}}, {}
+                try:
+                    self._send(status, payload, headers)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (injected timeout)
+                    pass
+
+            def _send(self, status, payload, headers=None):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def deepseek_base_url(self):
+        return self.base_url
+
+    @property
+    def minimax_base_url(self):
+        return f"{self.base_url}/anthropic"
+
+    def start(self):
+        """Serve in a daemon thread. Returns self."""
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.status_counts = Counter()
+            self.prompt_counts = Counter()
+            self.latencies = []
+
+    def stats(self):
+        """Request counts, retries (repeated prompts) and latency percentiles in ms."""
+        with self._lock:
+            latencies = list(self.latencies)
+            return {
+                'requests': self.requests,
+                'unique_prompts': len(self.prompt_counts),
+                'retries': self.requests - len(self.prompt_counts),
+                'status_counts': dict(self.status_counts),
+                'latency_p50_ms': percentile(latencies, 50) * 1000,
+                'latency_p99_ms': percentile(latencies, 99) * 1000,
+            }
+
+    def _sample_latency(self):
+        mean = self.latency_ms / 1000
+        if self.latency == 'fixed':
+            return mean
+        if self.latency == 'uniform':
+            return self._random.uniform(0, 2 * mean)
+        if self.latency == 'exponential':
+            return self._random.expovariate(1 / mean) if mean > 0 else 0.0
+        if mean <= 0:
+            return 0.0
+        # lognormal with the requested mean
+        mu = math.log(mean) - self.latency_sigma ** 2 / 2
+        return self._random.lognormvariate(mu, self.latency_sigma)
+
+    def _over_rpm(self, now):
+        """Sliding one-minute window. Returns seconds to wait, or 0."""
+        if not self.rpm:
+            return 0
+        while self._window and now - self._window[0] >= 60:
+            self._window.popleft()
+        if len(self._window) >= self.rpm:
+            return 60 - (now - self._window[0])
+        self._window.append(now)
+        return 0
+
+    def handle(self, body, api):
+        """Produce (status, payload, headers) for one request."""
+        start = time.monotonic()
+        prompt = self._prompt_text(body, api)
+        with self._lock:
+            self.requests += 1
+            self.prompt_counts[hashlib.sha1(prompt.encode('utf-8')).hexdigest()] += 1
+            roll = self._random.random()
+            wait = self._over_rpm(time.monotonic())
+            delay = self._sample_latency()
+            garble = self._random.random() < self.invalid_json_rate
+            drop_seed = self._random.random()
+
+        if wait or roll < self.rate_limit_rate:
+            retry_after = wait or self.retry_after
+            status, payload = 429, self._error(api, 'rate_limit_error', 'Rate limit exceeded')
+            headers = {'Retry-After': f"{max(retry_after, 0):.3f}"}
+        elif roll < self.rate_limit_rate + self.error_rate:
+            time.sleep(delay)
+            status = 529 if api == 'anthropic' else 500
+            payload, headers = self._error(api, 'overloaded_error' if api == 'anthropic' else 'api_error',
+                                           'Injected server error'), {}
+        elif roll < self.rate_limit_rate + self.error_rate + self.timeout_rate:
+            time.sleep(self.hang_seconds)
+            status, payload, headers = 504, self._error(api, 'timeout_error', 'Injected timeout'), {}
+        else:
+            time.sleep(delay)
+            text = self._answer(prompt, random.Random(drop_seed))
+            if garble:
+                text = text[:len(text) // 2]
+            status, payload, headers = 200, self._completion(api, body, prompt, text), {}
+
+        with self._lock:
+            self.status_counts[status] += 1
+            self.latencies.append(time.monotonic() - start)
+        return status, payload, headers
+
+    @staticmethod
+    def _prompt_text(body, api):
+        messages = body.get('messages') or [{}]
+        content = messages[-1].get('content', '')
+        if isinstance(content, list):
+            content = ''.join(block.get('text', '') for block in content if isinstance(block, dict))
+        return content
+
+    def _answer(self, prompt, rng):
+        if 'PAPERS:' in prompt:
+            results = []
+            for number, title in BATCH_PAPER_PATTERN.findall(prompt):
+                if self.drop_rate and rng.random() < self.drop_rate:
+                    continue
+                exclude, reason = decide(title, self.exclude_rate)
+                results.append({'id': int(number), 'exclude': exclude, 'reason': reason})
+            return json.dumps({'results': results})
+        match = SINGLE_TITLE_PATTERN.search(prompt)
+        exclude, reason = decide(match.group(1) if match else '', self.exclude_rate)
+        return json.dumps({'exclude': exclude, 'reason': reason})
+
+    @staticmethod
+    def _completion(api, body, prompt, text):
+        prompt_tokens = len(prompt) // 4 + 1
+        completion_tokens = len(text) // 4 + 1
+        if api == 'anthropic':
+            return {
+                'id': 'msg_fake', 'type': 'message', 'role': 'assistant', 'model': body.get('model', ''),
+                'content': [{'type': 'text', 'text': text}],
+                'stop_reason': 'end_turn', 'stop_sequence': None,
+                'usage': {'input_tokens': prompt_tokens, 'output_tokens': completion_tokens},
+            }
+        return {
+            'id': 'chatcmpl-fake', 'object': 'chat.completion', 'created': int(time.time()),
+            'model': body.get('model', ''),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text}, 'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        }
+
+    @staticmethod
+    def _error(api, kind, message):
+        if api == 'anthropic':
+            return {'type': 'error', 'error': {'type': kind, 'message': message}}
+        return {'error': {'message': message, 'type': kind, 'code': kind}}
+
+
+def add_provider_arguments(parser):
+    """Fake provider options shared with scripts/bench_ai_stage.py."""
+    parser.add_argument('--latency', choices=LATENCY_MODES, default='lognormal', help='Latency distribution')
+    parser.add_argument('--latency-ms', type=float, default=300.0, help='Mean latency in ms')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Lognormal shape')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of 5xx responses')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of 429 responses')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of hanging requests')
+    parser.add_argument('--hang-seconds', type=float, default=70.0, help='How long hanging requests hang')
+    parser.add_argument('--invalid-json-rate', type=float, default=0.0, help='Fraction of malformed answers')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Fraction of papers missing from batch answers')
+    parser.add_argument('--rpm', type=int, default=0, help='Requests per minute before 429s (0 = unlimited)')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds on injected 429s')
+    parser.add_argument('--exclude-rate', type=float, default=0.3, help='Fraction of papers excluded')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed')
+
+
+def provider_from_args(args, host='127.0.0.1', port=0):
+    return FakeProvider(
+        host=host, port=port, latency=args.latency, latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma, error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        timeout_rate=args.timeout_rate, hang_seconds=args.hang_seconds, invalid_json_rate=args.invalid_json_rate,
+        drop_rate=args.drop_rate, rpm=args.rpm, retry_after=args.retry_after, exclude_rate=args.exclude_rate,
+        seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the DeepSeek / MiniMax APIs')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_provider_arguments(parser)
+    args = parser.parse_args()
+
+    provider = provider_from_args(args, args.host, args.port)
+    print(f"🧪 Fake provider listening on {provider.base_url}", flush=True)
+    print(f"   DEEPSEEK_BASE_URL={provider.deepseek_base_url}", flush=True)
+    print(f"   MINIMAX_BASE_URL={provider.minimax_base_url}", flush=True)
+    print(f"   Stats: GET {provider.base_url}/stats", flush=True)
+    try:
+        provider.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        provider.server.server_close()
+
+
+if __name__ == '__main__':
+    main()
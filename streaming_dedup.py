@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Out-of-Core Deduplication
+流式去重（适用于超出内存的大型导出文件）
+
+Deduplicates a corpus chunk by chunk, so peak memory depends on the chunk
+size instead of the corpus size:
+
+- Each chunk is reduced to 64-bit DOI / title hashes (see
+  corpus_index.exact_fingerprints: canonical DOI, normalized title within
+  its year / first-author block)
+- Hashes of every record seen so far live in a KeySet: a sorted int64
+  array capped at max_memory_keys that spills to an on-disk SQLite table
+- Kept and duplicate rows are appended to the output files straight away
+
+The first record of a duplicate cluster is kept, like remove_duplicates
+with keep='first'. A later record that links two records already written
+out (DOI of one, title of the other) is removed but cannot merge them
+retroactively; near-duplicate titles are not matched in this mode.
+"""
+
+import os
+import sqlite3
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from corpus_index import exact_fingerprints
+from deduplication import propagate_labels
+
+
+# Rows read per chunk and hashes held in memory before spilling to disk (8 bytes each)
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_MAX_MEMORY_KEYS = 4_000_000
+
+
+class KeySet:
+    """
+    Set of int64 keys with bounded memory.
+
+    Keys are kept in a sorted numpy array (searchsorted lookups); once it
+    holds more than max_memory_keys it is flushed into a SQLite table on
+    disk and emptied. Lookups check both.
+    """
+
+    def __init__(self, max_memory_keys=DEFAULT_MAX_MEMORY_KEYS, spill_path=None):
+        self.max_memory_keys = max_memory_keys
+        self.spill_path = spill_path
+        self.spilled = 0
+        self._memory = np.empty(0, dtype=np.int64)
+        self._conn = None
+        self._owns_file = False
+
+    def _open_spill(self):
+        if self.spill_path is None:
+            handle, self.spill_path = tempfile.mkstemp(prefix='literature_dedup_', suffix='.sqlite3')
+            os.close(handle)
+            self._owns_file = True
+        self._conn = sqlite3.connect(self.spill_path)
+        self._conn.execute('PRAGMA journal_mode=OFF')
+        self._conn.execute('PRAGMA synchronous=OFF')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS keys (key INTEGER PRIMARY KEY)')
+        self._conn.execute('CREATE TEMP TABLE probe (key INTEGER NOT NULL)')
+
+    def contains(self, keys):
+        """Boolean array: which keys are already in the set."""
+        keys = np.asarray(keys, dtype=np.int64)
+        positions = np.searchsorted(self._memory, keys)
+        found = self._memory[np.minimum(positions, len(self._memory) - 1)] == keys if len(self._memory) \
+            else np.zeros(len(keys), dtype=bool)
+        if self._conn is not None and len(keys):
+            with self._conn:
+                self._conn.execute('DELETE FROM probe')
+                self._conn.executemany('INSERT INTO probe VALUES (?)', ((k,) for k in keys.tolist()))
+                on_disk = self._conn.execute(
+                    'SELECT DISTINCT p.key FROM probe p CROSS JOIN keys k ON k.key = p.key').fetchall()
+            if on_disk:
+                found |= np.isin(keys, np.array([k for (k,) in on_disk], dtype=np.int64))
+        return found
+
+    def add(self, keys):
+        """Add keys; spill to disk when the in-memory array grows past max_memory_keys."""
+        keys = np.asarray(keys, dtype=np.int64)
+        if len(keys) == 0:
+            return
+        # Stable sort of two sorted runs is a linear merge
+        merged = np.sort(np.concatenate([self._memory, np.unique(keys)]), kind='stable')
+        self._memory = merged[np.r_[True, merged[1:] != merged[:-1]]]
+        if len(self._memory) > self.max_memory_keys:
+            if self._conn is None:
+                self._open_spill()
+            with self._conn:
+                self._conn.executemany('INSERT OR IGNORE INTO keys VALUES (?)',
+                                       ((k,) for k in self._memory.tolist()))
+            self.spilled += len(self._memory)
+            self._memory = np.empty(0, dtype=np.int64)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            if self._owns_file and os.path.exists(self.spill_path):
+                os.remove(self.spill_path)
+
+
+def deduplicate_chunk(chunk, seen, title_col=None, doi_col=None, year_col=None, author_col=None):
+    """
+    Keep mask for one chunk against the records of earlier chunks.
+
+    Rows are clustered within the chunk by shared DOI / title hashes; a
+    cluster is dropped entirely if any member matches an earlier record,
+    otherwise its first row is kept. All hashes of the chunk are then added
+    to seen.
+    """
+    n = len(chunk)
+    fingerprints = exact_fingerprints(chunk, title_col, doi_col, year_col, author_col)
+    labels = np.arange(n, dtype=np.int64)
+    matched = np.zeros(n, dtype=bool)
+    keys = []
+    for field in ('doi', 'title'):
+        present = fingerprints[f'has_{field}']
+        hashes = fingerprints[field]
+        codes = pd.factorize(hashes)[0].astype(np.int64)
+        codes[~present] = -1
+        labels = propagate_labels(labels, codes=codes)
+        matched[present] |= seen.contains(hashes[present])
+        keys.append(hashes[present])
+
+    cluster_matched = np.bincount(labels, weights=matched, minlength=n) > 0
+    kept = (labels == np.arange(n)) & ~cluster_matched[labels]
+    seen.add(np.concatenate(keys))
+    return kept
+
+
+def stream_deduplicate(chunks, kept_output, duplicates_output=None, title_col=None, doi_col=None, year_col=None,
+                       author_col=None, max_memory_keys=DEFAULT_MAX_MEMORY_KEYS, spill_path=None):
+    """
+    Deduplicate an iterable of DataFrame chunks and write the rows out as CSV.
+
+    Args:
+        chunks: Iterable of DataFrames with the same columns (e.g.
+            pd.read_csv(path, chunksize=DEFAULT_CHUNK_SIZE))
+        kept_output: Path or text handle for kept rows
+        duplicates_output: Optional path or text handle for removed rows
+        max_memory_keys: Hashes held in memory before spilling to disk
+        spill_path: SQLite file for spilled hashes (default: a temp file
+            removed afterwards)
+
+    Returns:
+        Dict with original_count, duplicates_removed, final_count, chunks,
+        spilled_keys and method ('streaming')
+    """
+    handles = []
+
+    def open_output(output):
+        if output is None or hasattr(output, 'write'):
+            return output
+        handle = open(output, 'w', encoding='utf-8-sig', newline='')
+        handles.append(handle)
+        return handle
+
+    seen = KeySet(max_memory_keys, spill_path)
+    original_count = final_count = chunk_count = 0
+    try:
+        kept_handle, duplicates_handle = open_output(kept_output), open_output(duplicates_output)
+        for chunk in chunks:
+            chunk = chunk.reset_index(drop=True)
+            kept = deduplicate_chunk(chunk, seen, title_col, doi_col, year_col, author_col)
+            chunk[kept].to_csv(kept_handle, header=chunk_count == 0, index=False)
+            if duplicates_handle is not None:
+                chunk[~kept].to_csv(duplicates_handle, header=chunk_count == 0, index=False)
+            original_count += len(chunk)
+            final_count += int(kept.sum())
+            chunk_count += 1
+            print(f"🔄 Streaming dedup: chunk {chunk_count}, {original_count} rows read, "
+                  f"{original_count - final_count} duplicates", flush=True)
+    finally:
+        for handle in handles:
+            handle.close()
+        spilled = seen.spilled
+        seen.close()
+
+    return {
+        'original_count': original_count,
+        'duplicates_removed': original_count - final_count,
+        'final_count': final_count,
+        'chunks': chunk_count,
+        'spilled_keys': spilled,
+        'method': 'streaming'
+    }
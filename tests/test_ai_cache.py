@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the persistent AI decision cache
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai_cache import AIDecisionCache, get_cache
+
+CRITERIA = "Exclude clinical studies"
+
+
+def make_cache(**kwargs):
+    return AIDecisionCache(os.path.join(tempfile.mkdtemp(), 'cache.sqlite3'), **kwargs)
+
+
+def test_roundtrip_survives_reopen():
+    cache = make_cache()
+    cache.put('deepseek-chat', CRITERIA, 'Deep Learning', 'An abstract', {'exclude': True, 'reason': 'off topic'})
+    cache.put('deepseek-chat', CRITERIA, 'Game Theory', float('nan'), {'exclude': False, 'reason': 'relevant'})
+    cache.close()
+
+    reopened = AIDecisionCache(cache.path)
+    papers = [(10, 'Deep Learning', 'An abstract'), (11, 'Game Theory', float('nan')), (12, 'Unseen', '')]
+    assert reopened.get_many('deepseek-chat', CRITERIA, papers) == {
+        10: {'exclude': True, 'reason': 'off topic'},
+        11: {'exclude': False, 'reason': 'relevant'},
+    }
+
+
+def test_key_uses_normalized_text_model_and_criteria():
+    cache = make_cache()
+    cache.put('deepseek-chat', CRITERIA, 'Deep  Learning', 'An\nabstract ', {'exclude': True, 'reason': 'x'})
+
+    assert 1 in cache.get_many('deepseek-chat', CRITERIA, [(1, 'deep learning', 'AN abstract')])
+    assert cache.get_many('MiniMax-M2.1', CRITERIA, [(1, 'Deep Learning', 'An abstract')]) == {}
+    assert cache.get_many('deepseek-chat', 'Other criteria', [(1, 'Deep Learning', 'An abstract')]) == {}
+
+
+def test_duplicate_papers_share_one_entry():
+    cache = make_cache()
+    cache.put('m', CRITERIA, 'Same', 'Paper', {'exclude': False, 'reason': ''})
+
+    assert sorted(cache.get_many('m', CRITERIA, [(1, 'Same', 'Paper'), (2, 'Same', 'Paper')])) == [1, 2]
+    assert len(cache) == 1
+
+
+def test_eviction_by_age_and_size():
+    cache = make_cache(max_entries=3, max_age_days=1)
+    for i in range(5):
+        cache.put('m', CRITERIA, f'Paper {i}', '', {'exclude': False, 'reason': ''})
+        time.sleep(0.01)
+    # Touch paper 0 so it is the most recently used
+    cache.get_many('m', CRITERIA, [(0, 'Paper 0', '')])
+    cache.evict()
+
+    assert len(cache) == 3
+    kept = cache.get_many('m', CRITERIA, [(i, f'Paper {i}', '') for i in range(5)])
+    assert sorted(kept) == [0, 3, 4]
+
+    with cache._conn:
+        cache._conn.execute('UPDATE decisions SET created_at = created_at - 2 * 86400')
+    assert cache.get_many('m', CRITERIA, [(0, 'Paper 0', '')]) == {}
+    cache.evict()
+    assert len(cache) == 0
+
+
+def test_empty_path_disables_cache():
+    assert get_cache('') is None
+
+
+if __name__ == "__main__":
+    test_roundtrip_survives_reopen()
+    test_key_uses_normalized_text_model_and_criteria()
+    test_duplicate_papers_share_one_entry()
+    test_eviction_by_age_and_size()
+    test_empty_path_disables_cache()
+    print("✅ AI cache test PASSED!")
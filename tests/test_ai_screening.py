@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the concurrent AI screening executor (no network access needed)
+"""
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ai_screening import build_batch_prompt, make_batches, parse_batch_results, run_batched, run_concurrent
+
+
+def test_results_map_back_to_their_jobs():
+    rng = random.Random(0)
+    delays = {i: rng.random() * 0.02 for i in range(40)}
+    caller = threading.get_ident()
+    results = {}
+
+    def worker(job):
+        time.sleep(delays[job])
+        return {'exclude': job % 3 == 0, 'reason': f'paper {job}'}
+
+    def on_result(job, result):
+        assert threading.get_ident() == caller
+        results[job] = result
+
+    completed, cancelled = run_concurrent(range(40), worker, 8, on_result, lambda job, e: None, lambda: False)
+
+    assert (completed, cancelled) == (40, False)
+    assert all(results[i] == {'exclude': i % 3 == 0, 'reason': f'paper {i}'} for i in range(40))
+
+
+def test_concurrency_limit_is_respected():
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def worker(job):
+        with lock:
+            active.append(job)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.remove(job)
+        return {}
+
+    run_concurrent(range(30), worker, 4, lambda job, r: None, lambda job, e: None, lambda: False)
+
+    assert max(peak) <= 4
+
+
+def test_errors_are_reported_per_job():
+    errors = []
+
+    def worker(job):
+        if job == 2:
+            raise TimeoutError('slow provider')
+        return {'exclude': False}
+
+    completed, _ = run_concurrent(range(5), worker, 2, lambda job, r: None,
+                                  lambda job, e: errors.append((job, str(e))), lambda: False)
+
+    assert completed == 5
+    assert errors == [(2, 'slow provider')]
+
+
+def test_cancellation_stops_new_submissions():
+    started = []
+    flag = {'cancelled': False}
+
+    def worker(job):
+        started.append(job)
+        if len(started) >= 3:
+            flag['cancelled'] = True
+        time.sleep(0.01)
+        return {}
+
+    completed, cancelled = run_concurrent(range(100), worker, 2, lambda job, r: None,
+                                          lambda job, e: None, lambda: flag['cancelled'])
+
+    assert cancelled
+    assert completed == len(started) < 10
+
+
+def test_batches_respect_size_and_token_budget():
+    papers = [(i, f'Title {i}', 'word ' * 50) for i in range(25)]
+
+    assert [len(b) for b in make_batches(papers, 'criteria', 10, token_budget=10 ** 6)] == [10, 10, 5]
+
+    overhead = len(build_batch_prompt('criteria', [])) // 4
+    small = list(make_batches(papers, 'criteria', 10, token_budget=overhead + 150))
+    assert all(len(b) < 10 for b in small)
+    assert [p for b in small for p in b] == papers
+
+    # A paper larger than the budget still gets a batch of its own
+    assert len(list(make_batches([(0, 'T', 'x' * 10 ** 5)], 'criteria', 10, token_budget=100))) == 1
+
+
+def test_parse_batch_results_maps_ids_and_skips_bad_entries():
+    papers = [(100, 'a', ''), (205, 'b', ''), (7, 'c', ''), (42, 'd', '')]
+    data = {'results': [
+        {'id': 1, 'exclude': True, 'reason': 'off topic'},
+        {'id': '2', 'exclude': False, 'reason': 'relevant'},
+        {'id': 2, 'exclude': True, 'reason': 'duplicate id'},
+        {'id': 3, 'exclude': 'yes'},
+        {'id': 9, 'exclude': True},
+        'garbage',
+    ]}
+
+    assert parse_batch_results(data, papers) == {
+        100: {'exclude': True, 'reason': 'off topic'},
+        205: {'exclude': False, 'reason': 'relevant'},
+    }
+    assert parse_batch_results([{'id': 4, 'exclude': False}], papers) == {42: {'exclude': False, 'reason': ''}}
+    assert parse_batch_results({'exclude': True}, papers) == {}
+
+
+def test_run_batched_requeues_missing_papers():
+    papers = [(i, f'Title {i}', '') for i in range(12)]
+    calls = []
+
+    def worker(batch):
+        calls.append([p[0] for p in batch])
+        # First round: the model skips every third paper
+        skip = len(calls) <= 3
+        return {p[0]: {'exclude': p[0] % 2 == 0, 'reason': ''} for p in batch if not (skip and p[0] % 3 == 0)}
+
+    results = {}
+    handled, cancelled = run_batched(papers, worker, lambda pending: make_batches(pending, '', 4, 10 ** 6),
+                                     2, lambda p, r: results.setdefault(p[0], r),
+                                     lambda p, e: None, lambda: False)
+
+    assert (handled, cancelled) == (12, False)
+    assert sorted(results) == list(range(12))
+    assert sorted(calls[3]) == [0, 3, 6, 9]
+
+
+def test_run_batched_reports_unanswered_papers_after_retries():
+    errors = []
+
+    handled, _ = run_batched([(1, 't', ''), (2, 't', '')], lambda batch: {1: {'exclude': False}},
+                             lambda pending: [pending], 1, lambda p, r: None,
+                             lambda p, e: errors.append(p[0]), lambda: False, max_rounds=2)
+
+    assert handled == 2
+    assert errors == [2]
+
+
+if __name__ == "__main__":
+    test_results_map_back_to_their_jobs()
+    test_concurrency_limit_is_respected()
+    test_errors_are_reported_per_job()
+    test_cancellation_stops_new_submissions()
+    test_batches_respect_size_and_token_budget()
+    test_parse_batch_results_maps_ids_and_skips_bad_entries()
+    test_run_batched_requeues_missing_papers()
+    test_run_batched_reports_unanswered_papers_after_retries()
+    print("✅ AI screening executor test PASSED!")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test .zip / .tar.gz / .gz archive uploads
+"""
+import gzip
+import io
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import file_ingestion
+from file_ingestion import UploadError, archive_format, expand_archive, expand_uploads, ingest_uploads
+import app as app_module
+import literature_screener
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+WOS = ('PT\tAU\tTI\tSO\tAB\tPY\n' + ''.join(
+    f'J\tSmith, J\tDeep learning study {i}\tJournal {i}\tAbstract {i}\t2020\n' for i in range(20))).encode()
+
+
+def read_data(name):
+    with open(os.path.join(DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+def make_tar(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for name, content in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def expand(filename, content, **kwargs):
+    """Members of an archive as (name, content), with their spool files removed."""
+    members = expand_archive(filename, content, tempfile.mkdtemp(), **kwargs)
+    result = []
+    for name, path in members:
+        with open(path, 'rb') as f:
+            result.append((name, f.read()))
+        file_ingestion.remove_spool(path)
+    return result
+
+
+def test_archive_members():
+    assert [archive_format(name) for name in ('a.ZIP', 'a.tar.gz', 'a.tgz', 'a.txt.gz', 'a.txt')] == \
+        ['zip', 'tar', 'tar', 'gzip', None]
+
+    ris = read_data('test_data.ris')
+    zipped = make_zip([('part1/savedrecs.txt', WOS), ('refs.ris', ris), ('__MACOSX/._refs.ris', b'x'),
+                       ('readme.pdf', b'%PDF'), ('empty/', b'')])
+    assert expand('wos.zip', zipped) == [('wos.zip/part1/savedrecs.txt', WOS), ('wos.zip/refs.ris', ris)]
+    assert expand('wos.tar.gz', make_tar([('a.txt', WOS), ('b.txt', WOS)])) == \
+        [('wos.tar.gz/a.txt', WOS), ('wos.tar.gz/b.txt', WOS)]
+    assert expand('savedrecs.txt.gz', gzip.compress(WOS)) == [('savedrecs.txt.gz/savedrecs.txt', WOS)]
+
+    # Bad archives, archives without supported files and archives over the size limit
+    # leave no spool files behind
+    spool_dir = tempfile.mkdtemp()
+    for filename, content, kwargs, message in (
+            ('bad.zip', b'not a zip', {}, 'Error reading archive bad.zip'),
+            ('docs.zip', make_zip([('readme.pdf', b'%PDF')]), {}, 'No supported files in archive docs.zip'),
+            ('big.tar.gz', make_tar([('a.txt', WOS), ('b.txt', WOS)]), {'max_bytes': len(WOS) + 1},
+             'Archive big.tar.gz is larger than')):
+        try:
+            expand_archive(filename, content, spool_dir, **kwargs)
+        except UploadError as e:
+            assert message in str(e), str(e)
+        else:
+            raise AssertionError('expected UploadError')
+    assert os.listdir(spool_dir) == []
+
+
+def test_members_parse_like_separate_uploads():
+    spool_dir = tempfile.mkdtemp()
+    uploads = [('a.txt', WOS), ('exports.zip', make_zip([('b.txt', WOS), ('c.ris', read_data('test_data.ris'))]))]
+    files, member_paths = expand_uploads(uploads, spool_dir)
+    assert [name for name, _ in files] == ['a.txt', 'exports.zip/b.txt', 'exports.zip/c.ris']
+    assert sorted(member_paths) == sorted(os.path.join(spool_dir, name) for name in os.listdir(spool_dir))
+
+    original = file_ingestion.MIN_PARALLEL_BYTES
+    file_ingestion.MIN_PARALLEL_BYTES = 0
+    try:
+        reports = ingest_uploads(files, workers=2)
+    finally:
+        file_ingestion.MIN_PARALLEL_BYTES = original
+    assert [report['error'] for report in reports] == [None, None, None]
+    assert reports[1]['df'].equals(reports[0]['df'])
+    for path in member_paths:
+        file_ingestion.remove_spool(path)
+
+
+def test_screen_archive_upload():
+    client = app_module.app.test_client()
+    spool_dir = app_module.app.config['UPLOAD_SPOOL_DIR'] = tempfile.mkdtemp()
+    zipped = make_zip([(f'savedrecs_{i}.txt', WOS) for i in range(3)])
+    response = client.post('/screen', data={'file': [(io.BytesIO(zipped), 'wos.zip'),
+                                                     (io.BytesIO(gzip.compress(WOS)), 'more.txt.gz')]},
+                           content_type='multipart/form-data')
+    for _ in range(200):
+        status = client.get(f"/status/{response.json['task_id']}").json
+        if status['status'] in ('completed', 'error'):
+            break
+        time.sleep(0.05)
+    assert status['status'] == 'completed', status
+    assert status['stats']['total'] == 80
+    assert [f['filename'] for f in status['stats']['files']] == \
+        ['wos.zip/savedrecs_0.txt', 'wos.zip/savedrecs_1.txt', 'wos.zip/savedrecs_2.txt', 'more.txt.gz/more.txt']
+    # Archives and their decompressed members are removed once parsed
+    assert os.listdir(spool_dir) == []
+
+
+def test_cli_reads_archive():
+    path = os.path.join(tempfile.mkdtemp(), 'exports.tar.gz')
+    with open(path, 'wb') as f:
+        f.write(make_tar([('a.txt', WOS), ('b.txt', WOS)]))
+    df = literature_screener.read_archive(path)
+    assert len(df) == 40 and literature_screener.find_column(df, 'source') == 'T2'
+
+
+if __name__ == "__main__":
+    test_archive_members()
+    test_members_parse_like_separate_uploads()
+    test_screen_archive_upload()
+    test_cli_reads_archive()
+    print("✅ Archive upload test PASSED!")
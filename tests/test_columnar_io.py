@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test Parquet / Arrow IPC import and export (round trips need pyarrow)
+"""
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+import app as app_module
+from columnar_io import ColumnarUnavailable, columnar_format, read_columnar, write_columnar
+from file_ingestion import UploadError, parse_upload
+
+RECORDS = pd.DataFrame({
+    'TI': ['Deep learning for essays', 'Surgery outcomes', 'Games in class'],
+    'AB': ['About grading', 'Clinical trial of patients', None],
+    'PY': pd.array([2020, None, 2022], dtype='Int64'),
+    'T2': pd.Categorical(['Computers & Education', 'Surgery', 'Computers & Education']),
+})
+
+
+def test_formats_by_extension():
+    assert columnar_format('export.PARQUET') == 'parquet'
+    assert columnar_format('export.feather') == columnar_format('a.arrow') == 'feather'
+    assert columnar_format('export.csv') is None
+
+
+def test_round_trip_keeps_types():
+    buffer = io.BytesIO()
+    if pyarrow is None:
+        for call in (lambda: write_columnar(RECORDS, 'parquet', buffer), lambda: read_columnar(b'', 'feather')):
+            try:
+                call()
+            except ColumnarUnavailable as e:
+                assert 'pip install pyarrow' in str(e)
+            else:
+                raise AssertionError('expected ColumnarUnavailable')
+        try:
+            parse_upload('export.parquet', b'PAR1')
+        except UploadError as e:
+            assert 'pyarrow' in str(e)
+        else:
+            raise AssertionError('expected UploadError')
+        return
+
+    for fmt in ('parquet', 'feather'):
+        buffer = io.BytesIO()
+        write_columnar(RECORDS, fmt, buffer)
+        df = read_columnar(buffer.getvalue(), fmt)
+        assert df.equals(RECORDS) and df['PY'].dtype == 'Int64' and isinstance(df['T2'].dtype, pd.CategoricalDtype)
+        assert parse_upload(f'export.{fmt}', buffer.getvalue())['TI'].tolist() == RECORDS['TI'].tolist()
+
+    # Object columns mixing integers and text are written as text
+    buffer = io.BytesIO()
+    write_columnar(pd.DataFrame({'PY': [2020, '2021', None]}, dtype=object), 'parquet', buffer)
+    assert read_columnar(buffer.getvalue(), 'parquet')['PY'].tolist()[:2] == ['2020', '2021']
+
+    # Repeated names (a re-screened removed_data file) get read_csv-style suffixes
+    buffer = io.BytesIO()
+    write_columnar(pd.DataFrame([['a', 'b']], columns=['Exclusion_Reason', 'Exclusion_Reason']), 'feather', buffer)
+    assert list(read_columnar(buffer.getvalue(), 'feather').columns) == ['Exclusion_Reason', 'Exclusion_Reason.1']
+
+
+def test_download_columnar_formats():
+    client = app_module.app.test_client()
+    task_id = 'columnar-test'
+    removed = RECORDS.iloc[1:2].assign(Exclusion_Reason='Title/Abstract: surgery')
+    app_module.tasks[task_id] = {'status': 'completed', 'result': {
+        'stats': {}, 'df_kept': RECORDS.drop(index=1), 'df_removed': removed, 'df_duplicates': None,
+        'df_seen': None, 'timestamp': time.strftime('%Y%m%d_%H%M%S'),
+        'title_col': 'TI', 'abstract_col': 'AB', 'source_col': 'T2'}}
+
+    for fmt in ('parquet', 'feather'):
+        response = client.get(f'/download/{task_id}/removed/{fmt}')
+        if pyarrow is None:
+            assert response.status_code == 501 and b'pyarrow' in response.data
+            continue
+        assert response.status_code == 200
+        df = read_columnar(response.data, fmt)
+        assert df['Exclusion_Reason'].tolist() == ['Title/Abstract: surgery']
+        assert df['PY'].dtype == 'Int64'
+
+
+if __name__ == "__main__":
+    test_formats_by_extension()
+    test_round_trip_keeps_types()
+    test_download_columnar_formats()
+    print("✅ Columnar I/O test PASSED!")
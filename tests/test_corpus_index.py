@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the persistent per-project corpus fingerprint index
+"""
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from corpus_index import (MATCH_DOI, MATCH_NEAR_DUPLICATE, MATCH_TITLE, CorpusIndex, corpus_fingerprints,
+                          get_index)
+from progress import ScreeningLog
+import app as app_module
+
+BASE = "Deep learning for automated grading of student essays in higher education"
+
+ROUND_ONE = pd.DataFrame({
+    'Title': [BASE, 'Game theory in classrooms', 'Editorial'],
+    'DOI': ['10.1000/ABC', '', ''],
+    'Year': [2020, 2019, 2021],
+    'Authors': ['Smith, J', 'Lee, K', 'Doe, A'],
+})
+
+
+def make_index():
+    return CorpusIndex(os.path.join(tempfile.mkdtemp(), 'corpus.sqlite3'))
+
+
+def fingerprints(df):
+    return corpus_fingerprints(df, 'Title', 'DOI', 'Year', 'Authors')
+
+
+def test_later_round_matches_doi_title_and_near_duplicates():
+    index = make_index()
+    index.add('review', fingerprints(ROUND_ONE))
+    index.close()
+
+    reopened = CorpusIndex(index.path)
+    round_two = pd.DataFrame({
+        'Title': ['Another title', 'Game Theory in Classrooms.', 'Correction: ' + BASE, 'Editorial', 'New paper'],
+        'DOI': ['https://doi.org/10.1000/abc', '', '', '', ''],
+        'Year': [2020, 2019, 2020, 2022, 2020],
+        'Authors': ['Smith, J', 'Lee K', 'Smith J.', 'Doe, A', 'Smith, J'],
+    })
+    seen = reopened.lookup('review', fingerprints(round_two))
+    assert seen['match'].tolist() == [MATCH_DOI, MATCH_TITLE, MATCH_NEAR_DUPLICATE, None, None]
+    assert np.isfinite(seen['first_seen'][:3]).all() and np.isnan(seen['first_seen'][3:]).all()
+    assert reopened.count('review') == 3
+
+
+def test_projects_are_separate():
+    index = make_index()
+    index.add('review', fingerprints(ROUND_ONE), rows=[0])
+    assert index.lookup('other', fingerprints(ROUND_ONE))['match'].tolist() == [None] * 3
+    assert index.lookup('review', fingerprints(ROUND_ONE))['match'].tolist() == [MATCH_DOI, None, None]
+    assert get_index('') is None
+
+
+def test_screening_task_sets_aside_seen_records():
+    def run(df):
+        task_id = f'corpus-{len(app_module.tasks)}'
+        app_module.tasks[task_id] = {'status': 'queued', 'progress': 0, 'message': '', 'result': None,
+                                     'screening_log': ScreeningLog(), 'screening_log_count': 0}
+        app_module.screen_literature_task(task_id, df.copy(), '', '', project='review')
+        return app_module.tasks[task_id]['result']
+
+    original = app_module.app.config['CORPUS_INDEX_PATH']
+    app_module.app.config['CORPUS_INDEX_PATH'] = os.path.join(tempfile.mkdtemp(), 'corpus.sqlite3')
+    try:
+        first = run(ROUND_ONE)
+        assert first['stats']['previously_seen'] == 0 and len(first['df_kept']) == 3
+
+        round_two = pd.concat([ROUND_ONE.iloc[[1]], pd.DataFrame({'Title': ['New paper'], 'Year': [2022]})],
+                              ignore_index=True)
+        second = run(round_two)
+        assert second['stats']['previously_seen'] == 1
+        assert second['df_seen']['Seen_Match'].tolist() == [MATCH_TITLE]
+        assert second['df_kept']['Title'].tolist() == ['New paper']
+        assert run(round_two)['stats']['previously_seen'] == 2
+    finally:
+        app_module.app.config['CORPUS_INDEX_PATH'] = original
+
+
+if __name__ == "__main__":
+    test_later_round_matches_doi_title_and_near_duplicates()
+    test_projects_are_separate()
+    test_screening_task_sets_aside_seen_records()
+    print("✅ Corpus index test PASSED!")
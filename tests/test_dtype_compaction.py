@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test compact corpus dtypes (categoricals, nullable years) and screening/exports on them
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app as app_module
+from dtype_compaction import as_years, compact_dtypes
+from keyword_engine import screen_keywords
+from parallel_screening import screen_keywords_parallel
+
+RIS = ''.join(
+    f'TY  - JOUR\nTI  - Paper {i} on {"surgical robots" if i % 4 == 0 else "essay grading"}\n'
+    f'AB  - Abstract {i}\nT2  - {"Clinical Medicine" if i % 3 == 0 else "Computers & Education"}\n'
+    + (f'PY  - {2015 + i % 5}\n' if i % 5 else '') + 'LA  - English\nER  - \n\n'
+    for i in range(40)).encode()
+
+
+def make_corpus(n=300):
+    return pd.DataFrame({
+        'TI': [f'Study {i} of {"surgical" if i % 7 == 0 else "learning"} outcomes' for i in range(n)],
+        'AB': [None if i % 11 == 0 else f'Abstract {i}' for i in range(n)],
+        'T2': [None if i % 13 == 0 else ('Journal of Medicine' if i % 3 == 0 else 'Computers & Education')
+               for i in range(n)],
+        'PY': [None if i % 17 == 0 else str(2000 + i % 20) for i in range(n)],
+        'TY': ['Article'] * n,
+        'Cited by': list(range(n)),
+    })
+
+
+def test_compact_dtypes_keeps_values():
+    df = make_corpus()
+    compact, report = compact_dtypes(df)
+    assert isinstance(compact['T2'].dtype, pd.CategoricalDtype)
+    assert isinstance(compact['TY'].dtype, pd.CategoricalDtype)
+    assert compact['PY'].dtype == 'Int16' and compact['Cited by'].dtype == df['Cited by'].dtype
+    # Distinct titles stay text
+    assert not isinstance(compact['TI'].dtype, pd.CategoricalDtype)
+    assert report['bytes_saved'] == report['bytes_before'] - report['bytes_after'] > 0
+    assert report['columns']['T2'] == 'category' and 'TI' not in report['columns']
+
+    for name in df.columns:
+        assert (compact[name].isna() == df[name].isna()).all(), name
+        present = df[name].notna()
+        assert compact[name][present].astype(str).tolist() == df[name][present].astype(str).tolist(), name
+
+    # Years are only converted when every value is a whole year
+    assert as_years(pd.Series(['2020', 'Early Access'])) is None
+    assert as_years(pd.Series(['2020 ', '', None])).tolist() == [2020, pd.NA, pd.NA]
+    assert as_years(pd.Series([2019.0, np.nan])).tolist() == [2019, pd.NA]
+
+
+def test_screening_on_categoricals():
+    df = make_corpus()
+    compact, _ = compact_dtypes(df)
+    args = ('TI', 'AB', 'T2', ['surgical', 'outcome study'], ['medicine'])
+    expected = screen_keywords(df, *args)
+    for result in (screen_keywords(compact, *args),
+                   screen_keywords_parallel(compact, *args, workers=2, shard_size=50)):
+        assert (result[0] == expected[0]).all()
+        assert result[1] == expected[1] and result[2] == expected[2]
+
+
+def test_task_reports_memory_and_exports():
+    client = app_module.app.test_client()
+    app_module.app.config['UPLOAD_SPOOL_DIR'] = tempfile.mkdtemp()
+    response = client.post('/screen', data={'file': [(io.BytesIO(RIS), 'a.ris'), (io.BytesIO(RIS), 'b.ris')],
+                                            'ta_keywords': 'surgical', 'journal_keywords': 'medicine',
+                                            'remove_duplicates': 'true', 'dedup_keep': 'most_complete'},
+                           content_type='multipart/form-data')
+    task_id = response.json['task_id']
+    for _ in range(200):
+        status = client.get(f'/status/{task_id}').json
+        if status['status'] in ('completed', 'error'):
+            break
+        time.sleep(0.05)
+    assert status['status'] == 'completed', status
+    stats = status['stats']
+    assert stats['memory']['columns']['T2'] == 'category' and stats['memory']['columns']['PY'] == 'Int16'
+    assert stats['deduplication']['duplicates_removed'] == 40
+    assert stats['kept'] + stats['excluded'] == 40 and stats['journal_excluded'] > 0
+
+    result = app_module.tasks[task_id]['result']
+    assert result['df_removed']['Exclusion_Reason'].str.contains('Journal').any()
+    for fmt in ('csv', 'xlsx', 'txt', 'ris', 'bib'):
+        for dataset in ('cleaned', 'removed', 'duplicates'):
+            response = client.get(f'/download/{task_id}/{dataset}/{fmt}')
+            assert response.status_code == 200, (dataset, fmt)
+    # Missing years stay empty, present ones are written without a decimal point
+    exported = pd.read_csv(io.BytesIO(client.get(f'/download/{task_id}/removed/csv').data), encoding='utf-8-sig',
+                           dtype=str)
+    assert not exported['PY'].dropna().str.contains(r'\.').any() and exported['PY'].isna().any()
+
+
+if __name__ == "__main__":
+    test_compact_dtypes_keeps_values()
+    test_screening_on_categoricals()
+    test_task_reports_memory_and_exports()
+    print("✅ Dtype compaction test PASSED!")
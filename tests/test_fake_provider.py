@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the AI screening calls end-to-end against the local fake provider
+(real OpenAI / Anthropic SDK clients, no network access needed)
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from ai_screening import build_prompt, create_client, screen_batch, screen_paper
+from fake_provider import FakeProvider, decide
+
+PAPERS = [(idx, f"Paper number {idx}", "Some abstract") for idx in (3, 8, 15, 16, 23)]
+
+
+def expected(title):
+    exclude, reason = decide(title, 0.5)
+    return {'exclude': exclude, 'reason': reason}
+
+
+def run_with_provider(check, seed=0, **options):
+    provider = FakeProvider(latency='fixed', latency_ms=0, exclude_rate=0.5, seed=seed, **options).start()
+    try:
+        check(provider)
+    finally:
+        provider.stop()
+
+
+def test_single_paper_both_providers():
+    def check(provider):
+        for ai_model, base_url in (('deepseek', provider.deepseek_base_url), ('minimax', provider.minimax_base_url)):
+            client, _ = create_client(ai_model, 'test-key', base_url, timeout=5)
+            for _, title, abstract in PAPERS:
+                assert screen_paper(client, ai_model, build_prompt('criteria', title, abstract)) == expected(title)
+        assert provider.stats()['status_counts'] == {200: 2 * len(PAPERS)}
+
+    run_with_provider(check)
+
+
+def test_batch_both_providers():
+    def check(provider):
+        for ai_model, base_url in (('deepseek', provider.deepseek_base_url), ('minimax', provider.minimax_base_url)):
+            client, _ = create_client(ai_model, 'test-key', base_url, timeout=5)
+            results = screen_batch(client, ai_model, 'criteria', PAPERS)
+            assert results == {idx: expected(title) for idx, title, _ in PAPERS}
+
+    run_with_provider(check)
+
+
+def test_rate_limits_are_retried_and_counted():
+    def check(provider):
+        client, _ = create_client('deepseek', 'test-key', provider.deepseek_base_url, timeout=5)
+        _, title, abstract = PAPERS[0]
+        assert screen_paper(client, 'deepseek', build_prompt('criteria', title, abstract)) == expected(title)
+        stats = provider.stats()
+        assert stats['status_counts'][200] == 1
+        assert stats['retries'] == stats['status_counts'][429] >= 1
+
+    # With seed 1 the first request rolls a 429; call_with_backoff retries it
+    run_with_provider(check, seed=1, rate_limit_rate=0.5, retry_after=0.01)
+
+
+if __name__ == "__main__":
+    test_single_paper_both_providers()
+    test_batch_both_providers()
+    test_rate_limits_are_retried_and_counted()
+    print("✅ Fake provider test PASSED!")
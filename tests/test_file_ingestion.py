@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test parallel multi-file upload ingestion
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import file_ingestion
+from file_ingestion import UploadError, ingest_uploads, parse_upload
+import app as app_module
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+WOS = ('PT\tAU\tTI\tSO\tAB\tPY\n' + ''.join(
+    f'J\tSmith, J\tDeep learning study {i}\tJournal {i}\tAbstract {i}\t2020\n' for i in range(20))).encode()
+
+
+def read_data(name):
+    with open(os.path.join(DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def test_parse_upload_standardizes_every_format():
+    for name in ('test_data.csv', 'test_data.ris', 'test_data.bib', 'test_data.rtf'):
+        df = parse_upload(name, read_data(name))
+        assert len(df) > 0 and {'TI', 'AB', 'T2'} <= set(df.columns), name
+
+    # WoS tags are mapped and files may be passed as binary streams
+    df = parse_upload('savedrecs.txt', io.BytesIO(WOS))
+    assert df['T2'].iloc[0] == 'Journal 0' and 'SO' not in df.columns
+
+    try:
+        parse_upload('notes.docx', b'')
+    except UploadError as e:
+        assert 'Unsupported file format: notes.docx' in str(e)
+    else:
+        raise AssertionError('expected UploadError')
+
+
+def test_pool_matches_inline_and_reports_errors():
+    uploads = [('a.txt', WOS), ('broken.csv', b'just one line of text\n'), ('b.ris', read_data('test_data.ris'))]
+    inline = ingest_uploads(uploads, workers=1)
+    assert [report['filename'] for report in inline] == ['a.txt', 'broken.csv', 'b.ris']
+    assert inline[1]['df'] is None and '无法正确解析文件: broken.csv' in inline[1]['error']
+    assert inline[0]['rows'] == 20 and inline[2]['error'] is None
+
+    original = file_ingestion.MIN_PARALLEL_BYTES
+    file_ingestion.MIN_PARALLEL_BYTES = 0
+    try:
+        parallel = ingest_uploads(uploads, workers=2)
+    finally:
+        file_ingestion.MIN_PARALLEL_BYTES = original
+    for a, b in zip(inline, parallel):
+        assert a['error'] == b['error']
+        assert (a['df'] is None and b['df'] is None) or a['df'].equals(b['df'])
+
+
+def test_pool_per_worker_count_stays_usable():
+    pool = file_ingestion.get_pool(2)
+    assert file_ingestion.get_pool(2) is pool
+    # Another worker count gets its own pool; work queued on the first one still runs
+    future = pool.submit(abs, -3)
+    assert file_ingestion.get_pool(3) is not pool
+    assert future.result() == 3 and pool.submit(abs, -4).result() == 4
+
+
+def wait_for_task(client, task_id):
+    for _ in range(200):
+        status = client.get(f'/status/{task_id}').json
+        if status['status'] in ('completed', 'error'):
+            return status
+        time.sleep(0.05)
+    raise AssertionError('task did not finish')
+
+
+def test_screen_parses_in_task_and_reports_files():
+    client = app_module.app.test_client()
+    spool_dir = app_module.app.config['UPLOAD_SPOOL_DIR'] = tempfile.mkdtemp()
+    response = client.post('/screen', data={'file': [(io.BytesIO(WOS), 'a.txt'), (io.BytesIO(b'x'), 'b.csv'),
+                                                     (io.BytesIO(b''), 'c.docx')]},
+                           content_type='multipart/form-data')
+    # Parsing errors surface through /status, not the upload request
+    assert response.status_code == 200
+    status = wait_for_task(client, response.json['task_id'])
+    assert status['status'] == 'error'
+    assert [f['filename'] for f in status['files']] == ['a.txt', 'b.csv', 'c.docx']
+    assert 'b.csv' in status['error'] and 'Unsupported file format: c.docx' in status['error']
+
+    response = client.post('/screen', data={'file': [(io.BytesIO(WOS), 'a.txt'), (io.BytesIO(WOS), 'b.txt')]},
+                           content_type='multipart/form-data')
+    status = wait_for_task(client, response.json['task_id'])
+    assert status['stats']['total'] == 40
+    assert [(f['filename'], f['rows']) for f in status['stats']['files']] == [('a.txt', 20), ('b.txt', 20)]
+    # Spooled uploads are removed once parsed
+    assert os.listdir(spool_dir) == []
+
+    original = app_module.app.config['MAX_CONTENT_LENGTH']
+    app_module.app.config['MAX_CONTENT_LENGTH'] = 1024
+    try:
+        response = client.post('/screen', data={'file': [(io.BytesIO(WOS * 10), 'a.txt')]},
+                               content_type='multipart/form-data')
+    finally:
+        app_module.app.config['MAX_CONTENT_LENGTH'] = original
+    assert response.status_code == 413 and 'MAX_UPLOAD_MB' in response.json['error']
+
+
+def test_ingest_progress_callback():
+    uploads = [('a.txt', WOS), ('b.txt', io.BytesIO(WOS)), ('c.ris', read_data('test_data.ris'))]
+    calls = []
+    reports = ingest_uploads(uploads, on_progress=lambda *args: calls.append(args))
+    assert calls == [(1, 3, 20), (2, 3, 40), (3, 3, 40 + reports[2]['rows'])]
+
+
+
+def test_spooled_uploads():
+    spool_dir = tempfile.mkdtemp()
+    # Spooled uploads outlive the request stream they were copied from
+    stream = io.BytesIO(WOS)
+    path = file_ingestion.spool_upload(stream, spool_dir)
+    stream.close()
+    assert parse_upload('a.txt', path)['TI'].iloc[0] == 'Deep learning study 0'
+
+    # Files already on disk (werkzeug writes uploads to spool_file()) are linked, not copied;
+    # BibTeX is parsed from a memory map of the spooled file
+    spool = file_ingestion.spool_file(spool_dir)
+    spool.write(read_data('test_data.bib'))
+    spool.flush()
+    linked = file_ingestion.spool_upload(spool, spool_dir)
+    spool.close()
+    assert sorted(os.listdir(spool_dir)) == sorted([os.path.basename(path), os.path.basename(linked)])
+    assert parse_upload('refs.bib', linked).equals(parse_upload('refs.bib', read_data('test_data.bib')))
+
+    for spooled in (path, linked):
+        file_ingestion.remove_spool(spooled)
+    assert os.listdir(spool_dir) == []
+
+if __name__ == "__main__":
+    test_parse_upload_standardizes_every_format()
+    test_pool_matches_inline_and_reports_errors()
+    test_pool_per_worker_count_stays_usable()
+    test_screen_parses_in_task_and_reports_files()
+    test_ingest_progress_callback()
+    test_spooled_uploads()
+    print("✅ File ingestion test PASSED!")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Equivalence test: vectorized keyword engine / Aho-Corasick matcher vs. the original iterrows loop
+"""
+import os
+import random
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from keyword_engine import AUTOMATON_MIN_KEYWORDS, screen_keywords
+from keyword_matcher import get_automaton
+
+
+TA_BLACKLIST = ["surgical", "patient", "Clinical Trial", "game theory", "cell", " drug "]
+JOURNAL_BLACKLIST = ["medicine", "Physics", "cell"]
+
+
+def contains_blacklisted_keyword(text, blacklist):
+    """Original substring loop (copied from literature_screener.py)."""
+    if pd.isna(text) or not isinstance(text, str):
+        return False, ""
+    text_lower = text.lower()
+    for keyword in blacklist:
+        if keyword.lower() in text_lower:
+            return True, keyword
+    return False, ""
+
+
+def screen_with_loop(df, title_col, abstract_col, source_col, ta_blacklist, journal_blacklist):
+    """Original per-row implementation (copied from screen_literature_task)."""
+    excluded = []
+    reasons = []
+    title_abstract_excluded = 0
+    journal_excluded = 0
+
+    for idx, row in df.iterrows():
+        exclusion_reasons = []
+
+        if title_col:
+            is_excluded, keyword = contains_blacklisted_keyword(row[title_col], ta_blacklist)
+            if is_excluded:
+                exclusion_reasons.append(f"Title: '{keyword}'")
+
+        if abstract_col:
+            is_excluded, keyword = contains_blacklisted_keyword(row[abstract_col], ta_blacklist)
+            if is_excluded:
+                exclusion_reasons.append(f"Abstract: '{keyword}'")
+
+        if exclusion_reasons:
+            title_abstract_excluded += 1
+
+        if source_col:
+            is_excluded, keyword = contains_blacklisted_keyword(row[source_col], journal_blacklist)
+            if is_excluded:
+                exclusion_reasons.append(f"Journal: '{keyword}'")
+                if len(exclusion_reasons) == 1:
+                    journal_excluded += 1
+
+        excluded.append(bool(exclusion_reasons))
+        reasons.append(' | '.join(exclusion_reasons))
+
+    counts = {
+        'title_abstract_excluded': title_abstract_excluded,
+        'journal_excluded': journal_excluded,
+    }
+    return excluded, reasons, counts
+
+
+def make_corpus(n=500, seed=42):
+    """Random corpus mixing blacklisted words, NaN and non-string cells."""
+    rng = random.Random(seed)
+    vocab = ["deep", "learning", "Patient", "outcomes", "SURGICAL", "robots", "game", "theory",
+             "excellence", "in", "teaching", "clinical", "trial", "drugs", "market", "cells"]
+    journals = ["Journal of Medicine", "Physical Review", "Cell Reports", "Economic Review",
+                "Excellence in Teaching", "Journal of Finance"]
+
+    def sentence():
+        return ' '.join(rng.choice(vocab) for _ in range(rng.randint(0, 8)))
+
+    def cell(make):
+        roll = rng.random()
+        if roll < 0.05:
+            return np.nan
+        if roll < 0.08:
+            return 2021
+        return make()
+
+    return pd.DataFrame({
+        'Title': [cell(sentence) for _ in range(n)],
+        'Abstract': [cell(sentence) for _ in range(n)],
+        'Source title': [cell(lambda: rng.choice(journals)) for _ in range(n)],
+    })
+
+
+def test_matches_original_loop():
+    df = make_corpus()
+    expected = screen_with_loop(df, 'Title', 'Abstract', 'Source title', TA_BLACKLIST, JOURNAL_BLACKLIST)
+    excluded, reasons, counts = screen_keywords(
+        df, 'Title', 'Abstract', 'Source title', TA_BLACKLIST, JOURNAL_BLACKLIST
+    )
+
+    assert list(excluded) == expected[0]
+    assert reasons == expected[1]
+    assert counts == expected[2]
+
+
+def test_missing_columns_are_skipped():
+    df = make_corpus(n=100, seed=7)
+    expected = screen_with_loop(df, 'Title', None, None, TA_BLACKLIST, JOURNAL_BLACKLIST)
+    excluded, reasons, counts = screen_keywords(df, 'Title', None, None, TA_BLACKLIST, JOURNAL_BLACKLIST)
+
+    assert list(excluded) == expected[0]
+    assert reasons == expected[1]
+    assert counts == expected[2]
+
+
+def test_first_keyword_in_blacklist_order_wins():
+    df = pd.DataFrame({'Title': ["A patient in surgical care"]})
+    _, reasons, _ = screen_keywords(df, 'Title', None, None, ["surgical", "patient"], [])
+
+    assert reasons == ["Title: 'surgical'"]
+
+
+def test_automaton_matches_original_loop():
+    rng = random.Random(3)
+    blacklist = TA_BLACKLIST + [
+        ''.join(rng.choice('abcdefg') for _ in range(rng.randint(2, 4))) for _ in range(AUTOMATON_MIN_KEYWORDS)
+    ]
+    df = make_corpus(n=300, seed=11)
+    df['Title'] = [t + ' ' + ''.join(rng.choice('abcdefg ') for _ in range(30)) if isinstance(t, str) else t
+                   for t in df['Title']]
+    expected = screen_with_loop(df, 'Title', 'Abstract', 'Source title', blacklist, JOURNAL_BLACKLIST)
+    excluded, reasons, counts = screen_keywords(
+        df, 'Title', 'Abstract', 'Source title', blacklist, JOURNAL_BLACKLIST
+    )
+
+    assert list(excluded) == expected[0]
+    assert reasons == expected[1]
+    assert counts == expected[2]
+
+
+def test_padded_keywords_keep_their_spaces():
+    df = pd.DataFrame({'Title': ["AI in schools", "What the teacher said", "Tutoring with ai tools"]})
+    for blacklist in ([" ai "], [" ai "] + [f"zz{i}" for i in range(AUTOMATON_MIN_KEYWORDS)]):
+        _, reasons, _ = screen_keywords(df, 'Title', None, None, blacklist, [])
+
+        assert reasons == ["", "", "Title: ' ai '"]
+
+
+def test_blank_keywords_are_ignored():
+    df = make_corpus(n=200, seed=17)
+    long_list = TA_BLACKLIST + [f"zz{i}" for i in range(AUTOMATON_MIN_KEYWORDS)]
+    for blacklist in (TA_BLACKLIST, long_list):
+        expected = screen_keywords(df, 'Title', 'Abstract', 'Source title', blacklist, JOURNAL_BLACKLIST)
+        excluded, reasons, counts = screen_keywords(
+            df, 'Title', 'Abstract', 'Source title', ["", "   "] + blacklist, JOURNAL_BLACKLIST + ["\t"]
+        )
+
+        assert list(excluded) == list(expected[0])
+        assert reasons == expected[1]
+        assert counts == expected[2]
+    assert get_automaton(["", " "]).first_keyword("any text") == ''
+
+
+def test_automaton_is_cached_by_keyword_list():
+    assert get_automaton(["cell", "drug"]) is get_automaton(["cell", "drug"])
+    assert get_automaton(["cell", "drug"]) is not get_automaton(["drug", "cell"])
+
+
+def test_whole_word_mode():
+    df = pd.DataFrame({
+        'Title': ["Teaching cell biology", "A Clinical Trial of tutoring", "Clinical trials in schools", "Game-theoretic view"],
+        'Source title': ["Excellence in Teaching", "Cell Reports", "Journal of Education", "Economics"],
+    })
+    blacklist = ["clinical trial", "game-theoretic", "cell"]
+    excluded, reasons, counts = screen_keywords(
+        df, 'Title', None, 'Source title', blacklist, ["cell"], match_mode='word'
+    )
+
+    assert reasons == ["Title: 'cell'", "Title: 'clinical trial' | Journal: 'cell'", "", "Title: 'game-theoretic'"]
+    assert counts == {'title_abstract_excluded': 3, 'journal_excluded': 0}
+
+
+def test_whole_word_mode_boundaries():
+    df = pd.DataFrame({'Title': [
+        "Digital marketing strategies",      # "market" inside "marketing"
+        "What the teacher said",             # "ai" inside "said"
+        "Market design for schools",         # "market" as a word, any case
+        "Tutoring with generative AI",       # "ai" at the end of the text
+        "Chatbots (AI) in class",            # inside parentheses
+        "AI, ethics and assessment",         # before a comma
+        "Assessment by ai.",                 # before a full stop
+        "Clinical-trial design",             # phrase across a hyphen
+        "Clinical trials of tutoring",       # phrase inside a longer word
+    ]})
+    blacklist = ["market", "ai", "clinical trial"]
+    _, reasons, _ = screen_keywords(df, 'Title', None, None, blacklist, [], match_mode='word')
+
+    assert reasons == [
+        "", "", "Title: 'market'", "Title: 'ai'", "Title: 'ai'", "Title: 'ai'", "Title: 'ai'",
+        "Title: 'clinical trial'", "",
+    ]
+
+
+def test_whole_word_mode_matches_loop_on_word_boundaries():
+    df = make_corpus(n=300, seed=13)
+    # With single-word keywords, word mode equals substring mode on exact tokens
+    words = ["patient", "surgical", "market", "teaching"]
+    padded = df.map(lambda v: f" {v} " if isinstance(v, str) else v)
+    expected = screen_with_loop(padded, 'Title', 'Abstract', 'Source title', [f" {w} " for w in words], [])
+    _, reasons, counts = screen_keywords(df, 'Title', 'Abstract', 'Source title', words, [], match_mode='word')
+
+    assert reasons == [re.sub(r"' (\w+) '", r"'\1'", r) for r in expected[1]]
+    assert counts == expected[2]
+
+
+if __name__ == "__main__":
+    test_matches_original_loop()
+    test_missing_columns_are_skipped()
+    test_first_keyword_in_blacklist_order_wins()
+    test_automaton_matches_original_loop()
+    test_padded_keywords_keep_their_spaces()
+    test_blank_keywords_are_ignored()
+    test_automaton_is_cached_by_keyword_list()
+    test_whole_word_mode()
+    test_whole_word_mode_boundaries()
+    test_whole_word_mode_matches_loop_on_word_boundaries()
+    print("✅ Keyword engine equivalence test PASSED!")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test MinHash + LSH near-duplicate title detection
+"""
+import os
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from near_duplicates import find_near_duplicates, normalize_title, title_shingles
+from app import remove_duplicates
+
+BASE = "Deep learning for automated grading of student essays in higher education"
+
+
+def test_normalize_title_drops_notice_prefix_and_punctuation():
+    assert normalize_title("Correction: Deep-Learning, revisited!") == "deep learning revisited"
+    assert normalize_title("Retraction Note to: A Study") == "a study"
+    assert normalize_title(float('nan')) == ''
+
+
+def test_shingles_ignore_stopwords_case_and_punctuation():
+    shingles, offsets, vocabulary = title_shingles(["The Deep-Learning of X", "deep learning, x!", None, ""])
+    rows = [shingles[offsets[i]:offsets[i + 1]].tolist() for i in range(4)]
+    assert rows[0] == rows[1] and sorted(vocabulary[i] for i in rows[0]) == ['deep', 'learning', 'x']
+    assert rows[2] == [] and rows[3] == []
+
+
+def test_variants_cluster_with_original():
+    titles = [
+        BASE,
+        "Correction: " + BASE,
+        BASE + ": a randomized comparison",
+        BASE.replace("automated", "automatd"),
+        BASE.upper() + ".",
+        "Deep learning for automated grading of student essays in primary education",
+        "Editorial",
+        None,
+    ]
+    labels = find_near_duplicates(titles)
+    assert labels[:5].tolist() == [0, 0, 0, 0, 0]
+    # A changed word, an unrelated title and a missing title stay distinct
+    assert labels[5:].tolist() == [5, 6, 7]
+
+
+def test_unrelated_titles_are_not_merged():
+    rng = random.Random(3)
+    vocab = [f"term{i}" for i in range(5000)]
+    titles = [" ".join(rng.choice(vocab) for _ in range(8)) for _ in range(3000)]
+    labels = find_near_duplicates(titles)
+    assert (labels == np.arange(len(titles))).all()
+
+
+def test_remove_duplicates_fuzzy_method():
+    df = pd.DataFrame({
+        'Title': [BASE, "Correction: " + BASE, BASE, "Game theory in classrooms"],
+        'DOI': ['10.1/a', '', '', '10.1/b'],
+    })
+    exact, info = remove_duplicates(df, method='doi_title')
+    assert len(exact) == 3 and info['method'] == 'doi_title'
+
+    fuzzy, info = remove_duplicates(df, method='fuzzy')
+    assert fuzzy['Title'].tolist() == [BASE, "Game theory in classrooms"]
+    assert info['duplicates_removed'] == 2
+    assert info['details'][-1] == "Near-duplicate titles: 1 duplicates"
+
+
+if __name__ == "__main__":
+    test_normalize_title_drops_notice_prefix_and_punctuation()
+    test_shingles_ignore_stopwords_case_and_punctuation()
+    test_variants_cluster_with_original()
+    test_unrelated_titles_are_not_merged()
+    test_remove_duplicates_fuzzy_method()
+    print("✅ Near-duplicate detection test PASSED!")
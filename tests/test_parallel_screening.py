@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test sharded multi-process keyword screening against the in-process engine
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from keyword_engine import screen_keywords
+from parallel_screening import get_pool, screen_keywords_parallel
+from test_keyword_engine import JOURNAL_BLACKLIST, TA_BLACKLIST, make_corpus
+
+
+def test_sharded_matches_in_process():
+    df = make_corpus(n=1000, seed=5)
+    df.loc[3, 'Title'] = 'Ünïcödé pätient 研究'
+    expected = screen_keywords(df, 'Title', 'Abstract', 'Source title', TA_BLACKLIST, JOURNAL_BLACKLIST)
+
+    progress = []
+    excluded, reasons, counts = screen_keywords_parallel(
+        df, 'Title', 'Abstract', 'Source title', TA_BLACKLIST, JOURNAL_BLACKLIST,
+        workers=2, shard_size=128, progress_callback=lambda *args: progress.append(args),
+    )
+
+    assert list(excluded) == list(expected[0])
+    assert reasons == expected[1]
+    assert counts == expected[2]
+    assert len(progress) == 8
+    assert progress[-1] == (8, 8, 1000)
+
+
+def test_single_worker_runs_in_process():
+    df = make_corpus(n=50, seed=9)
+    expected = screen_keywords(df, 'Title', None, 'Source title', TA_BLACKLIST, JOURNAL_BLACKLIST)
+    result = screen_keywords_parallel(df, 'Title', None, 'Source title', TA_BLACKLIST, JOURNAL_BLACKLIST, workers=1)
+
+    assert list(result[0]) == list(expected[0])
+    assert result[1:] == expected[1:]
+
+
+def test_pool_per_worker_count_stays_usable():
+    pool = get_pool(2)
+    assert get_pool(2) is pool
+    # A job asking for another worker count must not shut this pool down
+    future = pool.submit(abs, -3)
+    assert get_pool(3) is not pool
+    assert future.result() == 3 and pool.submit(abs, -4).result() == 4
+
+
+if __name__ == "__main__":
+    test_sharded_matches_in_process()
+    test_single_worker_runs_in_process()
+    test_pool_per_worker_count_stays_usable()
+    print("✅ Parallel screening test PASSED!")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test throttled progress reporting and the ring-buffer screening log
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from progress import ProgressTracker, ScreeningLog, format_remaining
+
+
+def test_ring_buffer_keeps_last_entries():
+    log = ScreeningLog(maxlen=5)
+    for i in range(12):
+        log.append({'idx': i})
+
+    assert len(log) == 5
+    assert [e['idx'] for e in log.tail(3)] == [9, 10, 11]
+    assert [e['idx'] for e in log.tail(100)] == [7, 8, 9, 10, 11]
+
+
+def test_counters_are_published_in_batches():
+    task = {'screening_log': ScreeningLog(), 'screening_log_count': 0}
+    tracker = ProgressTracker(task, total=1000, stage='关键词筛选', flush_every=100, flush_interval=3600)
+
+    for i in range(150):
+        tracker.log(i, f'Paper {i}', 'kept', 'Passed keyword screening')
+    assert task['screening_log_count'] == 100
+    assert task['progress'] == 10
+
+    tracker.flush()
+    assert task['screening_log_count'] == 150
+    assert task['progress'] == 15
+    assert task['message'].startswith('关键词筛选: 150/1000, 剩余约 ')
+    assert task['screening_log'].tail(1)[0]['title'] == 'Paper 149'
+
+
+def test_bulk_advance_counts_without_log_entries():
+    task = {'screening_log': ScreeningLog(), 'screening_log_count': 0}
+    tracker = ProgressTracker(task, total=10, stage='关键词筛选')
+    tracker.advance(8, logged=8)
+    tracker.log(8, 'a', 'kept')
+    tracker.log(9, 'b', 'excluded', "Title: 'x'")
+    tracker.flush()
+
+    assert task['screening_log_count'] == 10
+    assert task['progress'] == 100
+    assert len(task['screening_log']) == 2
+
+
+def test_format_remaining():
+    assert format_remaining(42.9) == '42秒'
+    assert format_remaining(125) == '2分5秒'
+    assert format_remaining(3725) == '1小时2分5秒'
+
+
+if __name__ == "__main__":
+    test_ring_buffer_keeps_last_entries()
+    test_counters_are_published_in_batches()
+    test_bulk_advance_counts_without_log_entries()
+    test_format_remaining()
+    print("✅ Progress test PASSED!")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test adaptive rate control: token buckets, AIMD concurrency and backoff
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import rate_control
+from rate_control import (RateController, TokenBucket, backoff_delay, call_with_backoff,
+                          retry_after_seconds)
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(status_code, headers)
+
+
+class NoSleep:
+    """Record backoff sleeps instead of waiting."""
+
+    def __enter__(self):
+        self.slept = []
+        self._sleep = rate_control.time.sleep
+        rate_control.time.sleep = self.slept.append
+        return self.slept
+
+    def __exit__(self, *exc):
+        rate_control.time.sleep = self._sleep
+
+
+def test_token_bucket_paces_after_burst():
+    bucket = TokenBucket(6000, capacity=5)  # 100 tokens/s
+    assert all(bucket.try_acquire() == 0 for _ in range(5))
+    wait = bucket.try_acquire()
+    assert 0 < wait <= 0.011
+
+    # Oversized requests wait for a full bucket and leave it in debt
+    big = TokenBucket(600, capacity=10)
+    assert big.try_acquire(50) == 0
+    assert big.try_acquire(1) > 3
+
+
+def test_aimd_halves_on_overload_and_grows_back():
+    controller = RateController(8)
+    controller.on_retry(429)
+    assert controller.limit() == 4
+    # A burst of 429s from requests already in flight counts once
+    controller.on_retry(429)
+    assert controller.limit() == 4
+    # Server errors are retried but do not shrink the window
+    controller.on_retry(500)
+    assert controller.limit() == 4
+
+    for _ in range(4):
+        controller.on_success()
+    assert controller.limit() == 5
+    for _ in range(100):
+        controller.on_success()
+    assert controller.limit() == 8
+    assert (controller.retries, controller.rate_limited) == (3, 2)
+
+
+def test_retry_after_parsing_and_backoff():
+    assert retry_after_seconds(FakeStatusError(429, {'retry-after': '2.5'})) == 2.5
+    assert retry_after_seconds(FakeStatusError(429, {'retry-after-ms': '1500', 'retry-after': '9'})) == 1.5
+    assert retry_after_seconds(FakeStatusError(429, {'retry-after': 'Wed, 21 Oct 2015 07:28:00 GMT'})) == 0.0
+    assert retry_after_seconds(FakeStatusError(500)) is None
+
+    assert all(0 <= backoff_delay(attempt) <= min(60, 2 ** attempt) for attempt in range(10) for _ in range(20))
+    assert backoff_delay(0, retry_after=7) >= 7
+
+
+def test_call_with_backoff_retries_transient_errors():
+    controller = RateController(4)
+    outcomes = [FakeStatusError(429, {'retry-after': '0.05'}), FakeStatusError(503), TimeoutError(), 'ok']
+
+    def request():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    with NoSleep() as slept:
+        assert call_with_backoff(request, controller, transient_errors=(TimeoutError,)) == 'ok'
+    assert slept[0] >= 0.05
+    assert (controller.retries, controller.rate_limited) == (3, 2)
+
+
+def test_call_with_backoff_raises_client_errors_and_gives_up():
+    def bad_request():
+        raise FakeStatusError(400)
+
+    try:
+        call_with_backoff(bad_request)
+        assert False, "400 must not be retried"
+    except FakeStatusError as e:
+        assert e.status_code == 400
+
+    calls = []
+
+    def always_429():
+        calls.append(1)
+        raise FakeStatusError(429)
+
+    try:
+        with NoSleep():
+            call_with_backoff(always_429, attempts=3)
+        assert False, "should give up"
+    except FakeStatusError:
+        pass
+    assert len(calls) == 3
+
+
+def test_sdk_rate_limits_are_absorbed():
+    from ai_screening import build_prompt, create_client, screen_paper
+    from fake_provider import FakeProvider
+
+    provider = FakeProvider(latency='fixed', latency_ms=0, rate_limit_rate=0.5, retry_after=0.01, seed=3).start()
+    try:
+        for ai_model, base_url in (('deepseek', provider.deepseek_base_url), ('minimax', provider.minimax_base_url)):
+            client, _ = create_client(ai_model, 'test-key', base_url, timeout=5)
+            controller = RateController(4)
+            for i in range(6):
+                prompt = build_prompt('criteria', f'{ai_model} paper {i}', '')
+                with NoSleep():
+                    result = screen_paper(client, ai_model, prompt, controller)
+                assert isinstance(result['exclude'], bool)
+            assert controller.rate_limited == controller.retries
+        stats = provider.stats()
+        assert stats['status_counts'][200] == 12
+        assert stats['retries'] == stats['status_counts'].get(429, 0) > 0
+    finally:
+        provider.stop()
+
+
+if __name__ == "__main__":
+    test_token_bucket_paces_after_burst()
+    test_aimd_halves_on_overload_and_grows_back()
+    test_retry_after_parsing_and_backoff()
+    test_call_with_backoff_retries_transient_errors()
+    test_call_with_backoff_raises_client_errors_and_gives_up()
+    test_sdk_rate_limits_are_absorbed()
+    print("✅ Rate control test PASSED!")
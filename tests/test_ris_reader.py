@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the streaming column-wise RIS reader
+"""
+import io
+import os
+import sys
+
+import rispy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from ris_reader import read_ris
+from app import parse_ris_file
+
+RIS = b"""Exported by a reference manager
+TY  - JOUR
+TI  - First title
+  continued here
+TI  - Second TI is ignored
+AU  - Smith, J
+AU  - Doe, A
+KW  - deep learning
+KW  - essays
+PY  - 2020
+JO  - Journal A
+T2  - Secondary title
+AB  - An abstract
+DO  - 10.1000/x
+LA  - en
+ER  -
+TY  - CHAP
+T1  - Primary title only
+T2  - Book series\r
+ER  -
+TY  - GEN
+TI  - Incomplete record without ER
+"""
+
+
+def test_fields_and_rispy_rules():
+    df = read_ris(RIS)
+    assert len(df) == 2
+    first, second = df.to_dict('records')
+    assert first['TI'] == 'First title continued here'
+    assert first['AU'] == 'Smith, J; Doe, A' and first['KW'] == 'deep learning; essays'
+    assert (first['T2'], first['PY'], first['DO'], first['TY'], first['LA']) == \
+        ('Journal A', '2020', '10.1000/x', 'Article', 'en')
+    assert (second['TI'], second['T2'], second['TY'], second['AU']) == \
+        ('Primary title only', 'Book series', 'Book Chapter', '')
+    assert list(df.columns) == ['TI', 'AB', 'T2', 'AU', 'PY', 'DO', 'KW', 'TY', 'UR', 'LA']
+
+    entries = rispy.loads(RIS.decode('utf-8'))
+    assert df['TI'].tolist() == [entries[0]['title'], entries[1]['primary_title']]
+
+
+def test_encodings_and_file_objects():
+    assert read_ris(b'\xef\xbb\xbf' + RIS)['TI'].iloc[0] == 'First title continued here'
+    accented = RIS.replace(b'Smith', 'Müller'.encode('cp1252'))
+    assert read_ris(accented)['AU'].iloc[0] == 'Müller, J; Doe, A'
+    stream = io.BytesIO(RIS.replace(b'Smith', 'Müller'.encode('utf-8')))
+    assert read_ris(stream)['AU'].iloc[0] == 'Müller, J; Doe, A'
+    assert not stream.closed
+
+
+def test_parse_ris_file_rejects_empty():
+    try:
+        parse_ris_file(b'no records here\n')
+    except ValueError as e:
+        assert 'No RIS entries found' in str(e)
+    else:
+        raise AssertionError('expected ValueError')
+
+
+if __name__ == "__main__":
+    test_fields_and_rispy_rules()
+    test_encodings_and_file_objects()
+    test_parse_ris_file_rejects_empty()
+    print("✅ RIS reader test PASSED!")
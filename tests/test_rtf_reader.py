@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the single-pass RTF / EndNote reader
+"""
+import os
+import sys
+
+from striprtf.striprtf import rtf_to_text
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rtf_reader import read_rtf, rtf_text_pieces
+from test_rtf_parsing import parse_rtf_file_test
+
+RTF_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'test_data.rtf')
+
+
+def test_sample_file_matches_previous_parser():
+    with open(RTF_FILE, 'rb') as f:
+        content = f.read()
+    df = read_rtf(content)
+
+    assert df['TI'].tolist() == parse_rtf_file_test(content)['Title'].tolist()
+    first = df.iloc[0]
+    assert first['TI'] == 'Machine Learning Applications in Business Analytics'
+    assert (first['PY'], first['T2'], first['DO'], first['TY']) == \
+        ('2023', 'Journal of Business Research', '10.1234/jbr.2023.001', 'Journal Article')
+    assert first['AU'] == 'Smith, John; Johnson, Mary; Brown, Robert'
+
+
+def test_text_matches_striprtf():
+    samples = [
+        r"{\rtf1\ansi{\fonttbl{\f0\fcharset0 Arial;}{\f1\fcharset134 SimSun;}}\f0 M\'fcller \f1\'c9\'ee\'b6\'c8\par x}",
+        r"{\rtf1\uc1 B\u233?atrice \uc0\u8212 dash\tab{\*\comment hidden}\ldblquote q\rdblquote\line end}",
+        "{\\rtf1 {\\info{\\author A}}text \\{braces\\} \\\\ \\~nbsp\r\n\\par %T T}trailing",
+        r'{\rtf1{\field{\*\fldinst{HYPERLINK "https://doi.org/10.1/x"}}{\fldrslt{link}}} after}',
+    ]
+    for sample in samples:
+        assert ''.join(rtf_text_pieces(sample)) == rtf_to_text(sample), sample
+
+
+def test_entries_continuations_and_fallback():
+    rtf = (r"{\rtf1 \par %T First {\b title}\par continued\par %a Doe, A\par %A Roe, B"
+           r"\par %Q unknown tag\par ignored continuation\par %D 2020\par \par "
+           r"Not an entry\par %T Skipped\par \par %A No title\par }").encode()
+    df = read_rtf(rtf)
+    assert df[['TI', 'AU', 'PY']].values.tolist() == [['First title continued', 'Doe, A; Roe, B', '2020']]
+
+    paragraphs = (r"{\rtf1 A paper title without any EndNote tags at all here\par Published 2019 with doi "
+                  r"10.1000/abc and a long enough description to count as the abstract of the record.\par }").encode()
+    record = read_rtf(paragraphs).iloc[0]
+    assert record['TI'] == 'A paper title without any EndNote tags at all here'
+    assert (record['PY'], record['DO']) == ('2019', '10.1000/abc')
+
+
+if __name__ == "__main__":
+    test_sample_file_matches_previous_parser()
+    test_text_matches_striprtf()
+    test_entries_continuations_and_fallback()
+    print("✅ RTF reader test PASSED!")
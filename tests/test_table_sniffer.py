@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test single-pass encoding / delimiter sniffing for CSV and TXT uploads
+"""
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from table_sniffer import detect_encoding, read_table, sniff_table
+
+WOS = 'PT\tAU\tTI\tSO\tAB\tPY\n' + ''.join(
+    f'J\tMüller, K\tÉtude {i} sur "les" essais\tRevue\tRésumé {i}\t2020\n' for i in range(30))
+
+
+def test_encodings_are_detected():
+    assert detect_encoding(WOS.encode('utf-8')) == 'utf-8'
+    assert detect_encoding(WOS.encode('utf-8-sig')) == 'utf-8-sig'
+    assert detect_encoding(WOS.encode('utf-16')) == 'utf-16'
+    assert detect_encoding(WOS.encode('utf-16-le')) == 'utf-16-le'
+    assert detect_encoding(WOS.encode('cp1252')) == 'cp1252'
+    assert detect_encoding('TI\tAB\n深度学习与作文评分\t摘要\n'.encode('gb18030')) == 'gb18030'
+
+
+def test_tab_export_parses_once_with_accents_intact():
+    for encoding in ('utf-8', 'cp1252', 'utf-16'):
+        df, dialect = read_table(WOS.encode(encoding), size=256)
+        assert dialect['delimiter'] == 'tab' and dialect['score'] == 6 + 100 + 50 + 30
+        assert len(df) == 30 and df['TI'].iloc[0] == 'Étude 0 sur "les" essais'
+        assert df['AU'].iloc[-1] == 'Müller, K'
+
+        # Binary files (spooled uploads) are sniffed from their first bytes and streamed to the parser
+        streamed, streamed_dialect = read_table(io.BytesIO(WOS.encode(encoding)), size=256)
+        assert streamed_dialect == dialect and streamed.equals(df)
+
+
+def test_comma_fallback_and_rejection():
+    df, dialect = read_table('Title,Abstract,Year\n"Deep, learning",x,2020\nGames,"two\nlines",2021\n'.encode())
+    assert dialect['delimiter'] == 'comma'
+    assert df.values.tolist() == [['Deep, learning', 'x', 2020], ['Games', 'two\nlines', 2021]]
+
+    # Two columns are not enough for either delimiter
+    assert sniff_table(b'a,b\n1,2\n')['delimiter'] is None
+    assert read_table(b'just one line of text\n')[0] is None
+
+
+if __name__ == "__main__":
+    test_encodings_are_detected()
+    test_tab_export_parses_once_with_accents_intact()
+    test_comma_fallback_and_rejection()
+    print("✅ Table sniffer test PASSED!")